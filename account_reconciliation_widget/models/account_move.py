@@ -6,6 +6,26 @@ class AccountMoveLine(models.Model):
 
     _inherit = "account.move.line"
 
+    def _auto_init(self):
+        res = super()._auto_init()
+        # Partial indexes on the open items the reconciliation widget looks up
+        # by account/partner and by company/amount.
+        self.env.cr.execute(
+            """
+            CREATE INDEX IF NOT EXISTS account_move_line_open_account_partner_idx
+            ON account_move_line (account_id, partner_id, amount_residual)
+            WHERE reconciled IS NOT TRUE AND balance != 0.0
+            """
+        )
+        self.env.cr.execute(
+            """
+            CREATE INDEX IF NOT EXISTS account_move_line_open_company_amount_idx
+            ON account_move_line (company_id, amount_residual)
+            WHERE reconciled IS NOT TRUE AND balance != 0.0
+            """
+        )
+        return res
+
     def _create_writeoff(self, writeoff_vals):
         """Create a writeoff move per journal for the account.move.lines in
          self. If debit/credit is not specified in vals, the writeoff amount
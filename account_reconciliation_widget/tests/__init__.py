@@ -1 +1,2 @@
 from . import test_reconciliation_widget
+from . import test_reconciliation_candidate_index
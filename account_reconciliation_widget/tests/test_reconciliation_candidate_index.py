@@ -0,0 +1,123 @@
+import logging
+import time
+
+import odoo.tests
+
+from odoo.addons.account.tests.common import TestAccountReconciliationCommon
+
+_logger = logging.getLogger(__name__)
+
+
+@odoo.tests.tagged("post_install", "-at_install")
+class TestReconciliationCandidateIndex(TestAccountReconciliationCommon):
+
+    STATEMENT_SIZE = 200
+
+    @classmethod
+    def setUpClass(cls, chart_template_ref=None):
+        super().setUpClass(chart_template_ref=chart_template_ref)
+        cls.widget = cls.env["account.reconciliation.widget"]
+        # Leave the propositions to the candidate index only.
+        cls.env["account.reconcile.model"].search(
+            [("company_id", "=", cls.company.id)]
+        ).unlink()
+
+    def _create_statement(self, invoices, name="BENCH"):
+        statement = self.env["account.bank.statement"].create(
+            {
+                "journal_id": self.bank_journal_euro.id,
+                "date": time.strftime("%Y-07-15"),
+                "name": name,
+                "line_ids": [
+                    (
+                        0,
+                        0,
+                        {
+                            "payment_ref": "Transfer %s" % invoice.payment_reference,
+                            "amount": invoice.amount_total,
+                            "date": time.strftime("%Y-07-15"),
+                        },
+                    )
+                    for invoice in invoices
+                ],
+            }
+        )
+        statement.button_post()
+        return statement
+
+    def _receivable(self, invoice):
+        return invoice.line_ids.filtered(
+            lambda l: l.account_id.internal_type == "receivable"
+        )
+
+    def test_proposition_by_reference(self):
+        invoices = self.create_invoice(
+            currency_id=self.currency_euro_id
+        ) | self.create_invoice(currency_id=self.currency_euro_id)
+        statement = self._create_statement(invoices[1], name="REF")
+
+        result = self.widget.get_bank_statement_line_data(statement.line_ids.ids)
+        proposition = result["lines"][0]["reconciliation_proposition"]
+        self.assertEqual(
+            [line["id"] for line in proposition], self._receivable(invoices[1]).ids
+        )
+
+    def test_propositions_match_single_lookup(self):
+        invoice = self.create_invoice(currency_id=self.currency_euro_id)
+        refund = self.create_invoice(
+            move_type="out_refund", currency_id=self.currency_euro_id
+        )
+        account = self._receivable(invoice).account_id
+        partner = invoice.partner_id
+        keys = [(account.id, partner.id), (account.id, None)]
+
+        propositions = self.widget._get_move_line_reconciliation_propositions(keys)
+        for key in keys:
+            self.assertEqual(
+                set(propositions[key].ids),
+                set(self.widget._get_move_line_reconciliation_proposition(*key).ids),
+            )
+        self.assertEqual(
+            set(propositions[keys[0]].ids),
+            set((self._receivable(invoice) | self._receivable(refund)).ids),
+        )
+
+    def test_benchmark_reconcile_generated_statement(self):
+        invoices = self.env["account.move"]
+        for _i in range(self.STATEMENT_SIZE):
+            invoices |= self.create_invoice(currency_id=self.currency_euro_id)
+        statement = self._create_statement(invoices)
+
+        queries_before = self.cr.sql_log_count
+        started = time.time()
+        result = self.widget.get_bank_statement_line_data(statement.line_ids.ids)
+        data = [
+            {
+                "partner_id": line["reconciliation_proposition"][0]["partner_id"],
+                "counterpart_aml_dicts": [
+                    {
+                        "counterpart_aml_id": aml["id"],
+                        "name": aml["name"],
+                        "debit": aml["credit"],
+                        "credit": aml["debit"],
+                    }
+                    for aml in line["reconciliation_proposition"]
+                ],
+            }
+            for line in result["lines"]
+        ]
+        self.widget.process_bank_statement_line(
+            [line["st_line"]["id"] for line in result["lines"]], data
+        )
+        elapsed = time.time() - started
+        queries = self.cr.sql_log_count - queries_before
+
+        self.assertEqual(len(result["lines"]), self.STATEMENT_SIZE)
+        self.assertTrue(all(statement.line_ids.mapped("is_reconciled")))
+        self.assertFalse(any(invoices.mapped("amount_residual")))
+        _logger.info(
+            "Reconciliation benchmark: %s statement lines in %.2fs (%s queries)",
+            self.STATEMENT_SIZE,
+            elapsed,
+            queries,
+        )
@@ -110,92 +110,122 @@ class Accountpayment(models.Model):
         return new_lines
 
         
-    def dev_generate_moves(self):
-        if self.payment_for :
-            line_vals_list = []
-            total_amount = self.amount
-            for line in self.payment_line_ids:
-                total_amount = total_amount - line.allocation
-                if self.payment_type == 'inbound':
-                    counterpart_amount = -line.allocation
-                    if line.invoice_id.move_type == 'out_refund':
-                        counterpart_amount = line.allocation
-                elif self.payment_type == 'outbound':
+    def _prepare_multi_payment_move_lines(self):
+        """ Journal items of a multi payment: one liquidity and one
+        receivable/payable line per payment line, plus the unallocated rest. """
+        self.ensure_one()
+        line_vals_list = []
+        total_amount = self.amount
+        for line in self.payment_line_ids:
+            total_amount = total_amount - line.allocation
+            if self.payment_type == 'inbound':
+                counterpart_amount = -line.allocation
+                if line.invoice_id.move_type == 'out_refund':
                     counterpart_amount = line.allocation
-                    if line.invoice_id.move_type == 'in_refund':
-                        counterpart_amount = -line.allocation
-                else:
-                    counterpart_amount = 0.0
+            elif self.payment_type == 'outbound':
+                counterpart_amount = line.allocation
+                if line.invoice_id.move_type == 'in_refund':
+                    counterpart_amount = -line.allocation
+            else:
+                counterpart_amount = 0.0
 
-                balance = self.currency_id._convert(counterpart_amount, self.company_id.currency_id, self.company_id, self.date)
-                counterpart_amount_currency = counterpart_amount
-                currency_id = self.currency_id.id
+            balance = self.currency_id._convert(counterpart_amount, self.company_id.currency_id, self.company_id, self.date)
+            counterpart_amount_currency = counterpart_amount
+            currency_id = self.currency_id.id
 
-                if self.is_internal_transfer:
-                    if self.payment_type == 'inbound':
-                        liquidity_line_name = _('Transfer to %s', self.journal_id.name)
-                    else: # payment.payment_type == 'outbound':
-                        liquidity_line_name = _('Transfer from %s', self.journal_id.name)
-                else:
-                    liquidity_line_name = self.payment_reference
-
-                # Compute a default label to set on the journal items.
-
-                payment_display_name = {
-                    'outbound-customer': _("Customer Reimbursement"),
-                    'inbound-customer': _("Customer Payment"),
-                    'outbound-supplier': _("Vendor Payment"),
-                    'inbound-supplier': _("Vendor Reimbursement"),
-                }
-
-                default_line_name = self.env['account.move.line']._get_default_line_name(
-                    _("Internal Transfer") if self.is_internal_transfer else payment_display_name['%s-%s' % (self.payment_type, self.partner_type)],
-                    line.allocation,
-                    self.currency_id,
-                    self.date,
-                    partner=self.partner_id,
-                )
-
-                
-                    # Liquidity line.
-                liq_dic = {
-                    'name': liquidity_line_name or default_line_name,
-                    'date_maturity': self.date,
-                    'amount_currency': -counterpart_amount_currency,
-                    'currency_id': currency_id,
-                    'debit': balance < 0.0 and -balance or 0.0,
-                    'credit': balance > 0.0 and balance or 0.0,
-                    'partner_id': self.partner_id.id,
-                    'account_id': self.journal_id.payment_debit_account_id.id if balance < 0.0 else self.journal_id.payment_credit_account_id.id,
-                }
-                    # Receivable / Payable.
-                rec_dict={
-                    'name': self.payment_reference or default_line_name,
-                    'date_maturity': self.date,
-                    'amount_currency': counterpart_amount_currency if currency_id else 0.0,
-                    'currency_id': currency_id,
-                    'debit': balance > 0.0 and balance or 0.0,
-                    'credit': balance < 0.0 and -balance or 0.0,
-                    'partner_id': self.partner_id.id,
-                    'account_id': self.destination_account_id.id,
-                    'multi_payment_id':line.id,
-                }
-                line_vals_list.append(liq_dic)
-                line_vals_list.append(rec_dict)
-            if total_amount > 0:
-                n_lines = self.more_amount_payment_line(total_amount)
-                for n_l in n_lines:
-                    line_vals_list.append(n_l)
-                    
+            if self.is_internal_transfer:
+                if self.payment_type == 'inbound':
+                    liquidity_line_name = _('Transfer to %s', self.journal_id.name)
+                else: # payment.payment_type == 'outbound':
+                    liquidity_line_name = _('Transfer from %s', self.journal_id.name)
+            else:
+                liquidity_line_name = self.payment_reference
+
+            # Compute a default label to set on the journal items.
+
+            payment_display_name = {
+                'outbound-customer': _("Customer Reimbursement"),
+                'inbound-customer': _("Customer Payment"),
+                'outbound-supplier': _("Vendor Payment"),
+                'inbound-supplier': _("Vendor Reimbursement"),
+            }
+
+            default_line_name = self.env['account.move.line']._get_default_line_name(
+                _("Internal Transfer") if self.is_internal_transfer else payment_display_name['%s-%s' % (self.payment_type, self.partner_type)],
+                line.allocation,
+                self.currency_id,
+                self.date,
+                partner=self.partner_id,
+            )
+
+            
+                # Liquidity line.
+            liq_dic = {
+                'name': liquidity_line_name or default_line_name,
+                'date_maturity': self.date,
+                'amount_currency': -counterpart_amount_currency,
+                'currency_id': currency_id,
+                'debit': balance < 0.0 and -balance or 0.0,
+                'credit': balance > 0.0 and balance or 0.0,
+                'partner_id': self.partner_id.id,
+                'account_id': self.journal_id.payment_debit_account_id.id if balance < 0.0 else self.journal_id.payment_credit_account_id.id,
+            }
+                # Receivable / Payable.
+            rec_dict={
+                'name': self.payment_reference or default_line_name,
+                'date_maturity': self.date,
+                'amount_currency': counterpart_amount_currency if currency_id else 0.0,
+                'currency_id': currency_id,
+                'debit': balance > 0.0 and balance or 0.0,
+                'credit': balance < 0.0 and -balance or 0.0,
+                'partner_id': self.partner_id.id,
+                'account_id': self.destination_account_id.id,
+                'multi_payment_id':line.id,
+            }
+            line_vals_list.append(liq_dic)
+            line_vals_list.append(rec_dict)
+        if total_amount > 0:
+            n_lines = self.more_amount_payment_line(total_amount)
+            for n_l in n_lines:
+                line_vals_list.append(n_l)
+        return line_vals_list
+
+    def dev_generate_moves(self):
+        if self.payment_for :
+            line_vals_list = self._prepare_multi_payment_move_lines()
             self.move_id.line_ids.unlink()
             self.move_id.line_ids = [(0, 0, line_vals) for line_vals in line_vals_list]
             self.move_id.action_post()
-            for line in self.payment_line_ids:
-                invoice_id = line.invoice_id
-                move_line = self.env['account.move.line'].search([('move_id','=',self.move_id.id),('multi_payment_id','=',line.id)])
-                invoice_id.js_assign_outstanding_line(move_line.id)
+            self._reconcile_multi_payment_lines()
             return True
 
+    def _generate_multi_payment_moves_batch(self):
+        """ dev_generate_moves for many payments: the journal entries are
+        posted in one call and the invoices reconciled without a search per
+        payment line. """
+        payments = self.filtered('payment_for')
+        if not payments:
+            return True
+        for payment in payments:
+            if payment.payment_line_ids and payment.currency_id.compare_amounts(payment.amount, sum(payment.payment_line_ids.mapped('allocation'))):
+                raise UserError(_("The sum of the allocation amount of listed invoices Not Same with payment's amount."))
+        line_vals = {payment.id: payment._prepare_multi_payment_move_lines() for payment in payments}
+        payments.mapped('move_id.line_ids').unlink()
+        for payment in payments:
+            payment.move_id.line_ids = [(0, 0, vals) for vals in line_vals[payment.id]]
+        payments.mapped('move_id').action_post()
+        payments._reconcile_multi_payment_lines()
+        return True
+
+    def _reconcile_multi_payment_lines(self):
+        move_lines = self.env['account.move.line'].search([('move_id', 'in', self.mapped('move_id').ids),
+                                                           ('multi_payment_id', '!=', False)])
+        move_line_by_payment_line = {move_line.multi_payment_id.id: move_line for move_line in move_lines}
+        for line in self.mapped('payment_line_ids'):
+            move_line = move_line_by_payment_line.get(line.id)
+            if move_line:
+                line.invoice_id.js_assign_outstanding_line(move_line.id)
+
     def _synchronize_from_moves(self, changed_fields):
         for payment in self:
             if payment.payment_for == True:
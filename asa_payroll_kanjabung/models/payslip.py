@@ -5,6 +5,9 @@ from odoo.exceptions import UserError, ValidationError
 import itertools
 from operator import itemgetter
 import operator
+import logging
+
+_logger = logging.getLogger(__name__)
 
 class HrEmployee(models.Model):
     _inherit = 'hr.employee'
@@ -15,6 +18,28 @@ class HrEmployee(models.Model):
 class PayslipRun(models.Model):
     _inherit = "hr.payslip.run"
 
+    def action_process_payment(self):
+        payments, failed = self.mapped('slip_ids')._process_payment_batch()
+        message = _('%s payment diposting.') % len(payments)
+        if failed:
+            message += ' ' + _('Gagal: %s') % ', '.join(failed.mapped('name'))
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Payment Invoice'),
+                'message': message,
+                'type': 'warning' if failed else 'success',
+                'sticky': bool(failed),
+            },
+        }
+
+    def _prepare_payslip_vals_list(self, employees):
+        vals_list = super(PayslipRun, self)._prepare_payslip_vals_list(employees)
+        for vals in vals_list:
+            vals['periode_id'] = self.periode_id.id
+        return vals_list
+
     periode_id = fields.Many2one('periode.setoran', string='Periode Setoran', required=True)
     date_start = fields.Date(string='Date From', required=True, readonly=True, help="start date",
                              states={'draft': [('readonly', False)]},
@@ -85,61 +110,86 @@ class Payslip(models.Model):
             record.payment_count = self.env['account.payment'].search_count(
                 [('payslip_id', 'in', self.ids)])
 
-    def process_payment(self):
-        pay_method_id= self.env['account.payment.method'].search([('name','=','Manual')],limit=1)
-        if not pay_method_id:
-            pay_method_id= self.env['account.payment.method'].search([],limit=1)
+    PAYMENT_CHUNK_SIZE = 100
 
-        for rec in self.inv_pay_ids.mapped('company_id') :
-            journal = self.env['invoice.payslip'].search([('company_id','=',rec.id),('payslip_id','=',self.id)],limit=1)
-            
-            if not journal.payment_method_id :
-                raise UserError(_("Payment Method harus diisi terlebih dahulu....!! "))
-
-
-            pay_val={
-                'payment_type':'inbound',
-                'partner_type':'customer',
-                'payment_for':True,
-                'partner_id':self.employee_id.peternak_id.partner_id.id,
-                'journal_id': journal.payment_method_id.id or False,
-                'payment_method_id': pay_method_id.id or False,
-                'state':'draft',
-                'amount':0,
-                'payslip_id':self.id,
-                'company_id' : rec.id
-                }
-
-
-
-            payment_id = self.env['account.payment'].create(pay_val)
-            line_list=[]
-            paid_amt=0
-            for line in self.inv_pay_ids:
-                if line.company_id.id == rec.id :
-                    line_list.append((0,0,{
+    def _prepare_payment_vals_list(self):
+        """ Nilai account.payment (multi payment) per slip dan company,
+            referensi semua slip di-resolve sekaligus. """
+        PaymentMethod = self.env['account.payment.method']
+        pay_method_id = PaymentMethod.search([('name','=','Manual'),('payment_type','=','inbound')],limit=1) \
+            or PaymentMethod.search([('name','=','Manual')],limit=1) \
+            or PaymentMethod.search([],limit=1)
+        if not pay_method_id:
+            raise UserError(_("Tidak ada Payment Method (account.payment.method) yang bisa digunakan."))
+
+        lines_by_slip = {}
+        for line in self.mapped('inv_pay_ids').sorted('id'):
+            lines_by_slip.setdefault((line.payslip_id.id, line.company_id.id), []).append(line)
+
+        vals_list = []
+        for slip in self:
+            partner = slip.employee_id.peternak_id.partner_id
+            for company in slip.inv_pay_ids.mapped('company_id'):
+                lines = lines_by_slip[(slip.id, company.id)]
+                journal = lines[0]
+                if not journal.payment_method_id :
+                    raise UserError(_("Payment Method harus diisi terlebih dahulu....!! "))
+                vals_list.append({
+                    'payment_type':'inbound',
+                    'partner_type':'customer',
+                    'payment_for':True,
+                    'partner_id':partner.id,
+                    'journal_id': journal.payment_method_id.id or False,
+                    'payment_method_id': pay_method_id.id or False,
+                    'amount': sum(line.allocation for line in lines),
+                    'payslip_id':slip.id,
+                    'company_id' : company.id,
+                    'payment_line_ids': [(0,0,{
                         'invoice_id':line.invoice_id.id,
                         'date':line.date,
                         'due_date':line.due_date,
                         'original_amount':line.original_amount,
                         'balance_amount':line.balance_amount,
                         'allocation':line.allocation,
-                        'account_payment_id':payment_id.id or False,
-                        'tipe_invoice' : line.tipe_invoice
-                    }))
-
-                    paid_amt += line.allocation
-
-            payment_id.write({
-                'line_ids':line_list,
-                'amount'  : paid_amt
-            })
+                        'tipe_invoice' : line.tipe_invoice,
+                    }) for line in lines],
+                })
+        return vals_list
+
+    def _process_payment_batch(self, post=True, chunk_size=None, raise_on_error=False):
+        """ Buat multi payment semua slip dengan satu create per chunk. Jika
+            `post`, payment diposting dan direkonsiliasi per chunk; chunk yang
+            gagal dibatalkan seluruhnya tanpa mempengaruhi chunk lain.
+
+            return (payments, slip yang gagal) """
+        chunk_size = chunk_size or self.PAYMENT_CHUNK_SIZE
+        paid = self.env['account.payment'].read_group([('payslip_id', 'in', self.ids)], ['payslip_id'], ['payslip_id'])
+        paid_ids = {group['payslip_id'][0] for group in paid}
+        slips = self.filtered(lambda slip: slip.id not in paid_ids and slip.inv_pay_ids)
+
+        payments = self.env['account.payment']
+        failed = self.env['hr.payslip']
+        for start in range(0, len(slips), chunk_size):
+            chunk = slips[start:start + chunk_size]
+            try:
+                with self.env.cr.savepoint():
+                    chunk_payments = self.env['account.payment'].create(chunk._prepare_payment_vals_list())
+                    if post:
+                        chunk_payments._generate_multi_payment_moves_batch()
+            except (UserError, ValidationError) as e:
+                if raise_on_error:
+                    raise
+                _logger.warning('Multi payment payslip %s gagal: %s', ', '.join(chunk.mapped('name')), e.args[0])
+                failed |= chunk
+                self.invalidate_cache()
+                continue
+            payments |= chunk_payments
+        return payments, failed
 
-        # # payment_id.dev_generate_moves()
+    def process_payment(self):
+        self._process_payment_batch(post=False, raise_on_error=True)
         return True
 
-
-
     @api.depends('inv_pay_ids','inv_pay_ids.allocation')
     def get_allocation_amount(self):
         for payment in self:
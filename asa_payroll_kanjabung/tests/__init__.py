@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+
+from . import test_multi_payment_batch
+from . import test_payslip_run_periode
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import time
+from unittest.mock import patch
+
+from odoo import fields
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+from odoo.exceptions import UserError
+from odoo.tests import tagged
+
+_logger = logging.getLogger(__name__)
+
+
+class MultiPaymentBatchCommon(AccountTestInvoicingCommon):
+
+    @classmethod
+    def setUpClass(cls, chart_template_ref=None):
+        super().setUpClass(chart_template_ref=chart_template_ref)
+        cls.tipe_inv = cls.env['master.tipe.invoice'].create({'code': 'KPKP', 'name': 'Kredit PKP'})
+
+    def _create_invoices(self, count):
+        invoices = self.env['account.move'].create([{
+            'move_type': 'out_invoice',
+            'partner_id': self.partner_a.id,
+            'invoice_date': fields.Date.today(),
+            'tipe_inv_id': self.tipe_inv.id,
+            'invoice_line_ids': [(0, 0, {
+                'name': 'Angsuran %s' % index,
+                'quantity': 1,
+                'price_unit': 100.0 + index % 7,
+                'tax_ids': [(6, 0, [])],
+            })],
+        } for index in range(count)])
+        invoices.action_post()
+        return invoices
+
+    def _create_slips(self, invoices_per_slip):
+        peternak = self.env['peternak.sapi'].create({
+            'peternak_name': 'Peternak Bayar',
+            'gender': 'laki',
+            'partner_id': self.partner_a.id,
+        })
+        employee = self.env['hr.employee'].create({'name': 'Peternak Bayar', 'peternak_id': peternak.id})
+        return self.env['hr.payslip'].create([{
+            'employee_id': employee.id,
+            'date_from': fields.Date.today().replace(day=1),
+            'date_to': fields.Date.today(),
+            'inv_pay_ids': [(0, 0, {
+                'invoice_id': invoice.id,
+                'company_id': invoice.company_id.id,
+                'payment_method_id': self.company_data['default_journal_bank'].id,
+                'date': invoice.invoice_date,
+                'original_amount': invoice.amount_total,
+                'balance_amount': invoice.amount_residual,
+                'allocation': invoice.amount_residual,
+            }) for invoice in invoices],
+        } for invoices in invoices_per_slip])
+
+    def _create_multi_payment(self, invoices, amount=None):
+        total = sum(invoices.mapped('amount_residual'))
+        return self.env['account.payment'].create({
+            'payment_type': 'inbound',
+            'partner_type': 'customer',
+            'payment_for': True,
+            'partner_id': self.partner_a.id,
+            'journal_id': self.company_data['default_journal_bank'].id,
+            'amount': total if amount is None else amount,
+            'payment_line_ids': [(0, 0, {
+                'invoice_id': invoice.id,
+                'original_amount': invoice.amount_total,
+                'balance_amount': invoice.amount_residual,
+                'allocation': invoice.amount_residual,
+                'currency_id': invoice.currency_id.id,
+            }) for invoice in invoices],
+        })
+
+
+@tagged('post_install', '-at_install')
+class TestMultiPaymentBatch(MultiPaymentBatchCommon):
+
+    def test_batch_matches_single(self):
+        invoices = self._create_invoices(6)
+        single = self._create_multi_payment(invoices[:3])
+        batch = self._create_multi_payment(invoices[3:])
+
+        single.dev_generate_moves()
+        batch._generate_multi_payment_moves_batch()
+
+        self.assertFalse(any(invoices.mapped('amount_residual')))
+        for payment in single | batch:
+            self.assertEqual(payment.move_id.state, 'posted')
+            self.assertEqual(len(payment.move_id.line_ids), 2 * len(payment.payment_line_ids))
+        self.assertEqual(sorted(batch.move_id.line_ids.mapped('balance')),
+                         sorted(single.move_id.line_ids.mapped('balance')))
+
+    def test_batch_allocation_mismatch(self):
+        invoices = self._create_invoices(2)
+        payment = self._create_multi_payment(invoices, amount=1.0)
+        with self.assertRaises(UserError):
+            payment._generate_multi_payment_moves_batch()
+
+    def test_payment_vals_grouped_by_company(self):
+        invoices = self._create_invoices(2)
+        slip = self._create_slips([invoices])
+        company_2 = self.company_data_2['company']
+        slip.inv_pay_ids[1].write({
+            'company_id': company_2.id,
+            'payment_method_id': self.company_data_2['default_journal_bank'].id,
+        })
+        vals_list = slip._prepare_payment_vals_list()
+        self.assertEqual(len(vals_list), 2)
+        by_company = {vals['company_id']: vals for vals in vals_list}
+        self.assertEqual(by_company[company_2.id]['journal_id'], self.company_data_2['default_journal_bank'].id)
+        self.assertAlmostEqual(by_company[company_2.id]['amount'], invoices[1].amount_residual)
+        self.assertEqual(len(by_company[self.company_data['company'].id]['payment_line_ids']), 1)
+        self.assertTrue(all(vals['payment_method_id'] for vals in vals_list))
+
+    def test_process_payment_batch_failing_chunk(self):
+        invoices = self._create_invoices(3)
+        slips = self._create_slips([invoices[0], invoices[1], invoices[2]])
+        bad_slip = slips[1]
+        Payment = type(self.env['account.payment'])
+        generate = Payment._generate_multi_payment_moves_batch
+
+        def generate_or_fail(payments):
+            if bad_slip in payments.mapped('payslip_id'):
+                raise UserError('Forced failure')
+            return generate(payments)
+
+        with patch.object(Payment, '_generate_multi_payment_moves_batch',
+                          autospec=True, side_effect=generate_or_fail):
+            payments, failed = slips._process_payment_batch(chunk_size=1)
+
+        self.assertEqual(failed, bad_slip)
+        self.assertEqual(payments.mapped('payslip_id'), slips - bad_slip)
+        self.assertEqual(set(payments.mapped('move_id.state')), {'posted'})
+        self.assertFalse(invoices[0].amount_residual)
+        self.assertFalse(invoices[2].amount_residual)
+        # the failed chunk is rolled back as a whole
+        self.assertFalse(self.env['account.payment'].search([('payslip_id', '=', bad_slip.id)]))
+        self.assertEqual(invoices[1].amount_residual, invoices[1].amount_total)
+
+        # slips already paid are skipped on the next run
+        payments, failed = slips._process_payment_batch(chunk_size=1)
+        self.assertFalse(failed)
+        self.assertEqual(payments.mapped('payslip_id'), bad_slip)
+        self.assertFalse(invoices[1].amount_residual)
+
+
+@tagged('post_install', '-at_install', '-standard', 'multi_payment_benchmark')
+class TestMultiPaymentBatchBenchmark(MultiPaymentBatchCommon):
+
+    def test_benchmark_2000_lines(self):
+        invoices = self._create_invoices(2000)
+        payment = self._create_multi_payment(invoices)
+        self.env['base'].flush()
+
+        queries_before = self.cr.sql_log_count
+        started = time.time()
+        payment._generate_multi_payment_moves_batch()
+        self.env['base'].flush()
+        elapsed = time.time() - started
+
+        self.assertFalse(any(invoices.mapped('amount_residual')))
+        _logger.info('Multi payment benchmark: %s lines in %.2fs (%s queries)',
+                     len(payment.payment_line_ids), elapsed, self.cr.sql_log_count - queries_before)
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+
+from odoo import fields
+from odoo.tests import tagged
+from odoo.tests.common import SavepointCase
+
+
+@tagged('post_install', '-at_install')
+class TestPayslipRunPeriode(SavepointCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        today = fields.Date.today()
+        cls.periode = cls.env['periode.setoran'].create({
+            'periode_setoran': 'Periode Test',
+            'periode_setoran_awal': today.replace(day=1),
+            'periode_setoran_akhir': today,
+        })
+        cls.employees = cls.env['hr.employee'].create([{'name': 'Peternak %s' % i} for i in range(3)])
+        cls.run = cls.env['hr.payslip.run'].create({
+            'name': 'Batch Periode',
+            'periode_id': cls.periode.id,
+            'date_start': cls.periode.periode_setoran_awal,
+            'date_end': cls.periode.periode_setoran_akhir,
+        })
+
+    def test_vals_list_periode(self):
+        vals_list = self.run._prepare_payslip_vals_list(self.employees)
+        self.assertEqual({vals['periode_id'] for vals in vals_list}, {self.periode.id})
+
+    def test_wizard_uses_batch_generation(self):
+        wizard = self.env['hr.payslip.employees'].create({'employee_ids': [(6, 0, self.employees.ids)]})
+        wizard.with_context(active_id=self.run.id).compute_sheet()
+        self.assertEqual(len(self.run.slip_ids), 3)
+        self.assertEqual(self.run.slip_ids.mapped('periode_id'), self.periode)
@@ -5,6 +5,7 @@ from . import syariah_member
 from . import syariah_mitra
 from . import syariah_mitra_bank
 from . import syariah_master
+from . import syariah_invoice_batch
 from . import syariah_simpanan
 from . import syariah_pinjaman
 from . import syariah_investasi
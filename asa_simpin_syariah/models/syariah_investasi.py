@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 # Part of Akun+. See LICENSE file for full copyright and licensing details.
 
+import logging
 from datetime import datetime, timedelta, date
 from functools import partial
 from itertools import groupby
@@ -14,6 +15,8 @@ from dateutil.relativedelta import relativedelta
 
 from werkzeug.urls import url_encode
 
+_logger = logging.getLogger(__name__)
+
 class AccountMove(models.Model):
     _inherit = 'account.move'
 
@@ -425,138 +428,98 @@ class SimPinInvestasi(models.Model):
                         line.create_inv_nisbah()
             
     
-    def create_inv_nisbah(self,tanggal=False):
-        tgl_akad = self.tanggal_akad
-        inv_cair = len(self.investasi_line)
-        akad_date = tgl_akad + relativedelta(months=inv_cair) 
-        date_today = akad_date.strftime("%Y-%m-01") 
+    def _get_nisbah_invoice_date(self,tanggal=False):
         if tanggal:
-            date_today = tanggal
-        inv_line =[]
-        coa_debit = self.product_id.property_account_expense_id.id
-        coa_credit = self.akad_id.property_account_payable_id.id
+            return fields.Date.to_date(tanggal)
+        akad_date = self.tanggal_akad + relativedelta(months=len(self.investasi_line))
+        return akad_date.replace(day=1)
+
+    def _get_nisbah_line_name(self):
+        if self.pengembalian=='aro':
+            return "Nisbah Investasi ARO: " + self.name + " an " + self.member_id.name
+        return "Pencairan Investasi dan Nisbah: " + self.name + " an " + self.member_id.name
+
+    def _prepare_nisbah_invoice_vals(self,tanggal=False,akad_journals=None):
+        '''
+        Nilai vendor bill nisbah (dan pengembalian dana) satu investasi.
+        `akad_journals` dari simpin_syariah.invoice.batch._get_akad_journals
+        agar pencarian jurnal akad tidak diulang per investasi.
+        '''
+        self.ensure_one()
+        if akad_journals is None:
+            akad_journals = self.env['simpin_syariah.invoice.batch']._get_akad_journals(
+                self.akad_id, ['bayar_untung','balik_modal'])
+        empty = self.env['master.akad_journal']
+        dt_nisbah = akad_journals.get((self.akad_id.id,'bayar_untung'), empty)[:1]
+        dt_pokok = akad_journals.get((self.akad_id.id,'balik_modal'), empty)[:1]
+
+        date_today = self._get_nisbah_invoice_date(tanggal)
         nisbah_bulanan = round(self.total_investasi * self.equivalent_rate / 1200,0)
-        dt_nisbah = self.env['master.akad_journal'].search([('akad_id','=',self.akad_id.id),('type_journal','=','bayar_untung')],limit=1)
-        dt_pokok = self.env['master.akad_journal'].search([('akad_id','=',self.akad_id.id),('type_journal','=','balik_modal')], limit=1)
-            
+        inv_line =[]
         if self.pengembalian=='jatuh_tempo' and self.state=='active':
-            if self.pembayaran_nisbah==2 and date_today==self.jatuh_tempo:
+            if self.pembayaran_nisbah=='2' and date_today==self.jatuh_tempo:
                 nisbah = nisbah_bulanan * int(self.jangka_waktu)
-                inv_line += [(0,0,self._prepare_inv_line_nisbah('Pembayaran Nisbah ',dt_nisbah.coa_kredit.id,nisbah,1,self.pajak_nisbah))]
-                inv_line += [(0,0,self._prepare_inv_line_nisbah('Pengembalian Dana Investasi ',dt_pokok.coa_debet.id,self.paket_investasi,self.qty_investasi))]
-                inv_name = "Pencairan Investasi dan Nisbah: " + self.name + " an " + self.member_id.name
-            elif self.pembayaran_nisbah==1  and date_today==self.jatuh_tempo:
+            elif self.pembayaran_nisbah=='1' and date_today==self.jatuh_tempo:
                 nisbah = nisbah_bulanan
-                inv_line += [(0,0,self._prepare_inv_line_nisbah('Pembayaran Nisbah ',dt_nisbah.coa_kredit.id,nisbah,1,self.pajak_nisbah))]
-                inv_line += [(0,0,self._prepare_inv_line_nisbah('Pengembalian Dana Investasi ',dt_pokok.coa_debet.id,self.paket_investasi,self.qty_investasi))]
-                inv_name = "Pencairan Investasi dan Nisbah: " + self.name + " an " + self.member_id.name
-#            elif self.pembayaran_nisbah==1 and relativedelta(date.today(),self.jatuh_tempo).months>0:
-#                nisbah = nisbah_bulanan
-#                inv_line += [(0,0,self._prepare_inv_line_nisbah('Pembayaran Nisbah ',dt_nisbah.coa_kredit.id,nisbah,1,self.pajak_nisbah))]
-#                inv_name = "Pencairan Nisbah: " + self.name + " an " + self.member_id.name
             else:
                 raise UserError('Belum Jatuh Tempo')
+            inv_line += [(0,0,self._prepare_inv_line_nisbah('Pembayaran Nisbah ',dt_nisbah.coa_kredit.id,nisbah,1,self.pajak_nisbah))]
+            inv_line += [(0,0,self._prepare_inv_line_nisbah('Pengembalian Dana Investasi ',dt_pokok.coa_debet.id,self.paket_investasi,self.qty_investasi))]
         elif self.pengembalian=='aro' and self.state=='active':
+            #create VB nisbah dan extend jatuh_tempo sesuai jangka_waktu
             if self.pembayaran_nisbah=='1':
                 nisbah = nisbah_bulanan
-                print ("==========aro===========", nisbah)
-                #create VB nisbah dan extend jatuh_tempo sesuai jangka_waktu
-                #jurnal nisbah
             else:
                 nisbah = nisbah_bulanan * int(self.jangka_waktu)
-
             inv_line += [(0,0,self._prepare_inv_line_nisbah('Pembayaran Nisbah ',dt_nisbah.coa_kredit.id,nisbah,1,self.pajak_nisbah))]
-            inv_name = "Nisbah Investasi ARO: " + self.name + " an " + self.member_id.name
-
         else:
-            print ("===========else===========")
             raise UserError(_('Data Investasi tidak lengkap %s')%(self.id))
-            
 
+        return {
+                'partner_id': self.member_id.partner_id.id,
+                'state': 'draft',
+                'ref': self.name,
+                'invoice_date': date_today,
+                'move_type': 'in_invoice',
+                'investasi_id' : self.id,
+                'invoice_line_ids': inv_line
+                }
 
-        invoice_vals = {
-                            'partner_id': self.member_id.partner_id.id,
-                            'state': 'draft',
-                            'ref': self.name,
-                            'invoice_date': date_today,
-                            'move_type': 'in_invoice',
-                            'investasi_id' : self.id,
-                            'invoice_line_ids': inv_line
-                        }
-
-        invoice = self.env['account.move'].create(invoice_vals)
+    def _create_investasi_lines(self, invoices):
+        ''' Satu simpin_syariah.investasi.line per invoice, dibuat sekaligus '''
+        return self.env['simpin_syariah.investasi.line'].create([{
+                    'name': invoice.investasi_id._get_nisbah_line_name(),
+                    'investasi_id': invoice.investasi_id.id,
+                    'invoice_id': invoice.id,
+                    'tanggal_proses': invoice.date,
+                    } for invoice in invoices])
 
-        self.env['simpin_syariah.investasi.line'].create({
-                                                    'name': inv_name,
-                                                    'investasi_id': self.id,
-                                                    'invoice_id': invoice.id,
-                                                    'tanggal_proses': invoice.date,
-                                                    })
+    def create_inv_nisbah(self,tanggal=False):
+        invoice = self.env['account.move'].create(self._prepare_nisbah_invoice_vals(tanggal))
+        self._create_investasi_lines(invoice)
 
     def cron_create_inv_nisbah(self,tanggal=False):
+        '''
+        Vendor bill nisbah untuk semua investasi aktif, dibuat per chunk oleh
+        simpin_syariah.invoice.batch. Investasi yang belum jatuh tempo atau
+        datanya tidak lengkap dilewati agar tidak menggagalkan seluruh run.
+        '''
+        batch = self.env['simpin_syariah.invoice.batch']
         investasi = self.env['simpin_syariah.investasi'].search([('state','=', 'active')])
-        for inves in investasi :
-            tgl_akad = inves.tanggal_akad
-            inv_cair = len(inves.investasi_line)
-            akad_date = tgl_akad + relativedelta(months=inv_cair) 
-            date_today = akad_date.strftime("%Y-%m-01") 
-            if tanggal:
-                date_today = tanggal
-            inv_line =[]
-            coa_debit = inves.product_id.property_account_expense_id.id
-            coa_credit = inves.akad_id.property_account_payable_id.id
-            nisbah_bulanan = round(inves.total_investasi * inves.equivalent_rate / 1200,0)
-            dt_nisbah = self.env['master.akad_journal'].search([('akad_id','=',inves.akad_id.id),('type_journal','=','bayar_untung')],limit=1)
-            dt_pokok = self.env['master.akad_journal'].search([('akad_id','=',inves.akad_id.id),('type_journal','=','balik_modal')], limit=1)
-                
-            if inves.pengembalian=='jatuh_tempo' and inves.state=='active':
-                if inves.pembayaran_nisbah==2 and date_today==inves.jatuh_tempo:
-                    nisbah = nisbah_bulanan * int(inves.jangka_waktu)
-                    inv_line += [(0,0,inves._prepare_inv_line_nisbah('Pembayaran Nisbah ',dt_nisbah.coa_kredit.id,nisbah,1,inves.pajak_nisbah))]
-                    inv_line += [(0,0,inves._prepare_inv_line_nisbah('Pengembalian Dana Investasi ',dt_pokok.coa_debet.id,inves.paket_investasi,inves.qty_investasi))]
-                    inv_name = "Pencairan Investasi dan Nisbah: " + inves.name + " an " + inves.member_id.name
-                elif inves.pembayaran_nisbah==1  and date_today==inves.jatuh_tempo:
-                    nisbah = nisbah_bulanan
-                    inv_line += [(0,0,inves._prepare_inv_line_nisbah('Pembayaran Nisbah ',dt_nisbah.coa_kredit.id,nisbah,1,inves.pajak_nisbah))]
-                    inv_line += [(0,0,inves._prepare_inv_line_nisbah('Pengembalian Dana Investasi ',dt_pokok.coa_debet.id,inves.paket_investasi,inves.qty_investasi))]
-                    inv_name = "Pencairan Investasi dan Nisbah: " + inves.name + " an " + inves.member_id.name
-                else:
-                    raise UserError('Belum Jatuh Tempo')
-            elif inves.pengembalian=='aro' and inves.state=='active':
-                if inves.pembayaran_nisbah=='1':
-                    nisbah = nisbah_bulanan
-                    print ("==========aro===========", nisbah)
-                    #create VB nisbah dan extend jatuh_tempo sesuai jangka_waktu
-                    #jurnal nisbah
-                else:
-                    nisbah = nisbah_bulanan * int(inves.jangka_waktu)
-
-                inv_line += [(0,0,inves._prepare_inv_line_nisbah('Pembayaran Nisbah ',dt_nisbah.coa_kredit.id,nisbah,1,inves.pajak_nisbah))]
-                inv_name = "Nisbah Investasi ARO: " + inves.name + " an " + inves.member_id.name
-
-            else:
-                print ("===========else===========")
-                raise UserError(_('Data Investasi tidak lengkap %s')%(inves.id))
-                
-
-
-            invoice_vals = {
-                                'partner_id': inves.member_id.partner_id.id,
-                                'state': 'draft',
-                                'ref': inves.name,
-                                'invoice_date': date_today,
-                                'move_type': 'in_invoice',
-                                'investasi_id' : inves.id,
-                                'invoice_line_ids': inv_line
-                            }
-
-            invoice = self.env['account.move'].create(invoice_vals)
-
-            self.env['simpin_syariah.investasi.line'].create({
-                                                        'name': inv_name,
-                                                        'investasi_id': inves.id,
-                                                        'invoice_id': invoice.id,
-                                                        'tanggal_proses': invoice.date,
-                                                        })
+        akad_journals = batch._get_akad_journals(investasi.mapped('akad_id'), ['bayar_untung','balik_modal'])
+
+        def prepare(inves):
+            try:
+                return inves._prepare_nisbah_invoice_vals(tanggal, akad_journals)
+            except UserError as e:
+                _logger.info('Nisbah investasi %s dilewati: %s', inves.name, e.args[0])
+                return False
+
+        run_key = fields.Date.to_string(fields.Date.to_date(tanggal)) if tanggal else \
+            fields.Date.context_today(self).strftime('%Y-%m')
+        # Vendor bill nisbah tetap draft untuk diverifikasi sebelum dibayar.
+        return batch.run('nisbah_investasi', run_key, investasi, prepare,
+                         after_create=lambda records, moves: records._create_investasi_lines(moves),
+                         post=False)
 
 
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+# Part of Akun+. See LICENSE file for full copyright and licensing details.
+
+import logging
+
+from odoo import api, models
+
+_logger = logging.getLogger(__name__)
+
+
+class SimPinInvoiceBatch(models.AbstractModel):
+    _name = "simpin_syariah.invoice.batch"
+    _description = "Pembuatan Invoice Massal Simpin Syariah"
+
+    INVOICE_BATCH_SIZE = 200
+    CURSOR_PARAM = 'simpin_syariah.invoice_batch.%s'
+
+    @api.model
+    def _get_cursor(self, key, run_key):
+        """ Id terakhir yang sudah diproses pada run `run_key`, 0 jika baru """
+        value = self.env['ir.config_parameter'].sudo().get_param(self.CURSOR_PARAM % key) or ''
+        run, sep, last_id = value.rpartition(':')
+        if not sep or run != str(run_key):
+            return 0
+        return int(last_id or 0)
+
+    @api.model
+    def _set_cursor(self, key, run_key, last_id):
+        self.env['ir.config_parameter'].sudo().set_param(
+            self.CURSOR_PARAM % key, '%s:%s' % (run_key, last_id))
+
+    @api.model
+    def _get_akad_journals(self, akads, type_journals):
+        """ master.akad_journal untuk banyak akad sekaligus
+            {(akad_id, type_journal): akad_journal} """
+        result = {}
+        if not akads:
+            return result
+        journals = self.env['master.akad_journal'].search([('akad_id', 'in', akads.ids),
+                                                            ('type_journal', 'in', list(type_journals))])
+        for journal in journals:
+            key = (journal.akad_id.id, journal.type_journal)
+            result[key] = result.get(key, self.env['master.akad_journal']) | journal
+        return result
+
+    @api.model
+    def _set_receivable_account(self, moves, accounts):
+        """ Ganti akun piutang invoice dengan akun piutang akad,
+            `accounts` = {move_id: account_id}. Satu write per akun. """
+        by_account = {}
+        for line in moves.mapped('line_ids'):
+            account_id = accounts.get(line.move_id.id)
+            if account_id and line.account_id.internal_type == 'receivable' and line.account_id.id != account_id:
+                by_account.setdefault(account_id, []).append(line.id)
+        for account_id, line_ids in by_account.items():
+            self.env['account.move.line'].browse(line_ids).write({'account_id': account_id})
+
+    @api.model
+    def run(self, key, run_key, records, prepare, after_create=None, post=True, chunk_size=None):
+        """ Buat invoice untuk semua `records` yang jatuh tempo.
+
+            `prepare(record)` mengembalikan nilai account.move atau False jika
+            record tidak perlu ditagih. Invoice dibuat per chunk dengan satu
+            create, diposting sekaligus dan di-commit per chunk. Posisi terakhir
+            disimpan per `key`/`run_key` sehingga run yang terhenti dapat
+            dilanjutkan tanpa menagih ulang. """
+        chunk_size = chunk_size or self.INVOICE_BATCH_SIZE
+        cursor = self._get_cursor(key, run_key)
+        records = records.filtered(lambda rec: rec.id > cursor).sorted('id')
+        moves_obj = self.env['account.move']
+        created = 0
+        for start in range(0, len(records), chunk_size):
+            chunk = records[start:start + chunk_size]
+            source_ids, vals_list = [], []
+            for record in chunk:
+                vals = prepare(record)
+                if vals:
+                    source_ids.append(record.id)
+                    vals_list.append(vals)
+            if vals_list:
+                moves = moves_obj.create(vals_list)
+                if after_create:
+                    after_create(records.browse(source_ids), moves)
+                if post:
+                    moves.action_post()
+                created += len(moves)
+            self._set_cursor(key, run_key, chunk[-1].id)
+            if not self.env.registry.in_test_mode():
+                self.env.cr.commit()
+            _logger.info('Invoice batch %s (%s): %s/%s records, %s invoices',
+                         key, run_key, start + len(chunk), len(records), created)
+        return created
@@ -13,8 +13,12 @@ from odoo.osv import expression
 from odoo.tools import float_is_zero, float_compare
 from odoo.addons import decimal_precision as dp
 
+from odoo.tools import html_escape
+
 from werkzeug.urls import url_encode
+import logging
 import re
+import time
 import xlwt
 import base64
 import io
@@ -22,6 +26,30 @@ import csv
 import psycopg2
 from psycopg2 import DatabaseError, errorcodes
 
+_logger = logging.getLogger(__name__)
+
+NOTIFIKASI_BATCH_SIZE = 500
+NOTIFIKASI_PREVIEW = 5
+
+NOTIFIKASI_RINCIAN = "<br/>           - {name} jatuh tempo {date_due} Rp. {amount:,.2f}"
+NOTIFIKASI_TEMPLATE = """
+            Dengan Hormat, <br/><br/>
+
+            1. Bersama surat ini kami sampaikan Pemberitahuan Tagihan Pembiayaan Syariah {anggota} periode {periode}
+            <br/>           sebesar Rp. {total:,.2f} dengan rincian sebagai berikut:
+            <br/>           a. Simpanan Wajib dan Pokok   Rp. {simpanan:,.2f}
+            <br/>           b. Potongan Pinjaman          Rp. {pinjaman:,.2f}
+            <br/>           c. Potongan Pembiayaan        Rp. {pembiayaan:,.2f}
+            <br/>           Tunggakan                     Rp. {tunggakan:,.2f}
+            <br/><br/>
+            Rincian tagihan:{rincian}<br/><br/>
+
+            2. Demikian kami sampaikan, atas perhatian dan kerjasamanya kami ucapkan terima kasih.<br/><br/>
+
+
+            Hormat Kami,<br/>
+            {company}"""
+
 
 class SimPinMitraNotifSend(models.Model):
     _name = "simpin_syariah.mitra.send"
@@ -318,12 +346,17 @@ class SimPinMitra(models.Model):
     
     def cron_send_notifikasi(self):
         mitra_ids = self.env['simpin_syariah.mitra'].search([('metode_kirim','=','jadwal')])
-        for mitra in mitra_ids:
-            bulan = relativedelta(date.today(),mitra.tanggal_kirim)
-            if bulan.months>=1:
-                mitra.action_create_notifikasi()
-                next_kirim = mitra.tanggal_kirim + relativedelta(months=1)
-                mitra.update({'tanggal_kirim': next_kirim})
+        due = mitra_ids.filtered(lambda mitra: relativedelta(date.today(),mitra.tanggal_kirim).months>=1)
+        personal = due.filtered(lambda mitra: mitra.notif_metode=='personal')
+        if personal:
+            personal.action_personal_notifikasi()
+        if due:
+            ### action_create_notifikasi mengirim h2h semua mitra sekaligus,
+            ### tetap dijalankan walaupun semua mitra yang jatuh tempo personal
+            due[:1].action_create_notifikasi()
+        for mitra in due:
+            next_kirim = mitra.tanggal_kirim + relativedelta(months=1)
+            mitra.update({'tanggal_kirim': next_kirim})
 
     
     def action_create_notifikasi(self):
@@ -339,89 +372,119 @@ class SimPinMitra(models.Model):
             self.action_dbh2h_notifikasi(mitra)
             
 
-    def action_personal_notifikasi(self):
-        list_anggota = self.env['simpin_syariah.member'].search([('mitra_id','=',self.id),('state','=','done')])
-#        raise UserError(_('member %s')%(list_anggota,))
-        for anggota in list_anggota:
-            simpanan_total = pinjaman_total = pembiayaan_total = 0.0
-            attachment = []
-            for simpanan in anggota.simpanan_ids:
-                if simpanan.product_id.product_tmpl_id.name.upper()=='SIMPANAN WAJIB':
-                    simpanan_total=simpanan.product_id.product_tmpl_id.minimal_setor
-
-            invoice_lines = self.env['account.invoice'].search([
-                                                                ('partner_id','=',anggota.partner_id.id),
-                                                                ('type','=','out_invoice'),
-                                                                ('state','=','open')
-                                                                ])
-            if invoice_lines:
-                for line in invoice_lines:
-                    if line.pinjaman_id:
-                        pinjaman_total+=line.amount_total
-                    elif line.pembiayaan_id:
-                        pembiayaan_total+=line.amount_total
-
-                    pdf = self.env.ref('account.account_invoices').sudo().render_qweb_pdf([line.id])[0]
-                    attach = self.env['ir.attachment'].create({
-                            'name': line.number.replace('/','_') + ".pdf",
-                            'type': 'binary',
-                            'res_id': line.id,
-                            'res_model': 'account.invoice',
-                            'datas': base64.b64encode(pdf),
-                            'mimetype': 'application/x-pdf',
-                            'datas_fname': line.number.replace('/','_') + ".pdf"
-                            })
-                    attachment += [(6,0,attach.ids)]
-                
+    def _get_notifikasi_rows(self, tanggal):
+        """ Tagihan jatuh tempo bulan ini dan tunggakan semua anggota aktif
+            mitra di self, dikelompokkan per anggota dalam satu query. """
+        self.env['account.move'].flush(['partner_id', 'move_type', 'state', 'payment_state', 'name',
+                                         'invoice_date_due', 'amount_residual', 'pinjaman_id', 'pembiayaan_id'])
+        self.env['simpin_syariah.member'].flush(['mitra_id', 'state', 'partner_id', 'email', 'name'])
+        self.env.cr.execute("""
+            SELECT m.id, m.mitra_id, m.name, m.email,
+                   COALESCE(SUM(am.amount_residual) FILTER (WHERE am.pinjaman_id IS NOT NULL), 0),
+                   COALESCE(SUM(am.amount_residual) FILTER (WHERE am.pinjaman_id IS NULL
+                                                             AND am.pembiayaan_id IS NOT NULL), 0),
+                   COALESCE(SUM(am.amount_residual) FILTER (WHERE am.invoice_date_due < %(today)s), 0),
+                   array_remove(array_agg(am.name ORDER BY am.invoice_date_due, am.id), NULL),
+                   array_remove(array_agg(am.invoice_date_due ORDER BY am.invoice_date_due, am.id), NULL),
+                   array_remove(array_agg(am.amount_residual ORDER BY am.invoice_date_due, am.id), NULL)
+            FROM simpin_syariah_member m
+            LEFT JOIN account_move am
+                   ON am.partner_id = m.partner_id
+                  AND am.move_type = 'out_invoice'
+                  AND am.state = 'posted'
+                  AND am.payment_state IN ('not_paid', 'partial')
+                  AND am.invoice_date_due <= %(due)s
+            WHERE m.mitra_id IN %(mitra_ids)s AND m.state = 'done'
+            GROUP BY m.id, m.mitra_id, m.name, m.email
+            ORDER BY m.mitra_id, m.id
+        """, {
+            'today': tanggal,
+            'due': tanggal + relativedelta(day=31),
+            'mitra_ids': tuple(self.ids) or (None,),
+        })
+        return self.env.cr.fetchall()
+
+    def _get_simpanan_wajib(self, member_ids):
+        """ Setoran SIMPANAN WAJIB per anggota {member_id: nominal} """
+        result = {}
+        rekening = self.env['simpin_syariah.rekening'].search([('member_id','in',member_ids),
+                                                               ('product_id.name','=ilike','simpanan wajib')])
+        for simpanan in rekening:
+            result[simpanan.member_id.id] = simpanan.product_id.product_tmpl_id.minimal_setor
+        return result
+
+    def action_personal_notifikasi(self, dry_run=False):
+        """ Notifikasi tagihan ke email pribadi semua anggota mitra di self.
+
+            Pesan dirender dari NOTIFIKASI_TEMPLATE lalu diantrikan dengan
+            create mail.mail massal; pengiriman dilakukan antrian email secara
+            bertahap. `dry_run` hanya merender pesan tanpa membuat email. """
+        start = time.time()
+        tanggal = date.today()
+        rows = self._get_notifikasi_rows(tanggal)
+        simpanan_wajib = self._get_simpanan_wajib([row[0] for row in rows])
+        company_name = {mitra.id: html_escape(mitra.company_id.name) for mitra in self}
+        periode = datetime.strftime(tanggal,'%B %Y')
+        mail_vals, send_vals = [], []
+        for member_id, mitra_id, name, email, pinjaman_total, pembiayaan_total, tunggakan, \
+                inv_names, inv_dates, inv_amounts in rows:
+            if not email:
+                continue
+            simpanan_total = simpanan_wajib.get(member_id, 0.0)
             total = simpanan_total + pinjaman_total + pembiayaan_total
-            message = """
-            Dengan Hormat, <br/><br/>
-
-            1. Bersama surat ini kami sampaikan Pemberitahuan Tagihan Pembiayaan Syariah """
-            message += anggota.name
-            message += " periode " + datetime.strftime(date.today(),'%B %Y') 
-            message += "<br/>           sebesar Rp. " + str(f"{total:,.2f}") + " dengan rincian sebagai berikut:"
-        
-            message += "<br/>           a. Simpanan Wajib dan Pokok   Rp. "  + str(f"{simpanan_total:,.2f}")
-            message += "<br/>           b. Potongan Pinjaman          Rp. "  + str(f"{pinjaman_total:,.2f}")
-            message += "<br/>           c. Potongan Pembiayaan        Rp. "  +  str(f"{pembiayaan_total:,.2f}")
-
-            message += """<br/>
-               (rincian terlampir)<br/>
-
-            2. Demikian kami sampaikan, atas perhatian dan kerjasamanya kami ucapkan terima kasih.<br/><br/>
-        
-        
-            Hormat Kami,<br/>
-            """ + self.company_id.name
-
-            vals = {
+            rincian = ''.join(NOTIFIKASI_RINCIAN.format(name=html_escape(inv_name), date_due=inv_date, amount=inv_amount)
+                              for inv_name, inv_date, inv_amount in zip(inv_names, inv_dates, inv_amounts))
+            message = NOTIFIKASI_TEMPLATE.format(
+                anggota=html_escape(name),
+                periode=periode,
+                total=total,
+                simpanan=simpanan_total,
+                pinjaman=pinjaman_total,
+                pembiayaan=pembiayaan_total,
+                tunggakan=tunggakan,
+                rincian=rincian,
+                company=company_name[mitra_id],
+                )
+            mail_vals.append({
                 'subject': 'Notifikasi Tagihan',
                 'body_html': message,
-                'email_to': anggota.email,
+                'email_to': email,
                 'email_cc': '',
                 'auto_delete': False,
                 'email_from': 'odoo@kopindosat.co.id',
-                }
-
-#            raise UserError(_('message %s - %s - %s')%(vals,invoice_lines,attachment,))
-            mail_id = self.env['mail.mail'].sudo().create(vals)
-            mail_id.mail_message_id.attachment_ids = attachment
-#            raise UserError(_('mail_id %s \n mail_message_id %s attachment_ids %s')%(mail_id,mail_id.mail_message_id,mail_id.mail_message_id.attachment_ids,))
-            mail_id.sudo().send()
-            notif_send = self.env['simpin_syariah.mitra.send'].create({
-                                'name': 'Notifikasi Personal',
-                                'tanggal': date.today(),
-                                'mitra_id': self.id,
-                                'email': anggota.email,
-                                'message': message,
-                                'total_simpanan': total_simpanan,
-                                'total_pinjaman': total_pinjaman,
-                                'total_pembiayaan': total_pembiayaan,
-                                'total_investasi': total_investasi,
-                                'notif_metode': anggota.notif_metode,
-                                'state': 'sent',
-                            })
+                })
+            send_vals.append({
+                'name': 'Notifikasi Personal',
+                'tanggal': tanggal,
+                'mitra_id': mitra_id,
+                'email': email,
+                'message': message,
+                'total_simpanan': simpanan_total,
+                'total_pinjaman': pinjaman_total,
+                'total_pembiayaan': pembiayaan_total,
+                'notif_metode': 'personal',
+                'state': 'queued',
+                })
+
+        if not dry_run:
+            for index in range(0, len(mail_vals), NOTIFIKASI_BATCH_SIZE):
+                self.env['mail.mail'].sudo().create(mail_vals[index:index + NOTIFIKASI_BATCH_SIZE])
+            self.env['simpin_syariah.mitra.send'].create(send_vals)
+
+        elapsed = time.time() - start
+        result = {
+            'members': len(rows),
+            'messages': len(mail_vals),
+            'seconds': round(elapsed, 2),
+            'per_second': round(len(mail_vals) / elapsed, 1) if elapsed else 0.0,
+            'dry_run': dry_run,
+            }
+        _logger.info('Notifikasi personal%s: %s pesan untuk %s anggota dalam %.2fs (%.1f pesan/detik)',
+                     ' (dry run)' if dry_run else '', result['messages'], result['members'],
+                     elapsed, result['per_second'])
+        if dry_run:
+            result['preview'] = mail_vals[:NOTIFIKASI_PREVIEW]
+        return result
         
     def action_send_email_notifikasi(self,subject,message,email_to,att_name,att_file,att_data):
             body = """
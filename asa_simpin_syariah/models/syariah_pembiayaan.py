@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 # Part of Akun+. See LICENSE file for full copyright and licensing details.
 
+from calendar import monthrange
 from datetime import datetime, timedelta, date
 from functools import partial
 from itertools import groupby
@@ -259,6 +260,7 @@ class SimPinPembiayaan(models.Model):
     payment_id = fields.Many2one('account.payment', string='Pencairan')
     journal_id = fields.Many2one('account.journal', string='Journal', related='akad_id.journal_id')
     biaya_lines = fields.One2many('pembiayaan.biaya', 'pembiayaan_id',  string='Komponen Biaya')
+    angsuran_lines = fields.One2many('pembiayaan.angsuran', 'pembiayaan_id', string='Jadwal Angsuran', copy=False)
     allowance_lines = fields.One2many('pembiayaan.biaya.deduction', 'pembiayaan_id',  string='Komponen Biaya Deduction')
     deduction_lines = fields.One2many('pembiayaan.biaya.allowance', 'pembiayaan_id',  string='Komponen Biaya Allowance')
     jumlah_biaya = fields.Monetary(string='Total Biaya', currency_field='currency_id', track_visibility='onchange')
@@ -506,53 +508,110 @@ class SimPinPembiayaan(models.Model):
 #        total = self.total_pembiayaan + self.jumlah_biaya
 
     
-    def cron_update_balance(self):
-        pembiayaan = self.env['simpin_syariah.pembiayaan'].search([('state','in',['active','close'])])
-        for biaya in pembiayaan:
-            balance=biaya.harga_jual
-            paid_inv = self.env['account.invoice'].search([('type_journal','=','tagihan'),
-                                                            ('pembiayaan_id','=',biaya.id),
-                                                            ('state','=','paid'),
-                                                            ],order='date_invoice desc',limit=1)
-            open_inv = self.env['account.invoice'].search([('type_journal','=','tagihan'),
-                                                            ('pembiayaan_id','=',biaya.id),
-                                                            ('state','=','open'),
-                                                            ],order='date_invoice desc')
-            bulan_last = relativedelta(paid_inv.date_invoice,biaya.tanggal_akad)
-            bulan_biaya = (bulan_last.years*12) + bulan_last.months 
-            if bulan_biaya>biaya.periode_angsuran:
-                balance = 0
-            else:
-                balance = biaya.harga_jual - (biaya.angsuran*bulan_biaya)
-            
-            tunggakan = 0
-            for inv in open_inv:
-                tunggakan += inv.residual
-#            raise UserError(_('pembiayaan %s : %s == %s')%(biaya.name,balance,tunggakan))
-            biaya.write({'balance': balance,'tunggakan': tunggakan})
+    BALANCE_SYNC_PARAM = 'simpin_syariah.pembiayaan_balance_sync'
 
+    @api.model
+    def _get_balance_rows(self, since=False):
+        """ Angsuran terbayar terakhir dan tunggakan per pembiayaan, dihitung
+            sekaligus dari invoice angsuran (out_invoice posted).
+            Jika `since` diisi hanya pembiayaan dengan invoice / data yang
+            berubah setelah waktu tersebut yang diambil. """
+        self.env['account.move'].flush(['pembiayaan_id', 'move_type', 'state', 'payment_state',
+                                         'invoice_date', 'amount_residual'])
+        self.flush(['state', 'harga_jual', 'angsuran', 'periode_angsuran', 'tanggal_akad',
+                    'balance', 'tunggakan'])
+        where_since = ''
+        params = []
+        if since:
+            where_since = """
+                AND (p.write_date > %s OR p.id IN (
+                    SELECT pembiayaan_id FROM account_move
+                    WHERE pembiayaan_id IS NOT NULL AND write_date > %s))"""
+            params = [since, since]
+        self.env.cr.execute("""
+            SELECT p.id, p.harga_jual, p.angsuran, p.periode_angsuran, p.tanggal_akad,
+                   p.balance, p.tunggakan, inv.last_paid, COALESCE(inv.tunggakan, 0)
+            FROM simpin_syariah_pembiayaan p
+            LEFT JOIN (
+                SELECT pembiayaan_id,
+                       MAX(invoice_date) FILTER (WHERE payment_state IN ('paid', 'in_payment')) AS last_paid,
+                       SUM(amount_residual) FILTER (WHERE payment_state IN ('not_paid', 'partial')) AS tunggakan
+                FROM account_move
+                WHERE pembiayaan_id IS NOT NULL
+                  AND move_type = 'out_invoice'
+                  AND state = 'posted'
+                GROUP BY pembiayaan_id
+            ) inv ON inv.pembiayaan_id = p.id
+            WHERE p.state IN ('active', 'close')""" + where_since, params)
+        return self.env.cr.fetchall()
 
+    @api.model
+    def cron_update_balance(self, incremental=False):
+        """ Hitung ulang balance & tunggakan seluruh pembiayaan aktif/close.
+            Mode incremental hanya memproses pembiayaan yang invoicenya
+            berubah sejak proses terakhir. """
+        params = self.env['ir.config_parameter'].sudo()
+        started = fields.Datetime.now()
+        since = incremental and params.get_param(self.BALANCE_SYNC_PARAM) or False
+        currency = self.env.company.currency_id
+
+        to_write = {}
+        for (pembiayaan_id, harga_jual, angsuran, periode_angsuran, tanggal_akad,
+                old_balance, old_tunggakan, last_paid, tunggakan) in self._get_balance_rows(since):
+            bulan_biaya = 0
+            if last_paid and tanggal_akad:
+                bulan_last = relativedelta(last_paid, tanggal_akad)
+                bulan_biaya = (bulan_last.years*12) + bulan_last.months
+            if bulan_biaya > (periode_angsuran or 0):
+                balance = 0
+            else:
+                balance = (harga_jual or 0) - ((angsuran or 0)*bulan_biaya)
+            balance = currency.round(balance)
+            tunggakan = currency.round(tunggakan)
+            if currency.compare_amounts(balance, old_balance or 0) or \
+                    currency.compare_amounts(tunggakan, old_tunggakan or 0):
+                to_write.setdefault((balance, tunggakan), []).append(pembiayaan_id)
+
+        for (balance, tunggakan), pembiayaan_ids in to_write.items():
+            self.browse(pembiayaan_ids).write({'balance': balance, 'tunggakan': tunggakan})
+        params.set_param(self.BALANCE_SYNC_PARAM, fields.Datetime.to_string(started))
+        return sum(len(ids) for ids in to_write.values())
 
+    @api.model
     def cron_recount_pembiayaan(self):
         product = self.env['product.product'].search([('is_syariah', '=', True),
                                                       '|',('product_tmpl_id.categ_id.parent_id.name', '=', 'Pembiayaan'),
                                                       ('product_tmpl_id.categ_id.name', '=', 'Pembiayaan')
                                                           ])
-        if product:
-            for line in product:
-                total_pengajuan = total_pembiayaan = 0.0
-                pembiayaan = self.env['simpin_syariah.pembiayaan'].search([('product_id','=',line.id)])
-                if pembiayaan:
-                    for pline in pembiayaan:
-                        if pline.state=='active' or pline.state=='approve':
-                            total_pembiayaan += pline.total_pembiayaan
-                        else:
-                            total_pengajuan += pline.total_pembiayaan
-
-                if total_pembiayaan==0.0 and total_pengajuan==0.0 and line.product_tmpl_id.state!='draft' and line.product_tmpl_id.state!='open':
-                    line.product_tmpl_id.write({'total_pengajuan': total_pengajuan, 'total_pembiayaan': total_pembiayaan,  'state': 'close',})
-                else:
-                    line.product_tmpl_id.write({'total_pengajuan': total_pengajuan, 'total_pembiayaan': total_pembiayaan,'state': 'open',})
+        if not product:
+            return
+        self.flush(['product_id', 'state', 'total_pembiayaan'])
+        self.env.cr.execute("""
+            SELECT product_id,
+                   COALESCE(SUM(total_pembiayaan) FILTER (WHERE state IN ('active', 'approve')), 0),
+                   COALESCE(SUM(total_pembiayaan) FILTER (WHERE state NOT IN ('active', 'approve')), 0)
+            FROM simpin_syariah_pembiayaan
+            WHERE product_id IN %s
+            GROUP BY product_id""", (tuple(product.ids),))
+        totals = {row[0]: row[1:] for row in self.env.cr.fetchall()}
+
+        template_vals = {}
+        for line in product:
+            total_pembiayaan, total_pengajuan = totals.get(line.id, (0.0, 0.0))
+            template = line.product_tmpl_id
+            if total_pembiayaan==0.0 and total_pengajuan==0.0 and template.state!='draft' and template.state!='open':
+                state = 'close'
+            else:
+                state = 'open'
+            template_vals[template] = {'total_pengajuan': total_pengajuan, 'total_pembiayaan': total_pembiayaan, 'state': state}
+
+        to_write = {}
+        for template, vals in template_vals.items():
+            if any(template[fname] != value for fname, value in vals.items()):
+                to_write.setdefault(tuple(sorted(vals.items())), self.env['product.template'])
+                to_write[tuple(sorted(vals.items()))] |= template
+        for vals, templates in to_write.items():
+            templates.write(dict(vals))
             
 
     def calc_total_pembiayaan(self):
@@ -576,45 +635,71 @@ class SimPinPembiayaan(models.Model):
         angsuran = present_value / (1-((1 + interest_rate)**-periode_angsuran))
         return angsuran
 
-    def get_data_angsuran(self):
-        periode = self.periode_angsuran
-        angsuran = self.angsuran
-        if self.tanggal_akad:
-            bulan = self.tanggal_akad
-        else:
-            bulan = date.today()
-            
-        if self.jurnal_biaya=='biaya_murabahah':
-            pokok_pinjaman = self.total_pembiayaan - self.jumlah_um
-            angsuran_margin = pokok_pinjaman * (self.margin/1200)
-            angsuran_pokok = angsuran - angsuran_margin
-        else:
-            pokok_pinjaman = self.total_pembiayaan
-            angsuran_margin = pokok_pinjaman * (self.margin/1200)
-            angsuran_pokok = angsuran - angsuran_margin
-
+    @api.model
+    def _angsuran_schedule(self, pokok_pinjaman, margin, angsuran, periode, tanggal):
+        """ Tabel angsuran (pokok/margin) lengkap dalam satu putaran, tanpa
+            relativedelta per baris. Hasil identik dengan perhitungan lama. """
+        rate = margin/1200
+        angsuran_margin = pokok_pinjaman * rate
+        angsuran_pokok = angsuran - angsuran_margin
+        angsuran_bulanan = round(angsuran,0)
+        year, month, day = tanggal.year, tanggal.month, tanggal.day
         result = []
         for i in range(1,periode+1):
-            isi_data ={}
-            bulan += relativedelta(months=1)
+            month += 1
+            if month > 12:
+                year += 1
+                month = 1
             if i>1:
-#                pokok_pinjaman = self.total_pembiayaan
-#                angsuran_margin = pokok_pinjaman * (self.margin/1200)
-#                angsuran_pokok = angsuran - angsuran_margin
-#            else:
                 pokok_pinjaman -= angsuran_pokok
-                angsuran_margin = pokok_pinjaman * (self.margin/1200)
+                angsuran_margin = pokok_pinjaman * rate
                 angsuran_pokok = angsuran - angsuran_margin
+            result.append({
+                'no': i,
+                'periode': date(year, month, 1).strftime('%B %Y'),
+                'tanggal': date(year, month, min(day, monthrange(year, month)[1])),
+                'pokok_pinjaman': round(pokok_pinjaman,0),
+                'angsuran_pokok': round(angsuran_pokok,0),
+                'angsuran_margin': round(angsuran_margin,0),
+                'angsuran_bulanan': angsuran_bulanan,
+            })
+        return result
 
-            isi_data['no'] = i
-            isi_data['periode'] = datetime.strftime(bulan,'%B %Y')
-            isi_data['pokok_pinjaman'] = round(pokok_pinjaman,0)
-            isi_data['angsuran_pokok'] = round(angsuran_pokok,0)
-            isi_data['angsuran_margin'] = round(angsuran_margin,0)
-            isi_data['angsuran_bulanan'] = round(angsuran,0)
-        
-            result.append(isi_data)
-        return result  
+    def _get_angsuran_params(self):
+        self.ensure_one()
+        if self.jurnal_biaya=='biaya_murabahah':
+            pokok_pinjaman = self.total_pembiayaan - self.jumlah_um
+        else:
+            pokok_pinjaman = self.total_pembiayaan
+        return (pokok_pinjaman, self.margin, self.angsuran, self.periode_angsuran,
+                self.tanggal_akad or date.today())
+
+    def get_data_angsuran_batch(self):
+        """ Jadwal angsuran untuk banyak pembiayaan sekaligus {id: rows} """
+        return {rec.id: self._angsuran_schedule(*rec._get_angsuran_params()) for rec in self}
+
+    def get_data_angsuran(self):
+        result = self._angsuran_schedule(*self._get_angsuran_params())
+        for row in result:
+            del row['tanggal']
+        return result
+
+    def generate_angsuran_lines(self):
+        """ Simpan jadwal angsuran semua pembiayaan di self dengan satu create """
+        self.mapped('angsuran_lines').unlink()
+        vals_list = []
+        for pembiayaan_id, rows in self.get_data_angsuran_batch().items():
+            for row in rows:
+                vals_list.append({
+                    'pembiayaan_id': pembiayaan_id,
+                    'no': row['no'],
+                    'tanggal': row['tanggal'],
+                    'pokok_pinjaman': row['pokok_pinjaman'],
+                    'angsuran_pokok': row['angsuran_pokok'],
+                    'angsuran_margin': row['angsuran_margin'],
+                    'angsuran_bulanan': row['angsuran_bulanan'],
+                })
+        return self.env['pembiayaan.angsuran'].create(vals_list)
 
     def update_data(self):
         pelunasan = tagihan = False
@@ -1198,6 +1283,7 @@ class SimPinPembiayaan(models.Model):
                 self.write({ 'state': 'approve',
                             'balance': self.total_pembiayaan + self.jumlah_biaya,
                             'name': rekno,})   
+            self.generate_angsuran_lines()
                 
     def prepare_po_vals(self,origin,po_lines):
         print ("============po line============", po_lines)
@@ -1761,33 +1847,95 @@ class SimPinPembiayaan(models.Model):
 
 
     
+    def _prepare_tagihan_invoice_vals(self, tanggal_inv, akad_journals, schedule=None):
+        ''' Nilai invoice tagihan angsuran bulan `tanggal_inv` (account.move),
+            diambil dari jadwal angsuran yang disimpan saat approval; jadwal
+            dihitung ulang hanya untuk pembiayaan tanpa angsuran_lines '''
+        self.ensure_one()
+        bulan = relativedelta(tanggal_inv, self.tanggal_akad)
+        bulan = bulan.years*12 + bulan.months
+        if bulan<1:
+            return False
+        if self.angsuran_lines:
+            row = self.angsuran_lines.filtered(lambda line: line.no == bulan)[:1]
+            if not row:
+                return False
+        else:
+            schedule = schedule or self._angsuran_schedule(*self._get_angsuran_params())
+            if bulan>len(schedule):
+                return False
+            row = schedule[bulan-1]
+        invoice_lines = []
+        for line in akad_journals.get((self.akad_id.id, 'tagihan'), []):
+            if line.coa_debet and line.coa_kredit:
+                coa_name = 'Angsuran Margin : ' + self.name + " - " + self.member_id.name
+                amount = row['angsuran_margin']
+            elif line.coa_debet:
+                coa_name = 'Angsuran Pokok : ' + self.name + " - " + self.member_id.name
+                amount = row['angsuran_pokok']
+            else:
+                continue
+            invoice_lines += [(0, 0, {
+                'name': coa_name,
+                'account_id': line.coa_debet.id,
+                'price_unit': amount,
+                'quantity': 1.0,
+                'product_id': self.product_id.id,
+                'analytic_account_id': self.account_analytic_id.id or False,
+                })]
+        if not invoice_lines:
+            return False
+        return {
+            'partner_id': self.member_id.partner_id.id,
+            'ref': self.name,
+            'invoice_date': tanggal_inv,
+            'move_type': 'out_invoice',
+            'pembiayaan_id': self.id,
+            'currency_id': self.currency_id.id,
+            'invoice_line_ids': invoice_lines,
+            }
+
     def create_invoice_syariah_daily(self):
+        '''
+        Tagihan angsuran bulanan semua pembiayaan aktif. Invoice dibuat dan
+        diposting per chunk oleh simpin_syariah.invoice.batch.
+        '''
         date_today = date.today()
+        if date_today.day<12:
+            return 0
         pembiayaan = self.env['simpin_syariah.pembiayaan'].search([('state','=','active'),('last_invoice','<',date_today)])
-        counter = 0
-
-        if pembiayaan and date_today.day>=12:
-            for line in pembiayaan:
-                end_periode = relativedelta(date_today,line.tanggal_akad) 
-                end_month = end_periode.years*12 + end_periode.months +1
-#                raise UserError(_('end %s == %s')%(end_month,line.periode_angsuran))
-                last_invoice = self.env['account.invoice'].search([('pembiayaan_id','=',line.id),
-                                                                   ('state','in',['open','paid']),('type_journal','=','tagihan'),
-                                                                   ('type','=','out_invoice'),],order="id desc")
-                if last_invoice:
-                    last_tagihan = relativedelta(date_today,last_invoice[0].date_invoice)
-#                raise UserError(_('rec last_tagihan %s = %s')%(last_tagihan.months,line.last_invoice))
-
-                if end_month>line.periode_angsuran and line.tunggakan==0 and line.balance==0:
-                    line.update({'state': 'close'})
-#                    raise UserError(_('pembiayaan %s - end %s')%(line,end_periode,))
-                elif line.last_invoice and last_tagihan.months>=1:
-#                    raise UserError(_('pembiayaan %s - end %s')%(line,end_periode,))
-                    data_inv = line.create_invoice_syariah_migrasi()  ###
-                
-                    counter += 1
-                if counter>100:
-                    break
+
+        to_close = self.env['simpin_syariah.pembiayaan']
+        due = self.env['simpin_syariah.pembiayaan']
+        for line in pembiayaan:
+            end_periode = relativedelta(date_today,line.tanggal_akad)
+            end_month = end_periode.years*12 + end_periode.months +1
+            if end_month>line.periode_angsuran and line.tunggakan==0 and line.balance==0:
+                to_close |= line
+            elif line.last_invoice and line.last_invoice + relativedelta(months=1)<=date_today \
+                    and line.balance>line.tunggakan:
+                due |= line
+        if to_close:
+            to_close.write({'state': 'close'})
+
+        batch = self.env['simpin_syariah.invoice.batch']
+        akad_journals = batch._get_akad_journals(due.mapped('akad_id'), ['tagihan'])
+
+        def prepare(line):
+            return line._prepare_tagihan_invoice_vals(line.last_invoice + relativedelta(months=1), akad_journals)
+
+        def after_create(records, moves):
+            batch._set_receivable_account(
+                moves, {move.id: move.pembiayaan_id.akad_id.property_account_receivable_id.id for move in moves})
+            by_date = {}
+            for move in moves:
+                by_date.setdefault(move.invoice_date, self.env['simpin_syariah.pembiayaan'])
+                by_date[move.invoice_date] |= move.pembiayaan_id
+            for tanggal, pembiayaan_ids in by_date.items():
+                pembiayaan_ids.write({'last_invoice': tanggal})
+
+        return batch.run('tagihan_pembiayaan', fields.Date.to_string(date_today), due, prepare,
+                         after_create=after_create)
 
 #    
     def create_inv_dp(self,biaya_lines):
@@ -2107,6 +2255,22 @@ class PembiayaanBiaya(models.Model):
     def _onchange_nilai_pct(self):
         self.harga = round(float(self.nilai_pct/100) * float(self.pembiayaan_id.total_pembiayaan),0)
 
+class PembiayaanAngsuran(models.Model):
+    _name = "pembiayaan.angsuran"
+    _description = "Jadwal Angsuran Pembiayaan Anggota Simpin Syariah"
+    _order = "pembiayaan_id, no"
+
+    pembiayaan_id = fields.Many2one('simpin_syariah.pembiayaan', string='Pembiayaan', required=True,
+                                    ondelete='cascade', index=True)
+    no = fields.Integer(string='Angsuran Ke')
+    tanggal = fields.Date(string='Jatuh Tempo')
+    currency_id = fields.Many2one('res.currency', string="Currency", related='pembiayaan_id.currency_id')
+    pokok_pinjaman = fields.Monetary(string='Sisa Pokok', currency_field='currency_id')
+    angsuran_pokok = fields.Monetary(string='Angsuran Pokok', currency_field='currency_id')
+    angsuran_margin = fields.Monetary(string='Angsuran Margin', currency_field='currency_id')
+    angsuran_bulanan = fields.Monetary(string='Angsuran Bulanan', currency_field='currency_id')
+
+
 class PembiayaanBiayaDeduction(models.Model):
     _name = "pembiayaan.biaya.deduction"
     _description = "Komponen Biaya Pembiayaan Deduction Anggota Simpin Syariah"
@@ -218,41 +218,57 @@ class SimPinRekening(models.Model):
         # self.create_invoice()
 
 
-    # def cron_create_invoice(self):
-    #     simpanan = self.env['simpin_syariah.rekening'].search([('member_id.state','=', 'done'),('member_id.mitra_id','=',False)])
-    #     for trans in simpanan:
-    #         if trans.product_id.name == 'SIMPANAN WAJIB':
-    #             for invoice in trans.invoice_ids:
-    #                 # next_month = invoice.invoice_date + timedelta(days=30)
-    #                 # previous_month = date.today() - timedelta(days=30)
-    #                 invoice_month_year = invoice.invoice_date.strftime("%Y-%m")
-    #                 today = datetime.now()
-    #                 month_year = today.strftime("%Y-%m")
-    #                 if invoice.state == 'posted':
-    #                     if invoice_month_year != month_year:
-    #                         print ("#############cron invoice cek##########", invoice.name, trans.product_id.name, invoice_month_year, month_year)
-    #                         conf_sch_inv = self.env['config.schedule'].search([('tipe_schedule','=','invoice')], limit=1)
-    #                         invoice_date = month_year+'-'+conf_sch_inv.date_day
-    #                         invoice_vals = {
-    #                                         'partner_id': trans.partner_id.id,
-    #                                         'invoice_date' : invoice_date,
-    #                                         'state': 'draft',
-    #                                         'move_type': 'out_invoice',
-    #                                         'simpanan_id' : trans.id,
-    #                                         'invoice_line_ids': [{
-    #                                                             'product_id': trans.product_id.id,
-    #                                                             'name': trans.product_id.name,
-    #                                                             'account_id': trans.product_id.property_account_income_id.id,
-    #                                                             'quantity': 1,
-    #                                                             'price_unit': trans.product_id.minimal_setor
-    #                                                         }]
-    #                                         }
-    #                         invoice = self.env['account.move'].sudo().create(invoice_vals)
-    #                         movelines = self.env['account.move.line'].search([('move_id','=',invoice.id),('account_id.code','=','112100321')])
-    #                         if movelines:
-    #                             print ("==============movelines=============", movelines.account_id.code, invoice, trans.akad_id.property_account_receivable_id.code)
-    #                             movelines.write({'account_id' : trans.akad_id.property_account_receivable_id.id})
-    #                         invoice.action_post()
+    def _get_invoice_month_state(self, month_start):
+        """ Per rekening: (punya tagihan posted, sudah ditagih bulan ini) """
+        self.env['account.move'].flush(['simpanan_id', 'move_type', 'state', 'invoice_date'])
+        self.env.cr.execute("""
+            SELECT simpanan_id,
+                   bool_or(state = 'posted'),
+                   bool_or(state != 'cancel' AND invoice_date >= %s)
+            FROM account_move
+            WHERE simpanan_id IN %s AND move_type = 'out_invoice'
+            GROUP BY simpanan_id
+        """, (month_start, tuple(self.ids) or (None,)))
+        return {row[0]: row[1:] for row in self.env.cr.fetchall()}
+
+    def _prepare_wajib_invoice_vals(self, invoice_date):
+        self.ensure_one()
+        return {
+            'partner_id': self.partner_id.id,
+            'invoice_date': invoice_date,
+            'state': 'draft',
+            'move_type': 'out_invoice',
+            'simpanan_id': self.id,
+            'invoice_line_ids': [(0, 0, {
+                'product_id': self.product_id.id,
+                'name': self.product_id.name,
+                'account_id': self.product_id.property_account_income_id.id,
+                'quantity': 1,
+                'price_unit': self.product_id.minimal_setor,
+            })],
+        }
+
+    def cron_create_invoice(self):
+        """ Tagihan bulanan SIMPANAN WAJIB, dibuat massal per chunk """
+        today = fields.Date.context_today(self)
+        month_start = today.replace(day=1)
+        conf_sch_inv = self.env['config.schedule'].search([('tipe_schedule','=','invoice')], limit=1)
+        invoice_date = month_start.replace(day=int(conf_sch_inv.date_day or 1))
+
+        simpanan = self.search([('member_id.state','=', 'done'),('member_id.mitra_id','=',False),
+                                ('product_id.name','=','SIMPANAN WAJIB'),('state','=','active')])
+        month_state = simpanan._get_invoice_month_state(month_start)
+        simpanan = simpanan.filtered(lambda rek: month_state.get(rek.id, (False, False))[0]
+                                     and not month_state[rek.id][1])
+
+        def after_create(records, moves):
+            self.env['simpin_syariah.invoice.batch']._set_receivable_account(
+                moves, {move.id: move.simpanan_id.akad_id.property_account_receivable_id.id for move in moves})
+
+        return self.env['simpin_syariah.invoice.batch'].run(
+            'simpanan_wajib', month_start.strftime('%Y-%m'), simpanan,
+            lambda rek: rek._prepare_wajib_invoice_vals(invoice_date),
+            after_create=after_create)
 
 
     # def create_invoice(self):
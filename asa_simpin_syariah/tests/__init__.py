@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+
+from . import test_jadwal_angsuran
+from . import test_invoice_batch
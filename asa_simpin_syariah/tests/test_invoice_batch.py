@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+from odoo.tests.common import tagged
+
+
+@tagged('post_install', '-at_install')
+class TestInvoiceBatch(AccountTestInvoicingCommon):
+
+    @classmethod
+    def setUpClass(cls, chart_template_ref=None):
+        super().setUpClass(chart_template_ref=chart_template_ref)
+        cls.batch = cls.env['simpin_syariah.invoice.batch']
+        cls.partners = cls.env['res.partner'].create([{'name': 'Anggota %s' % i} for i in range(5)])
+
+    def _prepare(self, partner):
+        if partner == self.partners[2]:
+            return False
+        return {
+            'partner_id': partner.id,
+            'invoice_date': '2021-01-15',
+            'move_type': 'out_invoice',
+            'invoice_line_ids': [(0, 0, {
+                'product_id': self.product_a.id,
+                'quantity': 1,
+                'price_unit': 100.0,
+            })],
+        }
+
+    def _moves(self):
+        return self.env['account.move'].search([('partner_id', 'in', self.partners.ids)])
+
+    def test_chunks_posted_and_resumable(self):
+        created = []
+        count = self.batch.run('test', '2021-01', self.partners, self._prepare,
+                               after_create=lambda records, moves: created.append((records, moves)),
+                               chunk_size=2)
+        self.assertEqual(count, 4)
+        self.assertEqual(len(created), 3)
+        for records, moves in created:
+            self.assertEqual(moves.mapped('partner_id'), records)
+        moves = self._moves()
+        self.assertEqual(len(moves), 4)
+        self.assertEqual(set(moves.mapped('state')), {'posted'})
+        self.assertEqual(self.batch._get_cursor('test', '2021-01'), self.partners[-1].id)
+
+        # Same run resumes after the last processed record, a new run restarts.
+        self.assertEqual(self.batch.run('test', '2021-01', self.partners, self._prepare), 0)
+        self.assertEqual(self.batch._get_cursor('test', '2021-02'), 0)
+
+    def test_resume_from_cursor(self):
+        self.batch._set_cursor('test', '2021-01', self.partners[2].id)
+        count = self.batch.run('test', '2021-01', self.partners, self._prepare, post=False)
+        self.assertEqual(count, 2)
+        self.assertEqual(self._moves().mapped('partner_id'), self.partners[3:])
+        self.assertEqual(set(self._moves().mapped('state')), {'draft'})
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import time
+from datetime import date, datetime
+
+from dateutil.relativedelta import relativedelta
+
+from odoo.tests.common import TransactionCase, tagged
+
+_logger = logging.getLogger(__name__)
+
+
+def legacy_data_angsuran(pokok_pinjaman, margin, angsuran, periode, bulan):
+    """ Perhitungan jadwal angsuran sebelum generator satu putaran """
+    angsuran_margin = pokok_pinjaman * (margin/1200)
+    angsuran_pokok = angsuran - angsuran_margin
+    result = []
+    for i in range(1,periode+1):
+        isi_data ={}
+        bulan += relativedelta(months=1)
+        if i>1:
+            pokok_pinjaman -= angsuran_pokok
+            angsuran_margin = pokok_pinjaman * (margin/1200)
+            angsuran_pokok = angsuran - angsuran_margin
+        isi_data['no'] = i
+        isi_data['periode'] = datetime.strftime(bulan,'%B %Y')
+        isi_data['pokok_pinjaman'] = round(pokok_pinjaman,0)
+        isi_data['angsuran_pokok'] = round(angsuran_pokok,0)
+        isi_data['angsuran_margin'] = round(angsuran_margin,0)
+        isi_data['angsuran_bulanan'] = round(angsuran,0)
+        result.append(isi_data)
+    return result
+
+
+@tagged('post_install', '-at_install')
+class TestJadwalAngsuran(TransactionCase):
+
+    BATCH = 300
+    PERIODE = 120
+
+    def setUp(self):
+        super(TestJadwalAngsuran, self).setUp()
+        self.pembiayaan = self.env['simpin_syariah.pembiayaan']
+
+    def _schedule(self, pokok, margin, periode, tanggal):
+        angsuran = round(self.pembiayaan.calc_pmt(margin, periode, pokok), 0)
+        return self.pembiayaan._angsuran_schedule(pokok, margin, angsuran, periode, tanggal), \
+            legacy_data_angsuran(pokok, margin, angsuran, periode, tanggal)
+
+    def test_schedule_matches_legacy(self):
+        for pokok, margin, periode, tanggal in [
+                (5000000, 12.0, 12, date(2024, 1, 31)),
+                (75000000, 9.5, 60, date(2023, 8, 15)),
+                (250000000, 7.25, 120, date(2022, 12, 1)),
+                (1234567, 18.0, 36, date(2024, 2, 29))]:
+            schedule, legacy = self._schedule(pokok, margin, periode, tanggal)
+            self.assertEqual(len(schedule), periode)
+            for row, legacy_row in zip(schedule, legacy):
+                self.assertEqual(row['tanggal'], tanggal + relativedelta(months=row['no']))
+                row = dict(row)
+                del row['tanggal']
+                self.assertEqual(row, legacy_row)
+
+    def test_benchmark_batch_schedule(self):
+        params = [(10000000 + i * 250000, 8.0 + (i % 7), self.PERIODE, date(2024, 1, 1 + i % 28))
+                  for i in range(self.BATCH)]
+
+        started = time.time()
+        for pokok, margin, periode, tanggal in params:
+            angsuran = round(self.pembiayaan.calc_pmt(margin, periode, pokok), 0)
+            self.pembiayaan._angsuran_schedule(pokok, margin, angsuran, periode, tanggal)
+        elapsed = time.time() - started
+
+        started = time.time()
+        for pokok, margin, periode, tanggal in params:
+            angsuran = round(self.pembiayaan.calc_pmt(margin, periode, pokok), 0)
+            legacy_data_angsuran(pokok, margin, angsuran, periode, tanggal)
+        legacy_elapsed = time.time() - started
+
+        _logger.info('Jadwal angsuran: %s pembiayaan x %s bulan in %.3fs (legacy %.3fs)',
+                     self.BATCH, self.PERIODE, elapsed, legacy_elapsed)
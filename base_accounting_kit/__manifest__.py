@@ -60,6 +60,7 @@
         'data/followup_levels.xml',
         'data/account_asset_data.xml',
         'data/recurring_entry_cron.xml',
+        'data/dashboard_snapshot_cron.xml',
         'data/multiple_invoice_data.xml',
         'views/assets.xml',
         'views/dashboard_views.xml',
@@ -32,6 +32,7 @@ from . import product_template
 from . import recurring_payments
 from . import res_config_settings
 from . import res_partner
+from . import account_dashboard_snapshot
 from . import account_dashboard
 from . import payment_matching
 from . import multiple_invoice
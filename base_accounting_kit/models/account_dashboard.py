@@ -9,6 +9,8 @@ from dateutil.relativedelta import relativedelta
 from odoo import models, api
 from odoo.http import request
 
+from .account_dashboard_snapshot import dashboard_snapshot
+
 
 class DashBoard(models.Model):
     _inherit = 'account.move'
@@ -18,6 +20,7 @@ class DashBoard(models.Model):
     # function to getting income of this year
 
     @api.model
+    @dashboard_snapshot()
     def get_income_this_year(self, *post):
 
         company_id = self.get_current_company_value()
@@ -115,6 +118,7 @@ class DashBoard(models.Model):
     # function to getting income of last year
 
     @api.model
+    @dashboard_snapshot(closed=True)
     def get_income_last_year(self, *post):
 
         company_id = self.get_current_company_value()
@@ -212,6 +216,7 @@ class DashBoard(models.Model):
     # function to getting income of last month
 
     @api.model
+    @dashboard_snapshot(closed=True)
     def get_income_last_month(self, *post):
 
         company_id = self.get_current_company_value()
@@ -315,6 +320,7 @@ class DashBoard(models.Model):
     # function to getting income of this month
 
     @api.model
+    @dashboard_snapshot()
     def get_income_this_month(self, *post):
 
         company_id = self.get_current_company_value()
@@ -415,6 +421,7 @@ class DashBoard(models.Model):
     # function to getting late bills
 
     @api.model
+    @dashboard_snapshot()
     def get_latebills(self, *post):
 
         company_id = self.get_current_company_value()
@@ -464,6 +471,7 @@ class DashBoard(models.Model):
     # function to getting over dues
 
     @api.model
+    @dashboard_snapshot()
     def get_overdues(self, *post):
 
         company_id = self.get_current_company_value()
@@ -508,6 +516,7 @@ class DashBoard(models.Model):
         return records
 
     @api.model
+    @dashboard_snapshot()
     def get_overdues_this_month_and_year(self, *post):
 
         states_arg = ""
@@ -565,6 +574,7 @@ class DashBoard(models.Model):
         return records
 
     @api.model
+    @dashboard_snapshot()
     def get_latebillss(self, *post):
         company_id = self.get_current_company_value()
 
@@ -624,6 +634,7 @@ class DashBoard(models.Model):
         return records
 
     @api.model
+    @dashboard_snapshot(closed=lambda post: post[1:2] != ('this_month',))
     def get_top_10_customers_month(self, *post):
         record_invoice = {}
         record_refund = {}
@@ -705,6 +716,7 @@ class DashBoard(models.Model):
     # function to get total invoice
 
     @api.model
+    @dashboard_snapshot()
     def get_total_invoice(self, *post):
 
         company_id = self.get_current_company_value()
@@ -743,6 +755,7 @@ class DashBoard(models.Model):
         return customer_invoice, credit_note, supplier_invoice, refund
 
     @api.model
+    @dashboard_snapshot()
     def get_total_invoice_current_year(self, *post):
 
         company_id = self.get_current_company_value()
@@ -804,6 +817,7 @@ class DashBoard(models.Model):
         return customer_invoice_current_year, credit_note_current_year, supplier_invoice_current_year, refund_current_year, paid_customer_invoice_current_year, paid_supplier_invoice_current_year, paid_customer_credit_current_year, paid_supplier_refund_current_year
 
     @api.model
+    @dashboard_snapshot()
     def get_total_invoice_current_month(self, *post):
 
         company_id = self.get_current_company_value()
@@ -869,6 +883,7 @@ class DashBoard(models.Model):
         return customer_invoice_current_month, credit_note_current_month, supplier_invoice_current_month, refund_current_month, paid_customer_invoice_current_month, paid_supplier_invoice_current_month, paid_customer_credit_current_month, paid_supplier_refund_current_month, currency
 
     @api.model
+    @dashboard_snapshot()
     def get_total_invoice_this_month(self, *post):
 
         company_id = self.get_current_company_value()
@@ -891,6 +906,7 @@ class DashBoard(models.Model):
     # function to get total invoice last month
 
     @api.model
+    @dashboard_snapshot(closed=True)
     def get_total_invoice_last_month(self):
 
         one_month_ago = (datetime.now() - relativedelta(months=1)).month
@@ -905,6 +921,7 @@ class DashBoard(models.Model):
     # function to get total invoice last year
 
     @api.model
+    @dashboard_snapshot(closed=True)
     def get_total_invoice_last_year(self):
 
         self._cr.execute(''' select sum(amount_total) from account_move where move_type = 'out_invoice' 
@@ -917,6 +934,7 @@ class DashBoard(models.Model):
     # function to get total invoice this year
 
     @api.model
+    @dashboard_snapshot()
     def get_total_invoice_this_year(self):
 
         company_id = self.get_current_company_value()
@@ -932,6 +950,7 @@ class DashBoard(models.Model):
     # function to get unreconcile items
 
     @api.model
+    @dashboard_snapshot()
     def unreconcile_items(self):
         self._cr.execute('''
                             select count(*) FROM account_move_line l,account_account a
@@ -943,6 +962,7 @@ class DashBoard(models.Model):
     # function to get unreconcile items this month
 
     @api.model
+    @dashboard_snapshot()
     def unreconcile_items_this_month(self, *post):
         company_id = self.get_current_company_value()
 
@@ -975,6 +995,7 @@ class DashBoard(models.Model):
     # function to get unreconcile items last month
 
     @api.model
+    @dashboard_snapshot(closed=True)
     def unreconcile_items_last_month(self):
 
         one_month_ago = (datetime.now() - relativedelta(months=1)).month
@@ -989,6 +1010,7 @@ class DashBoard(models.Model):
     # function to get unreconcile items this year
 
     @api.model
+    @dashboard_snapshot()
     def unreconcile_items_this_year(self, *post):
         company_id = self.get_current_company_value()
 
@@ -1313,6 +1335,7 @@ class DashBoard(models.Model):
     # function to get unreconcile items last year
 
     @api.model
+    @dashboard_snapshot(closed=True)
     def unreconcile_items_last_year(self):
 
         self._cr.execute('''  select count(*) FROM account_move_line l,account_account a
@@ -1326,6 +1349,7 @@ class DashBoard(models.Model):
     # function to get total income
 
     @api.model
+    @dashboard_snapshot()
     def month_income(self):
 
         self._cr.execute(''' select sum(debit) as debit , sum(credit) as credit  from account_move, account_account,account_move_line
@@ -1339,6 +1363,7 @@ class DashBoard(models.Model):
     # function to get total income this month
 
     @api.model
+    @dashboard_snapshot()
     def month_income_this_month(self, *post):
         company_id = self.get_current_company_value()
 
@@ -1360,6 +1385,7 @@ class DashBoard(models.Model):
         return record
 
     @api.model
+    @dashboard_snapshot()
     def profit_income_this_month(self, *post):
 
         company_id = self.get_current_company_value()
@@ -1398,6 +1424,9 @@ class DashBoard(models.Model):
 
     def get_current_company_value(self):
 
+        if self.env.context.get('dashboard_company_ids'):
+            return list(self.env.context['dashboard_company_ids'])
+
         cookies_cids = [int(r) for r in request.httprequest.cookies.get('cids').split(",")] \
             if request.httprequest.cookies.get('cids') \
             else [request.env.user.company_id.id]
@@ -1412,6 +1441,7 @@ class DashBoard(models.Model):
         return cookies_cids
 
     @api.model
+    @dashboard_snapshot()
     def profit_income_this_year(self, *post):
         company_id = self.get_current_company_value()
         states_arg = ""
@@ -1449,6 +1479,7 @@ class DashBoard(models.Model):
     # function to get total income last month
 
     @api.model
+    @dashboard_snapshot(closed=True)
     def month_income_last_month(self):
 
         one_month_ago = (datetime.now() - relativedelta(months=1)).month
@@ -1469,6 +1500,7 @@ class DashBoard(models.Model):
     # function to get total income this year
 
     @api.model
+    @dashboard_snapshot()
     def month_income_this_year(self, *post):
 
         company_id = self.get_current_company_value()
@@ -1491,6 +1523,7 @@ class DashBoard(models.Model):
     # function to get total income last year
 
     @api.model
+    @dashboard_snapshot(closed=True)
     def month_income_last_year(self):
 
         self._cr.execute(''' select sum(debit) as debit, sum(credit) as credit from  account_account, account_move_line where
@@ -1521,6 +1554,7 @@ class DashBoard(models.Model):
     # function to get total expense
 
     @api.model
+    @dashboard_snapshot()
     def month_expense(self):
 
         self._cr.execute(''' select sum(debit) as debit , sum(credit) as credit from account_move, account_account,account_move_line
@@ -1534,6 +1568,7 @@ class DashBoard(models.Model):
     # function to get total expense this month
 
     @api.model
+    @dashboard_snapshot()
     def month_expense_this_month(self, *post):
 
         company_id = self.get_current_company_value()
@@ -1560,6 +1595,7 @@ class DashBoard(models.Model):
     # function to get total expense this year
 
     @api.model
+    @dashboard_snapshot()
     def month_expense_this_year(self, *post):
 
         company_id = self.get_current_company_value()
@@ -1584,6 +1620,7 @@ class DashBoard(models.Model):
         return record
 
     @api.model
+    @dashboard_snapshot()
     def bank_balance(self, *post):
 
         company_id = self.get_current_company_value()
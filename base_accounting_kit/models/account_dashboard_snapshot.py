@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+
+import functools
+import json
+import logging
+
+import psycopg2
+
+from odoo import api, fields, models
+from odoo.tools import date_utils
+
+_logger = logging.getLogger(__name__)
+
+SNAPSHOT_LIVE_GROUP = 'account.group_account_manager'
+
+# Names of the account.move methods served from snapshots. The refresh cron
+# looks tiles up here rather than on the resolved method, so an inheriting
+# module may override a tile without re-applying the decorator.
+DASHBOARD_TILES = set()
+
+
+def dashboard_snapshot(closed=False):
+    """ Serve a dashboard tile from `account.dashboard.snapshot`.
+
+    `closed` marks tiles that only look at finished periods (last month,
+    last year); it may also be a callable receiving the tile arguments. """
+    def decorator(method):
+        DASHBOARD_TILES.add(method.__name__)
+
+        @functools.wraps(method)
+        def wrapper(self, *post):
+            is_closed = closed(post) if callable(closed) else closed
+            return self.env['account.dashboard.snapshot']._fetch_tile(
+                self, method.__name__, post, is_closed,
+                lambda: method(self, *post))
+        return wrapper
+    return decorator
+
+
+class AccountDashboardSnapshot(models.Model):
+    _name = 'account.dashboard.snapshot'
+    _description = 'Account Dashboard Snapshot'
+    _order = 'period_key desc, id'
+
+    company_key = fields.Char(string='Companies', required=True, index=True)
+    tile = fields.Char(required=True)
+    args_key = fields.Char(string='Arguments', required=True, default='[]')
+    period_key = fields.Char(string='Period', required=True,
+                             help='Month (YYYY-MM) the snapshot was computed for.')
+    is_closed = fields.Boolean(string='Closed Period')
+    watermark = fields.Char(help='Journal items (count, last id, last update) '
+                                 'the snapshot was computed from.')
+    data = fields.Text()
+    date_computed = fields.Datetime()
+
+    _sql_constraints = [
+        ('tile_period_uniq', 'unique(company_key, tile, args_key, period_key)',
+         'A dashboard snapshot already exists for this tile and period.'),
+    ]
+
+    @api.model
+    def _company_key(self, company_ids):
+        return ',%s,' % ','.join(str(c) for c in sorted(set(company_ids)))
+
+    @api.model
+    def _company_ids(self, company_key):
+        return [int(c) for c in company_key.strip(',').split(',')]
+
+    @api.model
+    def _period_key(self, day=None):
+        return (day or fields.Date.context_today(self)).strftime('%Y-%m')
+
+    @api.model
+    def _is_live_mode(self):
+        if 'dashboard_live' in self.env.context:
+            return bool(self.env.context['dashboard_live'])
+        user = self.env.user
+        return user.dashboard_live_mode and user.has_group(SNAPSHOT_LIVE_GROUP)
+
+    @api.model
+    def _fetch_tile(self, dashboard, tile, post, is_closed, compute):
+        """ Return the stored result of `tile`, computing it on a miss.
+
+        Snapshots are shared by every user looking at the same set of
+        companies, exactly like the raw queries they replace. They are only
+        refreshed by the cron; the request never updates them. """
+        if self._is_live_mode():
+            return compute()
+        company_ids = dashboard.get_current_company_value()
+        key = (self._company_key(company_ids), tile, json.dumps(list(post)),
+               self._period_key())
+        self.env.cr.execute("""
+            SELECT data FROM account_dashboard_snapshot
+            WHERE company_key = %s AND tile = %s AND args_key = %s
+                  AND period_key = %s
+        """, key)
+        row = self.env.cr.fetchone()
+        if row and row[0] is not None:
+            return json.loads(row[0])
+        data = json.dumps(compute(), default=date_utils.json_default)
+        if not row:
+            self._store_new(key, is_closed, data)
+        # Give the caller the same shape a snapshot hit would.
+        return json.loads(data)
+
+    @api.model
+    def _store_new(self, key, is_closed, data):
+        """ Record the first result of a tile. Only a missing row is
+        inserted: refreshing existing snapshots is the cron's job, so a
+        dashboard read never updates a row another transaction may hold. """
+        try:
+            with self.env.cr.savepoint():
+                self.env.cr.execute("""
+                    INSERT INTO account_dashboard_snapshot
+                        (company_key, tile, args_key, period_key, is_closed,
+                         data, date_computed, create_uid, create_date, write_uid, write_date)
+                    VALUES (%s, %s, %s, %s, %s, %s,
+                            now() at time zone 'UTC', %s, now() at time zone 'UTC',
+                            %s, now() at time zone 'UTC')
+                    ON CONFLICT (company_key, tile, args_key, period_key) DO NOTHING
+                """, key + (is_closed, data, self.env.uid, self.env.uid))
+        except psycopg2.Error:
+            # e.g. a concurrent first read of the same tile; it stays a miss
+            _logger.debug("Dashboard snapshot %s not stored", key[1], exc_info=True)
+
+    @api.model
+    def _get_move_line_stats(self, company_ids):
+        """ Count, last id and last update of the journal items of
+        `company_ids`, per company and month. """
+        self.env['account.move.line'].flush(['company_id', 'date'])
+        self.env.cr.execute("""
+            SELECT company_id, to_char(date, 'YYYY-MM'), COUNT(*), MAX(id), MAX(write_date)
+            FROM account_move_line
+            WHERE company_id = ANY(%s)
+            GROUP BY company_id, to_char(date, 'YYYY-MM')
+        """, (list(company_ids),))
+        return self.env.cr.fetchall()
+
+    @api.model
+    def _watermark(self, stats, company_ids, before_period=None):
+        """ Watermark of the journal items of `company_ids`, restricted to
+        the months before `before_period` for closed snapshots. """
+        count, last_id, last_write = 0, 0, None
+        for company_id, period, line_count, max_id, max_write in stats:
+            if company_id not in company_ids or (before_period and period >= before_period):
+                continue
+            count += line_count
+            last_id = max(last_id, max_id)
+            last_write = max(last_write, max_write) if last_write else max_write
+        return '%s/%s/%s' % (count, last_id, last_write or '')
+
+    @api.model
+    def _cron_refresh_snapshots(self):
+        """ Recompute the snapshots of the running month whose journal items
+        changed since they were computed, and drop the open-period snapshots
+        of previous months. """
+        self.env.cr.execute("""
+            DELETE FROM account_dashboard_snapshot
+            WHERE is_closed IS NOT TRUE AND period_key < %s
+        """, (self._period_key(),))
+        snapshots = self.search([('period_key', '=', self._period_key())])
+        company_ids = {c for key in set(snapshots.mapped('company_key'))
+                       for c in self._company_ids(key) if c}
+        stats = self._get_move_line_stats(company_ids)
+        dashboard = self.env['account.move']
+        for snapshot in snapshots:
+            if snapshot.tile not in DASHBOARD_TILES:
+                snapshot.unlink()
+                continue
+            company_ids = self._company_ids(snapshot.company_key)
+            watermark = self._watermark(
+                stats, company_ids, snapshot.period_key if snapshot.is_closed else None)
+            if snapshot.watermark == watermark:
+                continue
+            # Bypass the snapshot read and store the fresh value ourselves.
+            method = getattr(dashboard.with_context(
+                dashboard_live=True, dashboard_company_ids=company_ids), snapshot.tile)
+            result = method(*json.loads(snapshot.args_key))
+            snapshot.write({
+                'data': json.dumps(result, default=date_utils.json_default),
+                'watermark': watermark,
+                'date_computed': fields.Datetime.now(),
+            })
+
+    @api.model
+    def get_live_mode(self):
+        return {
+            'allowed': self.env.user.has_group(SNAPSHOT_LIVE_GROUP),
+            'live': self._is_live_mode(),
+        }
+
+    @api.model
+    def set_live_mode(self, live):
+        if self.env.user.has_group(SNAPSHOT_LIVE_GROUP):
+            self.env.user.sudo().dashboard_live_mode = bool(live)
+        return self.get_live_mode()
+
+
+class ResUsers(models.Model):
+    _inherit = 'res.users'
+
+    dashboard_live_mode = fields.Boolean(
+        string='Live Accounting Dashboard',
+        help='Compute the accounting dashboard tiles directly instead of '
+             'reading the stored snapshots.')
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 import copy
+import re
 from odoo import api, fields, models, _
 from odoo.exceptions import UserError
 from odoo.osv import expression
@@ -186,6 +187,12 @@ class AccountReconciliation(models.AbstractModel):
             partner_map = self._get_bank_statement_line_partners(bank_statement_lines)
             matching_amls = reconcile_model._apply_rules(bank_statement_lines, excluded_ids=excluded_ids, partner_map=partner_map)
 
+        # Move lines already proposed by the reconciliation models must not be proposed again by the candidate index.
+        used_aml_ids = set(excluded_ids)
+        for matching in matching_amls.values():
+            used_aml_ids.update(matching.get('aml_ids') or [])
+        candidate_index = None
+
         # Iterate on st_lines to keep the same order in the results list.
         bank_statements_left = self.env['account.bank.statement']
         for line in bank_statement_lines:
@@ -195,6 +202,11 @@ class AccountReconciliation(models.AbstractModel):
                 results['reconciled_aml_ids'] += reconciled_move_lines and reconciled_move_lines.ids or []
             else:
                 aml_ids = matching_amls[line.id]['aml_ids']
+                if not aml_ids and matching_amls[line.id].get('status') != 'write_off':
+                    if candidate_index is None:
+                        candidate_index = self._get_reconciliation_candidate_index(bank_statement_lines, excluded_ids=used_aml_ids)
+                    aml_ids = self._get_candidate_proposition(candidate_index, line, line.partner_id.id or partner_map.get(line.id), used_aml_ids)
+                    used_aml_ids.update(aml_ids)
                 bank_statements_left += line.statement_id
                 target_currency = line.currency_id or line.journal_id.currency_id or line.journal_id.company_id.currency_id
 
@@ -433,12 +445,16 @@ class AccountReconciliation(models.AbstractModel):
             mode = 'customers' if account_type == 'receivable' else 'suppliers'
 
         # Fetch other data
+        propositions = {}
+        if not aml_ids:
+            propositions = self._get_move_line_reconciliation_propositions(
+                [(row['account_id'], is_partner and row['partner_id'] or None) for row in rows])
         for row in rows:
             account = Account.browse(row['account_id'])
             currency = account.currency_id or account.company_id.currency_id
             row['currency_id'] = currency.id
             partner_id = is_partner and row['partner_id'] or None
-            rec_prop = aml_ids and self.env['account.move.line'].browse(aml_ids) or self._get_move_line_reconciliation_proposition(account.id, partner_id)
+            rec_prop = aml_ids and self.env['account.move.line'].browse(aml_ids) or propositions[(account.id, partner_id)]
             row['reconciliation_proposition'] = self._prepare_move_lines(rec_prop, target_currency=currency)
             row['mode'] = mode
             row['company_id'] = account.company_id.id
@@ -811,6 +827,158 @@ class AccountReconciliation(models.AbstractModel):
             return Account_move_line.browse(pairs[0])
         return Account_move_line
 
+    @api.model
+    def _get_move_line_reconciliation_propositions(self, keys):
+        """ Batched _get_move_line_reconciliation_proposition: the open lines of all the
+            requested accounts are read once and paired in memory.
+
+            :param keys: list of (account_id, partner_id) tuples
+            :returns dict: account.move.line pair for each key
+        """
+        Account_move_line = self.env['account.move.line']
+        if not keys or self.env.context.get('move_line_id'):
+            return {key: self._get_move_line_reconciliation_proposition(*key) for key in keys}
+
+        ir_rules_query = Account_move_line._where_calc([])
+        Account_move_line._apply_ir_rules(ir_rules_query, 'read')
+        from_clause, where_clause, where_clause_params = ir_rules_query.get_sql()
+        where_str = where_clause and (" WHERE %s" % where_clause) or ''
+
+        query = """
+            SELECT aml.id, aml.account_id, aml.partner_id, aml.amount_residual
+            FROM account_move_line aml
+            JOIN account_move move ON move.id = aml.move_id
+            WHERE move.state = 'posted'
+            AND NOT aml.reconciled
+            AND aml.balance != 0.0
+            AND aml.account_id IN %s
+            AND aml.id IN (SELECT "account_move_line".id FROM {0})
+            ORDER BY aml.date DESC, aml.id DESC
+            """.format(from_clause + where_str)
+        account_ids = tuple({account_id for account_id, partner_id in keys})
+        Account_move_line.flush()
+        self.env.cr.execute(query, [account_ids] + where_clause_params)
+
+        lines_by_key = {}
+        for line_id, account_id, partner_id, residual in self.env.cr.fetchall():
+            lines_by_key.setdefault((account_id, None), []).append((line_id, residual))
+            if partner_id:
+                lines_by_key.setdefault((account_id, partner_id), []).append((line_id, residual))
+
+        return {key: Account_move_line.browse(self._pair_opposite_move_lines(lines_by_key.get(key, [])))
+                for key in keys}
+
+    @api.model
+    def _pair_opposite_move_lines(self, lines):
+        """ Ids of the first two lines whose residuals are opposite.
+
+            :param lines: list of (id, amount_residual), most recent first
+        """
+        ids_by_residual = {}
+        for line_id, residual in lines:
+            ids_by_residual.setdefault(residual, []).append(line_id)
+        for line_id, residual in lines:
+            for other_id in ids_by_residual.get(-residual, []):
+                if other_id != line_id:
+                    return [line_id, other_id]
+        return []
+
+    @api.model
+    def _reference_tokens(self, *texts):
+        """ Split free text into normalized reference tokens """
+        tokens = set()
+        for text in texts:
+            for word in re.split(r'[\s,;:]+', (text or '').lower()):
+                token = re.sub(r'\W+', '', word)
+                if len(token) > 2:
+                    tokens.add(token)
+        return tokens
+
+    @api.model
+    def _get_reconciliation_candidate_index(self, st_lines, excluded_ids=None):
+        """ Index the open receivable and payable lines of the statement companies by exact
+            residual amount, partner and reference token, once for all the statement lines
+            shown by the widget.
+
+            :param st_lines: account.bank.statement.line records
+            :param excluded_ids: move line ids that can't be proposed
+            :returns dict: {company_id: {'amount': {}, 'partner': {}, 'reference': {}}}
+        """
+        AccountMoveLine = self.env['account.move.line']
+        companies = st_lines.mapped('company_id')
+        if not companies:
+            return {}
+        excluded_ids = set(excluded_ids or [])
+        # Same exclusion as _domain_move_lines_for_reconciliation
+        excluded_ids.update(AccountMoveLine.search(AccountMoveLine._get_suspense_moves_domain()).ids)
+
+        ir_rules_query = AccountMoveLine._where_calc([])
+        AccountMoveLine._apply_ir_rules(ir_rules_query, 'read')
+        from_clause, where_clause, where_clause_params = ir_rules_query.get_sql()
+        where_str = where_clause and (" WHERE %s" % where_clause) or ''
+
+        query = """
+            SELECT aml.id, aml.company_id, aml.partner_id, aml.amount_residual,
+                   aml.date, aml.name, move.name, move.ref, move.payment_reference
+            FROM account_move_line aml
+            JOIN account_move move ON move.id = aml.move_id
+            JOIN account_account account ON account.id = aml.account_id
+            WHERE move.state = 'posted'
+            AND NOT aml.reconciled
+            AND aml.balance != 0.0
+            AND account.reconcile
+            AND account.internal_type IN ('receivable', 'payable')
+            AND aml.company_id IN %s
+            AND aml.id IN (SELECT "account_move_line".id FROM {0})
+            ORDER BY aml.date_maturity ASC, aml.id ASC
+            """.format(from_clause + where_str)
+        self.env['account.move'].flush()
+        AccountMoveLine.flush()
+        self.env.cr.execute(query, [tuple(companies.ids)] + where_clause_params)
+
+        start_dates = {company.id: company.account_bank_reconciliation_start for company in companies}
+        currencies = {company.id: company.currency_id for company in companies}
+        index = {company.id: {'amount': {}, 'partner': {}, 'reference': {}} for company in companies}
+        for row in self.env.cr.fetchall():
+            line_id, company_id, partner_id, residual, date = row[:5]
+            if line_id in excluded_ids:
+                continue
+            if start_dates[company_id] and date < start_dates[company_id]:
+                continue
+            company_index = index[company_id]
+            company_index['amount'].setdefault(currencies[company_id].round(residual), []).append(line_id)
+            if partner_id:
+                company_index['partner'].setdefault(partner_id, set()).add(line_id)
+            for token in self._reference_tokens(*row[5:]):
+                company_index['reference'].setdefault(token, set()).add(line_id)
+        return index
+
+    @api.model
+    def _get_candidate_proposition(self, index, st_line, partner_id, used_ids):
+        """ Propose the open line matching the statement line amount exactly and identified
+            by its partner and/or a reference found in the label.
+
+            :returns list: a single move line id or an empty list
+        """
+        company = st_line.company_id
+        company_index = index.get(company.id)
+        if not company_index or st_line.foreign_currency_id or st_line.currency_id != company.currency_id:
+            return []
+        amount = company.currency_id.round(st_line.amount)
+        candidates = [line_id for line_id in company_index['amount'].get(amount, []) if line_id not in used_ids]
+        if not candidates:
+            return []
+
+        by_partner = partner_id and company_index['partner'].get(partner_id) or set()
+        by_reference = set()
+        for token in self._reference_tokens(st_line.payment_ref, st_line.ref):
+            by_reference |= company_index['reference'].get(token, set())
+        for pool in (by_partner & by_reference, by_partner, by_reference):
+            matched = [line_id for line_id in candidates if line_id in pool]
+            if len(matched) == 1:
+                return matched
+        return []
+
     @api.model
     def _process_move_lines(self, move_line_ids, new_mv_line_dicts):
         """ Create new move lines from new_mv_line_dicts (if not empty) then call reconcile_partial on self and new move lines
@@ -845,6 +1013,22 @@ class AccountReconciliation(models.AbstractModel):
 class AccountInvoiceLine(models.Model):
     _inherit = 'account.move.line'
 
+    def _auto_init(self):
+        res = super(AccountInvoiceLine, self)._auto_init()
+        # Partial indexes on the open items the reconciliation widget looks up by
+        # account/partner and by company/amount.
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS account_move_line_open_account_partner_idx
+            ON account_move_line (account_id, partner_id, amount_residual)
+            WHERE reconciled IS NOT TRUE AND balance != 0.0
+        """)
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS account_move_line_open_company_amount_idx
+            ON account_move_line (company_id, amount_residual)
+            WHERE reconciled IS NOT TRUE AND balance != 0.0
+        """)
+        return res
+
     def _create_writeoff(self, writeoff_vals):
         """ Create a writeoff move per journal for the account.move.lines in self. If debit/credit is not specified in vals,
             the writeoff amount will be computed as the sum of amount_residual of the given recordset.
@@ -58,6 +58,7 @@ odoo.define('AccountingDashboard.AccountingDashboard', function(require) {
                 this.onclick_top_10_month(this.$('#top_10_customer_value').val());
             },
             'change #toggle-two': 'onclick_toggle_two',
+            'change #toggle-live': 'onclick_toggle_live',
             'click #unreconciled_counts_this_year': 'unreconciled_year',
             'click #unreconciled_items_': 'unreconciled_month',
             'click #total_customer_invoice_paid_current_month': 'invoice_month_paid',
@@ -452,6 +453,17 @@ odoo.define('AccountingDashboard.AccountingDashboard', function(require) {
             })
         },
 
+        onclick_toggle_live: function(ev) {
+            var self = this;
+            rpc.query({
+                model: "account.dashboard.snapshot",
+                method: "set_live_mode",
+                args: [$('#toggle-live')[0].checked],
+            }).then(function(result) {
+                self.onclick_toggle_two(ev);
+            })
+        },
+
         onclick_toggle_two: function(ev) {
 
             this.onclick_aged_payable(this.$('#aged_receivable_values').val());
@@ -1154,6 +1166,20 @@ odoo.define('AccountingDashboard.AccountingDashboard', function(require) {
                         off: 'View Posted Entries'
                     });
 
+                    rpc.query({
+                            model: "account.dashboard.snapshot",
+                            method: "get_live_mode",
+                        })
+                        .then(function(result) {
+                            if (!result.allowed) {
+                                return;
+                            }
+                            $('#toggle-live').prop('checked', result.live).bootstrapToggle({
+                                on: 'Live Figures',
+                                off: 'Snapshot Figures'
+                            });
+                        })
+
 
                     var posted = false;
                     if ($('#toggle-two')[0].checked == true) {
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+from dateutil.relativedelta import relativedelta
+
+from odoo import fields
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+from odoo.tests import tagged
+
+
+@tagged('post_install', '-at_install')
+class TestDashboardSnapshot(AccountTestInvoicingCommon):
+
+    @classmethod
+    def setUpClass(cls, chart_template_ref=None):
+        super().setUpClass(chart_template_ref=chart_template_ref)
+        cls.Snapshot = cls.env['account.dashboard.snapshot']
+        cls.company = cls.company_data['company']
+        cls.company_key = cls.Snapshot._company_key([cls.company.id, 0])
+        cls.today = fields.Date.context_today(cls.Snapshot)
+        cls.last_month = cls.today - relativedelta(months=1)
+
+    def _snapshot(self, tile, is_closed=False, data='[{"sum": 42.0}]'):
+        """ Snapshot holding `data`, up to date with the current journal items. """
+        company_ids = self.Snapshot._company_ids(self.company_key)
+        period = self.Snapshot._period_key()
+        stats = self.Snapshot._get_move_line_stats(company_ids)
+        snapshot = self.Snapshot.create({
+            'company_key': self.company_key,
+            'tile': tile,
+            'period_key': period,
+            'is_closed': is_closed,
+            'data': data,
+            'watermark': self.Snapshot._watermark(stats, company_ids, period if is_closed else None),
+        })
+        # tiles are read with raw SQL
+        snapshot.flush()
+        return snapshot
+
+    def _refresh(self, snapshot):
+        self.Snapshot._cron_refresh_snapshots()
+        snapshot.invalidate_cache()
+        return snapshot.data != '[{"sum": 42.0}]'
+
+    def _create_move(self, date):
+        return self.env['account.move'].create({
+            'move_type': 'entry',
+            'date': date,
+            'journal_id': self.company_data['default_journal_misc'].id,
+            'line_ids': [
+                (0, 0, {'account_id': self.company_data['default_account_revenue'].id,
+                        'credit': 100.0}),
+                (0, 0, {'account_id': self.company_data['default_account_expense'].id,
+                        'debit': 100.0}),
+            ],
+        })
+
+    def test_fetch_tile_reads_snapshot(self):
+        dashboard = self.env['account.move'].with_context(dashboard_company_ids=[self.company.id, 0])
+        self._snapshot('get_total_invoice_this_year')
+        self.assertEqual(dashboard.get_total_invoice_this_year(), [{'sum': 42.0}])
+        live = dashboard.with_context(dashboard_live=True).get_total_invoice_this_year()
+        self.assertNotEqual(live, [{'sum': 42.0}])
+
+    def test_fetch_tile_miss_stores_once(self):
+        dashboard = self.env['account.move'].with_context(dashboard_company_ids=[self.company.id, 0])
+        result = dashboard.get_total_invoice_this_year()
+        snapshot = self.Snapshot.search([('company_key', '=', self.company_key),
+                                         ('tile', '=', 'get_total_invoice_this_year')])
+        self.assertEqual(len(snapshot), 1)
+        self.assertEqual(dashboard.get_total_invoice_this_year(), result)
+
+    def test_posting_leaves_snapshots_alone(self):
+        snapshot = self._snapshot('get_total_invoice_this_year')
+        write_date = snapshot.write_date
+        move = self._create_move(self.today)
+        move.action_post()
+        snapshot.invalidate_cache()
+        self.assertEqual(snapshot.data, '[{"sum": 42.0}]')
+        self.assertEqual(snapshot.write_date, write_date)
+
+    def test_cron_refreshes_changed_snapshots(self):
+        snapshot = self._snapshot('get_total_invoice_this_year')
+        self.assertFalse(self._refresh(snapshot), "Nothing changed since the snapshot")
+        self._create_move(self.today)
+        self.assertTrue(self._refresh(snapshot))
+
+    def test_closed_snapshot_follows_closed_periods(self):
+        closed = self._snapshot('get_total_invoice_last_month', is_closed=True)
+        move = self._create_move(self.today)
+        self.assertFalse(self._refresh(closed), "A move of the running month does not touch closed periods")
+        move.date = self.last_month
+        self.assertTrue(self._refresh(closed), "The move now lands in a closed period")
+
+    def test_cron_drops_unknown_tiles(self):
+        unknown = self._snapshot('not_a_dashboard_tile')
+        self.Snapshot._cron_refresh_snapshots()
+        self.assertFalse(unknown.exists())
@@ -2,41 +2,91 @@ from datetime import datetime, timedelta
 import json
 
 from odoo.http import request
-from odoo import http
+from odoo import fields, http
 
 
 class GanttController(http.Controller):
 
-    @http.route('/gantt_api', type='http', auth="user")
-    def gantt_api(self, model_name, timezone_offset, domain=None, **kw):
-        # main GET method
-        timezone_offset = int(timezone_offset)
-        domain = json.loads(domain)
-        tasks = request.env[model_name].search(domain).sorted('date_start')
+    def _get_feed_domain(self, domain, date_from=None, date_to=None, parent_id=None):
+        """ Narrow the domain of the view to a date window and/or the children
+        of one parent, so that large projects can be loaded piece by piece. """
+        domain = json.loads(domain) if domain else []
+        if date_from:
+            domain = ['&', '|', ('date_end', '=', False), ('date_end', '>=', date_from)] + domain
+        if date_to:
+            domain = ['&', ('date_start', '<=', date_to)] + domain
+        if parent_id is not None:
+            domain = ['&', ('parent_id', '=', int(parent_id) or False)] + domain
+        return domain
 
+    def _serialize_tasks(self, tasks, timezone_offset):
+        field_names = [name for name in ('name', 'date_start', 'planned_duration', 'progress', 'is_open', 'parent_id')
+                       if name in tasks._fields]
+        with_children = set()
+        if 'parent_id' in tasks._fields and tasks:
+            groups = tasks.read_group([('parent_id', 'in', tasks.ids)], ['parent_id'], ['parent_id'])
+            with_children = {group['parent_id'][0] for group in groups}
         res_tasks = []
-        res_links = []
-        for task in tasks:
-            date_start = task.date_start + timedelta(minutes=timezone_offset)
+        for task in tasks.read(field_names):
+            date_start = task.get('date_start')
+            if date_start:
+                date_start = date_start + timedelta(minutes=timezone_offset)
             res_tasks.append({
-                'id': task.id,
-                'text': task.name,
+                'id': task['id'],
+                'text': task['name'],
                 # yyyy-MM-dd HH:mm
-                'start_date': date_start.strftime("%d/%m/%Y %H:%M:%S"),
-                'duration': task.planned_duration,
-                'progress': task.progress / 100.0,
-                'open': task.is_open,
+                'start_date': date_start and date_start.strftime("%d/%m/%Y %H:%M:%S"),
+                'duration': task.get('planned_duration'),
+                'progress': task.get('progress', 0.0) / 100.0,
+                'open': task.get('is_open', False),
+                'parent': task.get('parent_id') and task['parent_id'][0] or 0,
+                '$has_child': task['id'] in with_children,
             })
-            for link in task.depending_task_ids:
-                res_links.append({
-                    'id': link.id,
-                    'source': link.task_id.id,
-                    'target': link.depending_task_id.id,
-                    'type': link.relation_type
-                })
+        return res_tasks
+
+    @http.route('/gantt_api', type='http', auth="user")
+    def gantt_api(self, model_name, timezone_offset, domain=None, date_from=None, date_to=None,
+                  parent_id=None, offset=0, limit=None, **kw):
+        # main GET method
+        timezone_offset = int(timezone_offset)
+        offset = int(offset)
+        limit = limit and int(limit) or None
+        Task = request.env[model_name]
+        domain = self._get_feed_domain(domain, date_from, date_to, parent_id)
+        tasks = Task.search(domain, offset=offset, limit=limit, order='date_start, id')
+        total = len(tasks) + offset if limit is None else Task.search_count(domain)
+        links = request.env['project.depending.tasks'].search([('task_id', 'in', tasks.ids)])
+        return json.dumps({
+            'data': self._serialize_tasks(tasks, timezone_offset),
+            'links': Task._serialize_links(links),
+            'offset': offset,
+            'total': total,
+            'server_time': fields.Datetime.to_string(fields.Datetime.now()),
+        })
+
+    @http.route('/gantt_api/delta', type='http', auth="user")
+    def gantt_api_delta(self, model_name, timezone_offset, since, domain=None, known_ids=None, **kw):
+        """ Tasks and links changed since `since`, a `server_time` returned
+        by a previous call. Ids of `known_ids` that no longer match the domain
+        are returned as deleted. """
+        timezone_offset = int(timezone_offset)
+        # taken before the searches, changes made in between come again next time
+        server_time = fields.Datetime.to_string(fields.Datetime.now())
+        Task = request.env[model_name]
+        Link = request.env['project.depending.tasks']
+        domain = self._get_feed_domain(domain)
+        tasks = Task.search(['&', ('write_date', '>=', since)] + domain, order='date_start, id')
+        links = Link.search([('write_date', '>=', since), ('task_id', 'in', Task._search(domain))])
+        deleted = []
+        if known_ids:
+            known_ids = [int(task_id) for task_id in json.loads(known_ids)]
+            existing = Task.search(['&', ('id', 'in', known_ids)] + domain)
+            deleted = sorted(set(known_ids) - set(existing.ids))
         return json.dumps({
-            'data': res_tasks,
-            'links': res_links
+            'data': self._serialize_tasks(tasks, timezone_offset),
+            'links': Task._serialize_links(links),
+            'deleted': deleted,
+            'server_time': server_time,
         })
 
     @http.route('/gantt_api/task/<int:task_id>', type='http', auth="user", methods=['PUT'])
@@ -76,31 +76,61 @@ class Task(models.Model):
 
     @api.depends('dependency_task_ids')
     def _compute_recursive_dependency_task_ids(self):
+        dependency_map = self._get_dependency_map(recursive=True)
         for task in self:
-            task.recursive_dependency_task_ids = task.get_dependency_tasks(
-                task, True,
-            )
+            task.recursive_dependency_task_ids = [(6, 0, dependency_map.get(task.id, []))]
+
+    def _get_dependency_map(self, recursive=False):
+        """ Map every task of self to the ids of the tasks it depends on, with
+        one query. When recursive, the dependencies of the dependencies are
+        followed by a recursive CTE; UNION drops repeated rows so cycles end. """
+        task_ids = [task_id for task_id in self.ids if task_id]
+        if not task_ids:
+            return {}
+        self.env['project.depending.tasks'].flush(['task_id', 'depending_task_id'])
+        if recursive:
+            query = """
+                WITH RECURSIVE dependency(root_id, task_id) AS (
+                    SELECT depending_task_id, task_id
+                    FROM project_depending_tasks
+                    WHERE depending_task_id = ANY(%s)
+                    UNION
+                    SELECT d.root_id, l.task_id
+                    FROM dependency d
+                    JOIN project_depending_tasks l ON l.depending_task_id = d.task_id
+                )
+                SELECT root_id, array_agg(task_id) FROM dependency GROUP BY root_id
+            """
+        else:
+            query = """
+                SELECT depending_task_id, array_agg(task_id)
+                FROM project_depending_tasks
+                WHERE depending_task_id = ANY(%s)
+                GROUP BY depending_task_id
+            """
+        self.env.cr.execute(query, (task_ids,))
+        return dict(self.env.cr.fetchall())
 
     @api.model
     def get_dependency_tasks(self, task, recursive=False):
-        dependency_tasks = task.with_context(
-            prefetch_fields=False,
-        ).dependency_task_ids
-        if recursive:
-            for t in dependency_tasks:
-                dependency_tasks |= self.get_dependency_tasks(t, recursive)
-        return dependency_tasks
+        return self.browse(task._get_dependency_map(recursive).get(task.id, []))
+
+    @api.model
+    def _serialize_links(self, links):
+        """ Links in the format of the DHX gantt, read in bulk """
+        return [{
+            'id': link['id'],
+            'source': link['task_id'] and link['task_id'][0],
+            'target': link['depending_task_id'] and link['depending_task_id'][0],
+            'type': link['relation_type'],
+        } for link in links.read(['task_id', 'depending_task_id', 'relation_type'])]
 
     def compute_links_json(self):
+        links_by_task = {task.id: [] for task in self}
+        task_ids = [task_id for task_id in self.ids if task_id]
+        if task_ids:
+            links = self.env['project.depending.tasks'].search([('depending_task_id', 'in', task_ids)])
+            for link in self._serialize_links(links):
+                links_by_task[link['target']].append(link)
         for r in self:
-            links = []
-            r.links_serialized_json = '['
-            for link in r.dependency_task_ids:
-                json_obj = {
-                    'id': link.id,
-                    'source': link.task_id.id,
-                    'target': link.depending_task_id.id,
-                    'type': link.relation_type
-                }
-                links.append(json_obj)
-            r.links_serialized_json = json.dumps(links)
+            r.links_serialized_json = json.dumps(links_by_task[r.id])
@@ -3,7 +3,7 @@
 
 import difflib
 
-from odoo import _, api, fields, models
+from odoo import _, api, fields, models, tools
 
 
 class DocumentPageHistory(models.Model):
@@ -31,21 +31,48 @@ class DocumentPageHistory(models.Model):
 
     def _compute_diff(self):
         """Shows a diff between this version and the previous version"""
-        history = self.env["document.page.history"]
+        prev_ids = self._get_previous_revision_ids()
         for rec in self:
-            prev = history.search(
-                [
-                    ("page_id", "=", rec.page_id.id),
-                    ("create_date", "<", rec.create_date),
-                ],
-                limit=1,
-                order="create_date DESC",
-            )
-            rec.diff = self._get_diff(prev.id, rec.id)
+            rec.diff = self._get_diff(prev_ids.get(rec.id, False), rec.id)
+
+    def _get_previous_revision_ids(self):
+        """Return the previous revision of each record, as a dict of
+        history id -> previous history id, with a single windowed query."""
+        ids = [rec_id for rec_id in self.ids if rec_id]
+        if not ids:
+            return {}
+        self.flush(["page_id"])
+        self.env.cr.execute(
+            """
+            SELECT id, prev_id FROM (
+                SELECT id, LAG(id) OVER (PARTITION BY page_id ORDER BY id) AS prev_id
+                FROM document_page_history
+                WHERE page_id IN (
+                    SELECT page_id FROM document_page_history WHERE id IN %s
+                )
+            ) AS history
+            WHERE id IN %s AND prev_id IS NOT NULL
+            """,
+            (tuple(ids), tuple(ids)),
+        )
+        return dict(self.env.cr.fetchall())
+
+    def write(self, vals):
+        if "content" in vals:
+            self.clear_caches()
+        return super().write(vals)
 
     @api.model
     def _get_diff(self, v1, v2):
         """Return the difference between two version of document version."""
+        # Read the contents as the current user, the diff itself is cached
+        self.check_access_rights("read")
+        self.browse([v for v in (v1, v2) if v]).check_access_rule("read")
+        return self._get_diff_cached(v1, v2)
+
+    @api.model
+    @tools.ormcache("v1", "v2", "self.env.lang")
+    def _get_diff_cached(self, v1, v2):
         text1 = v1 and self.browse(v1).content or ""
         text2 = v2 and self.browse(v2).content or ""
         # Include line breaks to make it more readable
@@ -17,3 +17,18 @@ class TestDocumentPageHistory(common.TransactionCase):
 
         result = history_document._get_diff(active_ids[0], active_ids[1])
         self.assertNotEqual(result, "There are no changes in revisions.")
+
+    def test_page_history_previous_revisions(self):
+        """Test the previous revision of each history entry."""
+        page = self.env.ref("document_page.demo_page1")
+        page.content = "Test content updated"
+        page.content = "Test content updated again"
+        history_pages = self.env["document.page.history"].search(
+            [("page_id", "=", page.id)], order="id"
+        )
+
+        prev_ids = history_pages._get_previous_revision_ids()
+        self.assertNotIn(history_pages[0].id, prev_ids)
+        for prev, rec in zip(history_pages, history_pages[1:]):
+            self.assertEqual(prev_ids[rec.id], prev.id)
+            self.assertEqual(rec.diff, rec._get_diff(prev.id, rec.id))
@@ -129,9 +129,7 @@ class MrpOverheadPeriod(models.Model):
         return True
 
     def action_load_source_entries(self):
-        for period in self:
-            for line in period.line_ids:
-                line._assign_source_move_lines()
+        self.mapped("line_ids")._assign_source_move_lines()
         return True
 
     def action_compute_overhead(self):
@@ -144,9 +142,12 @@ class MrpOverheadPeriod(models.Model):
 
             basis_map = defaultdict(list)
             basis_totals = defaultdict(float)
-            for production in period._get_done_productions():
+            productions = period._get_done_productions()
+            production_basis = period.line_ids._get_production_basis_map(productions)
+            for production in productions:
+                basis_by_type = production_basis[production.id]
                 for line in period.line_ids:
-                    base_basis_qty = line._get_basis_qty_for_production(production)
+                    base_basis_qty = basis_by_type[line.allocation_basis]
                     mo_factor = line._get_mo_factor_for_production(production)
                     basis_qty = base_basis_qty * mo_factor
                     if float_is_zero(basis_qty, precision_digits=4):
@@ -280,14 +281,19 @@ class MrpOverheadPeriod(models.Model):
         if "stock.valuation.layer" not in self.env:
             return
 
+        lines = self.line_ids.filtered(lambda item: item.capitalize_to_inventory)
+        allocations = lines.mapped("allocation_line_ids")
+        existing_allocation_ids = set()
+        if allocations:
+            existing_layers = self.env["stock.valuation.layer"].search(
+                [("mrp_overhead_allocation_line_id", "in", allocations.ids)]
+            )
+            existing_allocation_ids = set(existing_layers.mapped("mrp_overhead_allocation_line_id").ids)
+
         valuation_layers = []
-        for line in self.line_ids.filtered(lambda item: item.capitalize_to_inventory):
+        for line in lines:
             for allocation in line.allocation_line_ids:
-                existing_layer = self.env["stock.valuation.layer"].search(
-                    [("mrp_overhead_allocation_line_id", "=", allocation.id)],
-                    limit=1,
-                )
-                if existing_layer:
+                if allocation.id in existing_allocation_ids:
                     continue
                 layer_vals = line._prepare_stock_valuation_layer_vals(allocation, adjustment_move)
                 if layer_vals:
@@ -421,14 +427,45 @@ class MrpOverheadPeriodLine(models.Model):
         "allocation_line_ids.applied_amount",
     )
     def _compute_amounts(self):
-        for line in self:
-            source_lines = line.source_move_line_ids.filtered(
-                lambda aml: aml.balance > 0
-                and aml.account_id.internal_type not in ("receivable", "payable", "liquidity")
+        stored_ids = [line.id for line in self if line.id]
+        source_totals = {}
+        allocation_totals = {}
+        if stored_ids:
+            source_groups = self.env["account.move.line"].read_group(
+                [
+                    ("mrp_overhead_period_line_id", "in", stored_ids),
+                    ("balance", ">", 0.0),
+                    ("account_id.internal_type", "not in", ("receivable", "payable", "liquidity")),
+                ],
+                ["mrp_overhead_period_line_id", "balance"],
+                ["mrp_overhead_period_line_id"],
             )
-            source_amount = sum(source_lines.mapped("balance"))
-            basis_qty = sum(line.allocation_line_ids.mapped("basis_qty"))
-            absorbed_amount = sum(line.allocation_line_ids.mapped("applied_amount"))
+            source_totals = {
+                group["mrp_overhead_period_line_id"][0]: group["balance"] or 0.0
+                for group in source_groups
+            }
+            allocation_groups = self.env["mrp.overhead.allocation.line"].read_group(
+                [("period_line_id", "in", stored_ids)],
+                ["period_line_id", "basis_qty", "applied_amount"],
+                ["period_line_id"],
+            )
+            allocation_totals = {
+                group["period_line_id"][0]: (group["basis_qty"] or 0.0, group["applied_amount"] or 0.0)
+                for group in allocation_groups
+            }
+
+        for line in self:
+            if line.id:
+                source_amount = source_totals.get(line.id, 0.0)
+                basis_qty, absorbed_amount = allocation_totals.get(line.id, (0.0, 0.0))
+            else:
+                source_lines = line.source_move_line_ids.filtered(
+                    lambda aml: aml.balance > 0
+                    and aml.account_id.internal_type not in ("receivable", "payable", "liquidity")
+                )
+                source_amount = sum(source_lines.mapped("balance"))
+                basis_qty = sum(line.allocation_line_ids.mapped("basis_qty"))
+                absorbed_amount = sum(line.allocation_line_ids.mapped("applied_amount"))
             actual_amount = source_amount + line.manual_actual_amount
             computed_rate = actual_amount / basis_qty if basis_qty else 0.0
             rate = line.manual_rate if line.rate_mode == "manual" else computed_rate
@@ -449,36 +486,163 @@ class MrpOverheadPeriodLine(models.Model):
             line.allocation_count = len(line.allocation_line_ids)
 
     def _assign_source_move_lines(self):
+        """Link posted expense journal items to their overhead period line.
+
+        Candidates for all lines are selected with one query; links are then
+        written in one batch per period line and stale links cleared at once.
+        """
+        lines = self.filtered("id")
+        if not lines:
+            return
         AccountMoveLine = self.env["account.move.line"]
-        for line in self:
-            domain = [
-                ("company_id", "=", line.company_id.id),
-                ("parent_state", "=", "posted"),
-                ("date", ">=", line.period_id.date_start),
-                ("date", "<=", line.period_id.date_end),
-                ("display_type", "=", False),
-                ("mrp_overhead_type_id", "=", line.overhead_type_id.id),
-                ("mrp_overhead_period_line_id", "in", [False, line.id]),
-                ("balance", ">", 0.0),
+        AccountMoveLine.flush(
+            [
+                "company_id",
+                "parent_state",
+                "date",
+                "display_type",
+                "account_id",
+                "balance",
+                "mrp_overhead_type_id",
+                "mrp_overhead_period_line_id",
             ]
-            move_lines = AccountMoveLine.search(domain).filtered(
-                lambda aml: aml.account_id.internal_type not in ("receivable", "payable", "liquidity")
+        )
+        self.env["account.account"].flush(["internal_type"])
+        self.flush(["period_id", "company_id", "overhead_type_id"])
+        self.mapped("period_id").flush(["date_start", "date_end"])
+
+        self.env.cr.execute(
+            """
+            SELECT aml.id, pl.id
+              FROM mrp_overhead_period_line pl
+              JOIN mrp_overhead_period p ON p.id = pl.period_id
+              JOIN account_move_line aml
+                ON aml.mrp_overhead_type_id = pl.overhead_type_id
+               AND aml.company_id = pl.company_id
+               AND aml.date >= p.date_start
+               AND aml.date <= p.date_end
+              JOIN account_account acc ON acc.id = aml.account_id
+             WHERE pl.id IN %s
+               AND aml.parent_state = 'posted'
+               AND aml.display_type IS NULL
+               AND aml.balance > 0.0
+               AND (aml.mrp_overhead_period_line_id IS NULL OR aml.mrp_overhead_period_line_id = pl.id)
+               AND COALESCE(acc.internal_type, '') NOT IN ('receivable', 'payable', 'liquidity')
+            """,
+            (tuple(lines.ids),),
+        )
+        move_line_ids_by_line = defaultdict(list)
+        for move_line_id, line_id in self.env.cr.fetchall():
+            move_line_ids_by_line[line_id].append(move_line_id)
+
+        matched_ids = {move_line_id for ids in move_line_ids_by_line.values() for move_line_id in ids}
+        stale_lines = lines.mapped("source_move_line_ids").filtered(lambda aml: aml.id not in matched_ids)
+        if stale_lines:
+            stale_lines.write(
+                {
+                    "mrp_overhead_period_line_id": False,
+                    "mrp_overhead_period_id": False,
+                }
             )
-            stale_lines = line.source_move_line_ids - move_lines
-            if stale_lines:
-                stale_lines.write(
-                    {
-                        "mrp_overhead_period_line_id": False,
-                        "mrp_overhead_period_id": False,
-                    }
-                )
-            if move_lines:
-                move_lines.write(
-                    {
-                        "mrp_overhead_period_line_id": line.id,
-                        "mrp_overhead_period_id": line.period_id.id,
-                    }
-                )
+        for line in lines:
+            move_line_ids = move_line_ids_by_line.get(line.id)
+            if not move_line_ids:
+                continue
+            AccountMoveLine.browse(move_line_ids).write(
+                {
+                    "mrp_overhead_period_line_id": line.id,
+                    "mrp_overhead_period_id": line.period_id.id,
+                }
+            )
+
+    @api.model
+    def _get_production_basis_map(self, productions):
+        """Return allocation basis quantities for many productions at once.
+
+        Finished quantities and workorder durations are summed per production
+        with grouped queries; the result mirrors
+        :meth:`_get_basis_qty_for_production` for every basis.
+
+        :return: {production_id: {"kg": qty, "hour": hours, "mo": 1.0}}
+        """
+        result = {
+            production.id: {"kg": 0.0, "hour": 0.0, "mo": 1.0}
+            for production in productions
+        }
+        if not productions:
+            return result
+
+        self.env["stock.move"].flush(["production_id", "product_id", "product_uom", "product_uom_qty", "state"])
+        self.env["stock.move.line"].flush(["move_id", "product_uom_id", "qty_done"])
+        self.env["mrp.workorder"].flush(["production_id", "state", "duration", "duration_expected"])
+        productions.flush(["product_id", "product_qty", "date_planned_start", "date_finished"])
+        production_ids = tuple(productions.ids)
+
+        # Finished quantity of the main product (qty_produced / done moves fallback).
+        self.env.cr.execute(
+            """
+            WITH move_qty AS (
+                SELECT m.id,
+                       m.production_id,
+                       m.state,
+                       COALESCE(m.product_uom_qty, 0.0) AS product_uom_qty,
+                       COALESCE(SUM(
+                           CASE
+                               WHEN ml.product_uom_id = m.product_uom THEN ml.qty_done
+                               ELSE ml.qty_done / lu.factor * mu.factor
+                           END
+                       ), 0.0) AS qty_done
+                  FROM stock_move m
+                  JOIN mrp_production p ON p.id = m.production_id AND p.product_id = m.product_id
+                  JOIN uom_uom mu ON mu.id = m.product_uom
+             LEFT JOIN stock_move_line ml ON ml.move_id = m.id
+             LEFT JOIN uom_uom lu ON lu.id = ml.product_uom_id
+                 WHERE m.production_id IN %s
+                   AND m.state != 'cancel'
+              GROUP BY m.id
+            )
+            SELECT production_id,
+                   SUM(qty_done),
+                   SUM(CASE WHEN state = 'done' THEN
+                           CASE WHEN qty_done != 0.0 THEN qty_done ELSE product_uom_qty END
+                       ELSE 0.0 END)
+              FROM move_qty
+          GROUP BY production_id
+            """,
+            (production_ids,),
+        )
+        finished_map = {row[0]: (float(row[1] or 0.0), float(row[2] or 0.0)) for row in self.env.cr.fetchall()}
+
+        # Workorder minutes: done workorders when any, otherwise all of them.
+        self.env.cr.execute(
+            """
+            SELECT production_id,
+                   COUNT(*) FILTER (WHERE state = 'done'),
+                   SUM(CASE WHEN state = 'done'
+                            THEN COALESCE(NULLIF(duration, 0.0), duration_expected, 0.0)
+                            ELSE 0.0 END),
+                   SUM(COALESCE(NULLIF(duration, 0.0), duration_expected, 0.0))
+              FROM mrp_workorder
+             WHERE production_id IN %s
+          GROUP BY production_id
+            """,
+            (production_ids,),
+        )
+        minutes_map = {}
+        for production_id, done_count, done_minutes, all_minutes in self.env.cr.fetchall():
+            minutes_map[production_id] = float((done_minutes if done_count else all_minutes) or 0.0)
+
+        for production in productions:
+            qty_produced, done_moves_qty = finished_map.get(production.id, (0.0, 0.0))
+            weight = qty_produced or done_moves_qty or production.product_qty or 0.0
+
+            total_minutes = minutes_map.get(production.id, 0.0)
+            if not total_minutes and production.date_planned_start and production.date_finished:
+                total_minutes = (production.date_finished - production.date_planned_start).total_seconds() / 60.0
+
+            result[production.id]["kg"] = weight
+            result[production.id]["hour"] = total_minutes / 60.0
+        return result
 
     def _get_basis_qty_for_production(self, production):
         self.ensure_one()
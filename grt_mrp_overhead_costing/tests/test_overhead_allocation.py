@@ -0,0 +1,112 @@
+from datetime import timedelta
+
+from odoo import fields
+from odoo.tests.common import SavepointCase, tagged
+
+
+@tagged("post_install", "-at_install")
+class TestOverheadAllocation(SavepointCase):
+    """Set-based allocation must match the per-production reference."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.company = cls.env.company
+        expense_type = cls.env.ref("account.data_account_type_expenses")
+        cls.absorption_account = cls.env["account.account"].create(
+            {"code": "OHABS01", "name": "Overhead Absorbed", "user_type_id": expense_type.id}
+        )
+        cls.variance_account = cls.env["account.account"].create(
+            {"code": "OHVAR01", "name": "Overhead Variance", "user_type_id": expense_type.id}
+        )
+        cls.journal = cls.env["account.journal"].create(
+            {"name": "Overhead Adjustment", "code": "OHADJ", "type": "general"}
+        )
+        overhead_type = cls.env["mrp.overhead.type"]
+        cls.type_kg = overhead_type.create(
+            {
+                "name": "Electricity",
+                "allocation_basis": "kg",
+                "mo_factor_mode": "electricity",
+                "absorption_account_id": cls.absorption_account.id,
+                "variance_account_id": cls.variance_account.id,
+            }
+        )
+        cls.type_hour = overhead_type.create(
+            {
+                "name": "Labor",
+                "allocation_basis": "hour",
+                "mo_factor_mode": "labor",
+                "absorption_account_id": cls.absorption_account.id,
+                "variance_account_id": cls.variance_account.id,
+            }
+        )
+        cls.type_mo = overhead_type.create(
+            {
+                "name": "Setup",
+                "allocation_basis": "mo",
+                "absorption_account_id": cls.absorption_account.id,
+                "variance_account_id": cls.variance_account.id,
+            }
+        )
+
+        cls.product = cls.env["product.product"].create({"name": "Overhead FG", "type": "consu"})
+        cls.productions = cls.env["mrp.production"]
+        for index in range(6):
+            production = cls.env["mrp.production"].create(
+                {
+                    "product_id": cls.product.id,
+                    "product_uom_id": cls.product.uom_id.id,
+                    "product_qty": 10.0 + index,
+                    "overhead_electricity_factor": 1.0 + index / 10.0,
+                    "overhead_labor_factor": 2.0 - index / 10.0,
+                    "date_planned_start": fields.Datetime.now() - timedelta(hours=index + 1),
+                }
+            )
+            production.action_confirm()
+            production.qty_producing = production.product_qty - (index % 2)
+            production._set_qty_producing()
+            production.with_context(skip_backorder=True).button_mark_done()
+            cls.productions |= production
+
+        today = fields.Date.context_today(cls.productions)
+        cls.period = cls.env["mrp.overhead.period"].create(
+            {
+                "date_start": today.replace(day=1),
+                "date_end": today + timedelta(days=1),
+                "journal_id": cls.journal.id,
+            }
+        )
+        cls.period.action_initialize_lines()
+        cls.period.line_ids.write({"rate_mode": "manual", "manual_rate": 1500.0})
+
+    def test_basis_map_matches_reference(self):
+        lines = self.period.line_ids
+        basis_map = lines._get_production_basis_map(self.productions)
+        for production in self.productions:
+            for line in lines:
+                self.assertAlmostEqual(
+                    basis_map[production.id][line.allocation_basis],
+                    line._get_basis_qty_for_production(production),
+                    places=4,
+                )
+
+    def test_compute_overhead_matches_reference(self):
+        self.period.action_compute_overhead()
+        productions = self.period._get_done_productions()
+        self.assertEqual(set(productions.ids), set(self.productions.ids))
+        for line in self.period.line_ids:
+            expected = {}
+            for production in productions:
+                basis_qty = line._get_basis_qty_for_production(production) * line._get_mo_factor_for_production(
+                    production
+                )
+                if basis_qty:
+                    expected[production.id] = basis_qty
+            allocations = line.allocation_line_ids
+            self.assertEqual(set(allocations.mapped("production_id").ids), set(expected))
+            for allocation in allocations:
+                self.assertAlmostEqual(allocation.basis_qty, expected[allocation.production_id.id], places=4)
+                self.assertAlmostEqual(allocation.applied_amount, allocation.basis_qty * 1500.0, places=2)
+            self.assertAlmostEqual(line.basis_qty, sum(expected.values()), places=4)
+            self.assertAlmostEqual(line.absorbed_amount, sum(allocations.mapped("applied_amount")), places=2)
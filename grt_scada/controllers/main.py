@@ -10,11 +10,12 @@ from odoo.http import request
 import logging
 import json
 import os
-from datetime import datetime, timedelta
+from datetime import datetime
 from collections import defaultdict
 from ..services.product_service import ProductService
 from ..services.mo_weight_service import MoWeightService
 from ..services.bom_service import BomService
+from ..services.report_period_service import ReportPeriodService, INVALID_PERIOD_MESSAGE
 
 _logger = logging.getLogger(__name__)
 SCADA_CORS_ORIGIN = os.getenv('SCADA_CORS_ORIGIN', 'https://scada.kanjabung.com')
@@ -43,113 +44,28 @@ class ScadaJsonRpcController(http.Controller):
             return None
         return default
 
-    def _normalize_datetime_input(self, value, is_end=False):
-        if not value:
-            return None
-        cleaned = str(value).strip().replace('T', ' ')
-        if not cleaned:
-            return None
-
-        parse_formats = [
-            '%Y-%m-%d %H:%M:%S',
-            '%Y-%m-%d %H:%M',
-            '%Y-%m-%d',
-            '%d/%m/%Y %H:%M:%S',
-            '%d/%m/%Y %H:%M',
-            '%d/%m/%Y',
-        ]
-        for datetime_format in parse_formats:
-            try:
-                parsed = datetime.strptime(cleaned, datetime_format)
-                if datetime_format in ('%Y-%m-%d', '%d/%m/%Y'):
-                    if is_end:
-                        parsed = parsed.replace(hour=23, minute=59, second=59, microsecond=0)
-                    else:
-                        parsed = parsed.replace(hour=0, minute=0, second=0, microsecond=0)
-                elif datetime_format in ('%Y-%m-%d %H:%M', '%d/%m/%Y %H:%M'):
-                    parsed = parsed.replace(second=59 if is_end else 0, microsecond=0)
-                else:
-                    parsed = parsed.replace(microsecond=0)
-                return parsed.strftime('%Y-%m-%d %H:%M:%S')
-            except Exception:
-                continue
+    def _get_period_service(self):
+        return ReportPeriodService(request.env)
 
-        return cleaned
+    def _normalize_datetime_input(self, value, is_end=False):
+        return ReportPeriodService.normalize_datetime(value, is_end=is_end)
 
     def _get_period_datetime_range(self, period):
-        period = (period or '').strip().lower()
-        if not period:
-            return (None, None)
-
-        now = datetime.now()
-        start_dt = None
-        end_dt = None
-
-        if period == 'today':
-            start_dt = now.replace(hour=0, minute=0, second=0, microsecond=0)
-            end_dt = now.replace(hour=23, minute=59, second=59, microsecond=0)
-        elif period == 'yesterday':
-            y = now - timedelta(days=1)
-            start_dt = y.replace(hour=0, minute=0, second=0, microsecond=0)
-            end_dt = y.replace(hour=23, minute=59, second=59, microsecond=0)
-        elif period == 'this_week':
-            week_start = now - timedelta(days=now.weekday())
-            start_dt = week_start.replace(hour=0, minute=0, second=0, microsecond=0)
-            end_dt = now.replace(hour=23, minute=59, second=59, microsecond=0)
-        elif period == 'last_7_days':
-            start_dt = (now - timedelta(days=6)).replace(hour=0, minute=0, second=0, microsecond=0)
-            end_dt = now.replace(hour=23, minute=59, second=59, microsecond=0)
-        elif period == 'this_month':
-            start_dt = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            end_dt = now.replace(hour=23, minute=59, second=59, microsecond=0)
-        elif period == 'last_month':
-            first_this_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            last_prev_month = first_this_month - timedelta(seconds=1)
-            start_dt = last_prev_month.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            end_dt = last_prev_month.replace(hour=23, minute=59, second=59, microsecond=0)
-        elif period == 'this_year':
-            start_dt = now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
-            end_dt = now.replace(hour=23, minute=59, second=59, microsecond=0)
-        else:
-            return (False, False)
-
-        return (
-            start_dt.strftime('%Y-%m-%d %H:%M:%S'),
-            end_dt.strftime('%Y-%m-%d %H:%M:%S'),
-        )
+        return ReportPeriodService.period_range(period)
 
     def _get_day_range(self, day_value=None):
-        if day_value:
-            normalized = self._normalize_datetime_input(day_value, is_end=False)
-            day_str = str(normalized)[:10]
-            day_date = datetime.strptime(day_str, '%Y-%m-%d')
-            start_dt = day_date.replace(hour=0, minute=0, second=0, microsecond=0)
-            end_dt = day_date.replace(hour=23, minute=59, second=59, microsecond=0)
-        else:
-            now = datetime.now()
-            start_dt = now.replace(hour=0, minute=0, second=0, microsecond=0)
-            end_dt = now.replace(hour=23, minute=59, second=59, microsecond=0)
+        report_period = self._get_period_service().resolve_day(day_value)
         return (
-            start_dt.strftime('%Y-%m-%d %H:%M:%S'),
-            end_dt.strftime('%Y-%m-%d %H:%M:%S'),
-            start_dt.strftime('%Y-%m-%d'),
+            report_period.date_from,
+            report_period.date_to,
+            report_period.date_from[:10],
         )
 
     def _get_report_datetime_range(self, payload, default_period='this_month'):
-        date_from = payload.get('date_from')
-        date_to = payload.get('date_to')
-        period = payload.get('period') or default_period
-
-        period_from = None
-        period_to = None
-        if period:
-            period_from, period_to = self._get_period_datetime_range(period)
-            if period_from is False:
-                return (False, False, False)
-
-        normalized_from = self._normalize_datetime_input(date_from, is_end=False) or period_from
-        normalized_to = self._normalize_datetime_input(date_to, is_end=True) or period_to
-        return (normalized_from, normalized_to, period)
+        report_period = self._get_period_service().resolve(payload, default_period=default_period)
+        if report_period is None:
+            return (False, False, False)
+        return (report_period.date_from, report_period.date_to, report_period.period)
 
     def _get_equipment_details(self, equipment):
         """Helper: Extract full equipment details"""
@@ -787,23 +703,12 @@ class ScadaJsonRpcController(http.Controller):
                     }
                 domain.append(('equipment_id', '=', equipment.id))
 
-            date_from = data.get('date_from')
-            date_to = data.get('date_to')
-            period = data.get('period')
-
-            period_from, period_to = self._get_period_datetime_range(period)
-            if period_from is False:
-                return {
-                    'status': 'error',
-                    'message': (
-                        'Invalid period value. '
-                        'Supported: today, yesterday, this_week, last_7_days, '
-                        'this_month, last_month, this_year'
-                    ),
-                }
+            report_period = self._get_period_service().resolve(data)
+            if report_period is None:
+                return {'status': 'error', 'message': INVALID_PERIOD_MESSAGE}
 
-            normalized_from = self._normalize_datetime_input(date_from, is_end=False) or period_from
-            normalized_to = self._normalize_datetime_input(date_to, is_end=True) or period_to
+            normalized_from = report_period.date_from
+            normalized_to = report_period.date_to
 
             if normalized_from:
                 domain.append(('date_done', '>=', normalized_from))
@@ -914,23 +819,12 @@ class ScadaJsonRpcController(http.Controller):
             oee_domain = [('equipment_id', 'in', equipment_ids)]
             line_domain = [('equipment_id', 'in', equipment_ids)]
 
-            date_from = data.get('date_from')
-            date_to = data.get('date_to')
-            period = data.get('period')
-
-            period_from, period_to = self._get_period_datetime_range(period)
-            if period_from is False:
-                return {
-                    'status': 'error',
-                    'message': (
-                        'Invalid period value. '
-                        'Supported: today, yesterday, this_week, last_7_days, '
-                        'this_month, last_month, this_year'
-                    ),
-                }
+            report_period = self._get_period_service().resolve(data)
+            if report_period is None:
+                return {'status': 'error', 'message': INVALID_PERIOD_MESSAGE}
 
-            normalized_from = self._normalize_datetime_input(date_from, is_end=False) or period_from
-            normalized_to = self._normalize_datetime_input(date_to, is_end=True) or period_to
+            normalized_from = report_period.date_from
+            normalized_to = report_period.date_to
 
             if normalized_from:
                 oee_domain.append(('date_done', '>=', normalized_from))
@@ -1090,23 +984,12 @@ class ScadaJsonRpcController(http.Controller):
                     }
                 domain.append(('product_id', 'in', product_variants.ids))
 
-            date_from = data.get('date_from')
-            date_to = data.get('date_to')
-            period = data.get('period')
-
-            period_from, period_to = self._get_period_datetime_range(period)
-            if period_from is False:
-                return {
-                    'status': 'error',
-                    'message': (
-                        'Invalid period value. '
-                        'Supported: today, yesterday, this_week, last_7_days, '
-                        'this_month, last_month, this_year'
-                    ),
-                }
+            report_period = self._get_period_service().resolve(data)
+            if report_period is None:
+                return {'status': 'error', 'message': INVALID_PERIOD_MESSAGE}
 
-            normalized_from = self._normalize_datetime_input(date_from, is_end=False) or period_from
-            normalized_to = self._normalize_datetime_input(date_to, is_end=True) or period_to
+            normalized_from = report_period.date_from
+            normalized_to = report_period.date_to
 
             if normalized_from:
                 domain.append(('date_done', '>=', normalized_from))
@@ -1419,16 +1302,13 @@ class ScadaJsonRpcController(http.Controller):
         """
         try:
             data = self._get_json_payload()
-            date_from, date_to, period = self._get_report_datetime_range(data, default_period='this_month')
-            if date_from is False:
-                return {
-                    'status': 'error',
-                    'message': (
-                        'Invalid period value. '
-                        'Supported: today, yesterday, this_week, last_7_days, '
-                        'this_month, last_month, this_year'
-                    ),
-                }
+            period_service = self._get_period_service()
+            report_period = period_service.resolve(data, default_period='this_month')
+            if report_period is None:
+                return {'status': 'error', 'message': INVALID_PERIOD_MESSAGE}
+            date_from = report_period.date_from
+            date_to = report_period.date_to
+            period = report_period.period
             if not date_from or not date_to:
                 return {
                     'status': 'error',
@@ -1499,12 +1379,8 @@ class ScadaJsonRpcController(http.Controller):
             mo_target_row = mo_target_group[0] if mo_target_group else {}
             target_total_qty = self._read_group_metric(mo_target_row, 'product_qty', 'sum', 0.0)
 
-            oee_total_group = request.env['scada.equipment.oee'].read_group(
-                oee_domain,
-                ['qty_finished:sum', 'qty_planned:sum', 'id:count'],
-                [],
-                lazy=False,
-            )
+            oee_summary = period_service.get_oee_summary(report_period, mo_domain_period, oee_domain)
+            oee_total_group = oee_summary['total']
             oee_total_row = oee_total_group[0] if oee_total_group else {}
             actual_total_qty = self._read_group_metric(oee_total_row, 'qty_finished', 'sum', 0.0)
             actual_total_target_done = self._read_group_metric(oee_total_row, 'qty_planned', 'sum', 0.0)
@@ -1524,35 +1400,10 @@ class ScadaJsonRpcController(http.Controller):
             )
 
             # 3) Metrik rata-rata OEE / Kualitas
-            oee_quality_group = request.env['scada.equipment.oee'].read_group(
-                oee_domain,
-                [
-                    'yield_percent:avg',
-                    'consumption_ratio:avg',
-                    'avg_silo_oee_percent:avg',
-                    'max_abs_deviation_percent:avg',
-                    'deviation_alert_count:sum',
-                    'id:count',
-                ],
-                [],
-                lazy=False,
-            )
+            oee_quality_group = oee_summary['quality']
             oee_quality_row = oee_quality_group[0] if oee_quality_group else {}
 
-            oee_quality_by_equipment_group = request.env['scada.equipment.oee'].read_group(
-                oee_domain,
-                [
-                    'equipment_id',
-                    'yield_percent:avg',
-                    'consumption_ratio:avg',
-                    'avg_silo_oee_percent:avg',
-                    'max_abs_deviation_percent:avg',
-                    'deviation_alert_count:sum',
-                    'id:count',
-                ],
-                ['equipment_id'],
-                lazy=False,
-            )
+            oee_quality_by_equipment_group = oee_summary['by_equipment']
             oee_quality_by_equipment = []
             for row in oee_quality_by_equipment_group:
                 equipment = row.get('equipment_id')
@@ -1570,47 +1421,26 @@ class ScadaJsonRpcController(http.Controller):
                 })
 
             # 4) Grafik produksi harian dua bar: target vs actual
-            mo_daily_target = request.env['mrp.production'].search(
-                mo_domain_period,
-                order='date_planned_start asc, id asc',
-                limit=chart_limit,
-            )
-            target_by_day = defaultdict(float)
-            actual_by_day = defaultdict(float)
-            mo_day_map = {}
-            for mo in mo_daily_target:
-                if mo.date_planned_start:
-                    day_key = mo.date_planned_start.date().isoformat()
-                    target_by_day[day_key] += mo.product_qty or 0.0
-                    mo_day_map[mo.id] = day_key
-
-            # Align actual to the same planned day axis as target (per MO)
-            oee_chart_domain = [('manufacturing_order_id', 'in', list(mo_day_map.keys()) or [0])]
+            # Actual di-align ke hari planned MO; semua hari diambil dalam satu grouped query.
+            oee_chart_domain = []
             if finished_product_ids:
                 oee_chart_domain.append(('product_id', 'in', finished_product_ids))
             if equipment_ids:
                 oee_chart_domain.append(('equipment_id', 'in', equipment_ids))
 
-            oee_daily_actual = request.env['scada.equipment.oee'].search(
-                oee_chart_domain,
-                order='date_done asc, id asc',
+            daily_target_actual_chart = period_service.get_daily_target_actual(
+                report_period,
+                mo_domain_period,
+                oee_domain=oee_chart_domain,
                 limit=chart_limit,
             )
-            for rec in oee_daily_actual:
-                mo_id = rec.manufacturing_order_id.id if rec.manufacturing_order_id else False
-                day_key = mo_day_map.get(mo_id)
-                if day_key:
-                    actual_by_day[day_key] += rec.qty_finished or 0.0
-
-            all_days = sorted(set(target_by_day.keys()) | set(actual_by_day.keys()))
-            daily_target_actual_chart = [
-                {
-                    'date': day,
-                    'target_qty': target_by_day.get(day, 0.0),
-                    'actual_qty': actual_by_day.get(day, 0.0),
-                }
-                for day in all_days
-            ]
+            shift_target_actual_chart = None
+            if data.get('include_shift_chart'):
+                shift_target_actual_chart = period_service.get_shift_target_actual(
+                    report_period,
+                    mo_domain_period,
+                    oee_domain=oee_chart_domain,
+                )
 
             # 5) Grafik konsumsi raw material
             raw_move_domain = [
@@ -1841,7 +1671,7 @@ class ScadaJsonRpcController(http.Controller):
                 key=lambda x: (x['date'], x['product_name'])
             )
 
-            return {
+            result = {
                 'status': 'success',
                 'filters': {
                     'period': period,
@@ -1896,6 +1726,13 @@ class ScadaJsonRpcController(http.Controller):
                     'data': finished_goods_daily_table,
                 },
             }
+            if shift_target_actual_chart is not None:
+                result['chart_shift_target_vs_actual'] = {
+                    'tz': report_period.tz,
+                    'count': len(shift_target_actual_chart),
+                    'data': shift_target_actual_chart,
+                }
+            return result
         except Exception as e:
             _logger.error(f'Error getting periodic report: {str(e)}')
             return {'status': 'error', 'message': str(e)}
@@ -2015,9 +1852,6 @@ class ScadaJsonRpcController(http.Controller):
             data = self._get_json_payload()
 
             equipment_code = data.get('equipment_code')
-            date_from = data.get('date_from')
-            date_to = data.get('date_to')
-            period = (data.get('period') or '').strip().lower()
             limit = int(data.get('limit', 100))
             offset = int(data.get('offset', 0))
 
@@ -2026,66 +1860,14 @@ class ScadaJsonRpcController(http.Controller):
                 domain.append(('equipment_code', '=', str(equipment_code)))
 
             # Predefined period filter. date_from/date_to tetap bisa override jika dikirim.
-            if period:
-                now = datetime.now()
-                start_dt = None
-                end_dt = None
-
-                if period == 'today':
-                    start_dt = now.replace(hour=0, minute=0, second=0, microsecond=0)
-                    end_dt = now.replace(hour=23, minute=59, second=59, microsecond=0)
-                elif period == 'yesterday':
-                    y = now - timedelta(days=1)
-                    start_dt = y.replace(hour=0, minute=0, second=0, microsecond=0)
-                    end_dt = y.replace(hour=23, minute=59, second=59, microsecond=0)
-                elif period == 'this_week':
-                    week_start = now - timedelta(days=now.weekday())
-                    start_dt = week_start.replace(hour=0, minute=0, second=0, microsecond=0)
-                    end_dt = now.replace(hour=23, minute=59, second=59, microsecond=0)
-                elif period == 'last_7_days':
-                    start_dt = (now - timedelta(days=6)).replace(hour=0, minute=0, second=0, microsecond=0)
-                    end_dt = now.replace(hour=23, minute=59, second=59, microsecond=0)
-                elif period == 'this_month':
-                    start_dt = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-                    end_dt = now.replace(hour=23, minute=59, second=59, microsecond=0)
-                elif period == 'last_month':
-                    first_this_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-                    last_prev_month = first_this_month - timedelta(seconds=1)
-                    start_dt = last_prev_month.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-                    end_dt = last_prev_month.replace(hour=23, minute=59, second=59, microsecond=0)
-                elif period == 'this_year':
-                    start_dt = now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
-                    end_dt = now.replace(hour=23, minute=59, second=59, microsecond=0)
-                else:
-                    return {
-                        'status': 'error',
-                        'message': (
-                            'Invalid period value. '
-                            'Supported: today, yesterday, this_week, last_7_days, '
-                            'this_month, last_month, this_year'
-                        ),
-                    }
-
-                if not date_from:
-                    date_from = start_dt.strftime('%Y-%m-%d %H:%M:%S')
-                if not date_to:
-                    date_to = end_dt.strftime('%Y-%m-%d %H:%M:%S')
-
-            if date_from:
-                cleaned_from = str(date_from).strip().replace('T', ' ')
-                if len(cleaned_from) == 10:
-                    cleaned_from = f'{cleaned_from} 00:00:00'
-                elif len(cleaned_from) == 16:
-                    cleaned_from = f'{cleaned_from}:00'
-                domain.append(('date', '>=', cleaned_from))
-
-            if date_to:
-                cleaned_to = str(date_to).strip().replace('T', ' ')
-                if len(cleaned_to) == 10:
-                    cleaned_to = f'{cleaned_to} 23:59:59'
-                elif len(cleaned_to) == 16:
-                    cleaned_to = f'{cleaned_to}:59'
-                domain.append(('date', '<=', cleaned_to))
+            report_period = self._get_period_service().resolve(data)
+            if report_period is None:
+                return {'status': 'error', 'message': INVALID_PERIOD_MESSAGE}
+
+            if report_period.date_from:
+                domain.append(('date', '>=', report_period.date_from))
+            if report_period.date_to:
+                domain.append(('date', '<=', report_period.date_to))
 
             failures = request.env['scada.equipment.failure'].search(
                 domain,
@@ -111,20 +111,31 @@ class MrpProduction(models.Model):
     def button_mark_done(self):
         self._scada_normalize_main_finished_moves()
         res = super().button_mark_done()
+        self._scada_create_oee_summaries()
+        return res
+
+    def _scada_create_oee_summaries(self):
+        """Create missing OEE summaries for all done MOs in one batch."""
         oee_model = self.env['scada.equipment.oee']
 
-        for mo in self:
-            if mo.state != 'done':
-                continue
+        equipment_by_mo = {}
+        for mo in self.filtered(lambda p: p.state == 'done'):
             equipment = mo.scada_equipment_id or (mo.bom_id.scada_equipment_id if mo.bom_id else False)
-            if not equipment:
-                continue
-            if oee_model.search([('manufacturing_order_id', '=', mo.id)], limit=1):
-                continue
-            vals = oee_model.prepare_from_mo(mo, equipment)
-            oee_model.create(vals)
-
-        return res
+            if equipment:
+                equipment_by_mo[mo.id] = equipment
+        if not equipment_by_mo:
+            return oee_model
+
+        existing = oee_model.search([
+            ('manufacturing_order_id', 'in', list(equipment_by_mo))
+        ])
+        for mo_id in existing.mapped('manufacturing_order_id').ids:
+            equipment_by_mo.pop(mo_id, None)
+        if not equipment_by_mo:
+            return oee_model
+
+        vals_list = oee_model._prepare_values_from_mos(self, equipment_by_mo)
+        return oee_model.create(vals_list)
 
     def _scada_normalize_main_finished_moves(self):
         """
@@ -2,6 +2,8 @@
 
 from odoo import models, fields, api
 
+from ..services.report_period_service import invalidate_report_cache
+
 
 class ScadaEquipmentOee(models.Model):
     _name = 'scada.equipment.oee'
@@ -156,41 +158,100 @@ class ScadaEquipmentOee(models.Model):
 
     @classmethod
     def prepare_from_mo(cls, mo, equipment):
-        finished_qty = sum(
-            move.quantity_done for move in mo.move_finished_ids
-            if move.state != 'cancel'
-        )
-        actual_consumed = sum(
-            move.quantity_done for move in mo.move_raw_ids
-            if move.state != 'cancel'
-        )
-
-        bom_consumption = 0.0
-        if mo.bom_id and mo.bom_id.product_qty:
-            for line in mo.bom_id.bom_line_ids:
-                bom_consumption += (
-                    (line.product_qty / mo.bom_id.product_qty) * mo.product_qty
-                )
-
-        planned_qty = mo.product_qty or 0.0
-        variance_finished = finished_qty - planned_qty
-        variance_consumption = actual_consumed - bom_consumption
+        return mo.env['scada.equipment.oee']._prepare_values_from_mos(
+            mo, {mo.id: equipment}
+        )[0]
+
+    @api.model
+    def _prepare_values_from_mos(self, productions, equipment_by_mo):
+        """Build OEE create values for several MOs at once.
+
+        Args:
+            productions: mrp.production recordset
+            equipment_by_mo: dict {mo_id: scada.equipment record}
+
+        Returns:
+            list of vals dict, one per MO present in ``equipment_by_mo``
+        """
+        productions = productions.filtered(lambda mo: mo.id in equipment_by_mo)
+        move_data = self._collect_move_data_from_mos(productions)
+        vals_list = []
+        for mo in productions:
+            equipment = equipment_by_mo[mo.id]
+            data = move_data.get(mo.id) or self._empty_move_data()
+            finished_qty = data['finished_qty']
+            actual_consumed = data['actual_consumed']
+
+            bom_consumption = 0.0
+            if mo.bom_id and mo.bom_id.product_qty:
+                for line in mo.bom_id.bom_line_ids:
+                    bom_consumption += (
+                        (line.product_qty / mo.bom_id.product_qty) * mo.product_qty
+                    )
+
+            planned_qty = mo.product_qty or 0.0
+            variance_finished = finished_qty - planned_qty
+            variance_consumption = actual_consumed - bom_consumption
+
+            vals_list.append({
+                'manufacturing_order_id': mo.id,
+                'equipment_id': equipment.id,
+                'date_done': mo.date_finished or mo.date_planned_finished or fields.Datetime.now(),
+                'qty_planned': planned_qty,
+                'qty_finished': finished_qty,
+                'qty_bom_consumption': bom_consumption,
+                'qty_actual_consumption': actual_consumed,
+                'variance_finished': variance_finished,
+                'variance_consumption': variance_consumption,
+                'yield_percent': self._safe_ratio(finished_qty, planned_qty),
+                'consumption_ratio': self._safe_ratio(actual_consumed, bom_consumption),
+                'company_id': mo.company_id.id,
+                'line_ids': self._prepare_consumption_lines(mo, data['consumed_by_equipment']),
+            })
+        return vals_list
 
+    @staticmethod
+    def _empty_move_data():
         return {
-            'manufacturing_order_id': mo.id,
-            'equipment_id': equipment.id,
-            'date_done': mo.date_finished or mo.date_planned_finished or fields.Datetime.now(),
-            'qty_planned': planned_qty,
-            'qty_finished': finished_qty,
-            'qty_bom_consumption': bom_consumption,
-            'qty_actual_consumption': actual_consumed,
-            'variance_finished': variance_finished,
-            'variance_consumption': variance_consumption,
-            'yield_percent': cls._safe_ratio(finished_qty, planned_qty),
-            'consumption_ratio': cls._safe_ratio(actual_consumed, bom_consumption),
-            'company_id': mo.company_id.id,
-            'line_ids': cls._prepare_consumption_lines_from_mo(mo),
+            'finished_qty': 0.0,
+            'actual_consumed': 0.0,
+            'consumed_by_equipment': {},
+        }
+
+    @api.model
+    def _collect_move_data_from_mos(self, productions):
+        """Aggregate done quantities of raw and finished moves for all MOs.
+
+        ``quantity_done`` is computed for the whole move set in one grouped
+        read over the move lines instead of once per MO.
+
+        Returns:
+            dict {mo_id: {'finished_qty', 'actual_consumed',
+                          'consumed_by_equipment': {equipment record: qty}}}
+        """
+        moves = productions.mapped('move_raw_ids') | productions.mapped('move_finished_ids')
+        moves = moves.filtered(lambda m: m.state != 'cancel')
+        result = {}
+        if not moves:
+            return result
+
+        qty_done_by_move = {
+            row['id']: row['quantity_done'] or 0.0
+            for row in moves.read(['quantity_done'])
         }
+        for move in moves:
+            qty_done = qty_done_by_move.get(move.id, 0.0)
+            if move.raw_material_production_id:
+                data = result.setdefault(move.raw_material_production_id.id, self._empty_move_data())
+                data['actual_consumed'] += qty_done
+                equipment = move.scada_equipment_id
+                if equipment:
+                    consumed = data['consumed_by_equipment']
+                    consumed[equipment] = consumed.get(equipment, 0.0) + qty_done
+            elif move.production_id:
+                data = result.setdefault(move.production_id.id, self._empty_move_data())
+                data['finished_qty'] += qty_done
+        return result
 
     def _build_consumption_line_commands(self):
         self.ensure_one()
@@ -207,30 +268,42 @@ class ScadaEquipmentOee(models.Model):
 
     @api.model_create_multi
     def create(self, vals_list):
+        invalidate_report_cache()
         records = super().create(vals_list)
         # Backward-safe: ensure detail lines exist when OEE created from non-standard flow.
-        for record in records.filtered(lambda r: not r.line_ids and r.manufacturing_order_id):
-            commands = record._build_consumption_line_commands()
-            if commands:
-                record.write({'line_ids': commands})
+        missing = records.filtered(lambda r: not r.line_ids and r.manufacturing_order_id)
+        if missing:
+            move_data = self._collect_move_data_from_mos(missing.mapped('manufacturing_order_id'))
+            for record in missing:
+                mo = record.manufacturing_order_id
+                data = move_data.get(mo.id) or self._empty_move_data()
+                commands = self._prepare_consumption_lines(mo, data['consumed_by_equipment'])
+                if commands:
+                    record.write({'line_ids': commands})
         return records
 
+    def write(self, vals):
+        invalidate_report_cache()
+        return super().write(vals)
+
+    def unlink(self):
+        invalidate_report_cache()
+        return super().unlink()
+
     @classmethod
     def _prepare_consumption_lines_from_mo(cls, mo):
-        line_map = {}
-
-        def _ensure_equipment_bucket(equipment):
-            key = equipment.id if equipment else 0
-            if key not in line_map:
-                line_map[key] = {
-                    'equipment_id': equipment.id if equipment else False,
-                    'equipment_code': equipment.equipment_code if equipment else 'UNMAPPED',
-                    'equipment_name': equipment.name if equipment else 'Unmapped',
-                    'qty_to_consume': 0.0,
-                    'qty_consumed': 0.0,
-                    'material_count': 0,
-                }
-            return line_map[key]
+        move_data = mo.env['scada.equipment.oee']._collect_move_data_from_mos(mo)
+        data = move_data.get(mo.id) or cls._empty_move_data()
+        return cls._prepare_consumption_lines(mo, data['consumed_by_equipment'])
+
+    @classmethod
+    def _prepare_consumption_lines(cls, mo, consumed_by_equipment):
+        """Build per-silo line commands from BoM targets and pre-aggregated actuals.
+
+        Args:
+            mo: mrp.production record
+            consumed_by_equipment: dict {scada.equipment record: consumed qty}
+        """
 
         def _is_silo_equipment(equipment):
             return bool(equipment and equipment.equipment_type == 'silo')
@@ -271,13 +344,12 @@ class ScadaEquipmentOee(models.Model):
                     bucket['qty_to_consume'] += planned_qty
                     bucket['material_count'] += 1
 
-            # 2) Actual from raw move done qty.
-            for move in mo.move_raw_ids.filtered(lambda m: m.state != 'cancel'):
-                equipment = move.scada_equipment_id
+            # 2) Actual from raw move done qty (aggregated per equipment).
+            for equipment, qty_consumed in consumed_by_equipment.items():
                 if not _is_allowed(equipment):
                     continue
                 bucket = _local_bucket(equipment)
-                bucket['qty_consumed'] += move.quantity_done or 0.0
+                bucket['qty_consumed'] += qty_consumed
 
             return local_map
 
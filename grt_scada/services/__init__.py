@@ -7,3 +7,4 @@ from . import validation_service
 from . import product_service
 from . import mo_weight_service
 from . import bom_service
+from . import report_period_service
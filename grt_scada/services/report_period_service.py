@@ -0,0 +1,498 @@
+"""
+Report Period Service
+Resolve report periods once (range, day/shift buckets, timezone) and serve
+bucketed actuals for SCADA reporting endpoints.
+"""
+
+import copy
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import pytz
+
+_logger = logging.getLogger(__name__)
+
+INVALID_PERIOD_MESSAGE = (
+    'Invalid period value. '
+    'Supported: today, yesterday, this_week, last_7_days, '
+    'this_month, last_month, this_year'
+)
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Default shift start hours (local time of the period timezone).
+DEFAULT_SHIFT_STARTS = (6, 14, 22)
+
+# Closed-period result cache (per worker process).
+CACHE_MAX_ENTRIES = 256
+CACHE_TTL_SECONDS = 3600
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_cache_generation = [0]
+
+
+def invalidate_report_cache():
+    """Drop cached closed-period results of this worker.
+
+    Cached results are keyed by the version of their data, so this only
+    frees memory early; other workers pick up changes through the version.
+    """
+    with _cache_lock:
+        _cache_generation[0] += 1
+        _cache.clear()
+
+
+class ReportPeriod:
+    """Resolved report period: datetime range plus day/shift buckets."""
+
+    def __init__(self, date_from, date_to, period=None, tz='UTC'):
+        self.date_from = date_from
+        self.date_to = date_to
+        self.period = period
+        self.tz = tz or 'UTC'
+
+    @property
+    def is_bounded(self):
+        return bool(self.date_from and self.date_to)
+
+    @property
+    def is_closed(self):
+        """Period fully in the past; its results can no longer change."""
+        if not self.is_bounded:
+            return False
+        return self.date_to < datetime.now().strftime(DATETIME_FORMAT)
+
+    def _localize(self, value):
+        dt = datetime.strptime(value, DATETIME_FORMAT)
+        if self.tz == 'UTC':
+            return dt
+        return pytz.utc.localize(dt).astimezone(pytz.timezone(self.tz)).replace(tzinfo=None)
+
+    def day_buckets(self):
+        """List of day keys (YYYY-MM-DD) covered by the period."""
+        if not self.is_bounded:
+            return []
+        day = self._localize(self.date_from).date()
+        last_day = self._localize(self.date_to).date()
+        days = []
+        while day <= last_day:
+            days.append(day.isoformat())
+            day += timedelta(days=1)
+        return days
+
+    def shift_buckets(self, shift_starts=DEFAULT_SHIFT_STARTS):
+        """List of (day_key, shift_no) covered by the period."""
+        return [
+            (day, shift_no)
+            for day in self.day_buckets()
+            for shift_no in range(1, len(shift_starts) + 1)
+        ]
+
+    @staticmethod
+    def shift_key_for_hour(day_key, hour, shift_starts=DEFAULT_SHIFT_STARTS):
+        """Map a local (day, hour) to its (shift day, shift_no).
+
+        Hours before the first shift start belong to the last shift of the
+        previous day.
+        """
+        starts = sorted(shift_starts)
+        if hour < starts[0]:
+            previous_day = (datetime.strptime(day_key, '%Y-%m-%d') - timedelta(days=1)).date()
+            return (previous_day.isoformat(), len(starts))
+        shift_no = 1
+        for index, start in enumerate(starts, start=1):
+            if hour >= start:
+                shift_no = index
+        return (day_key, shift_no)
+
+    def to_key(self):
+        return (self.date_from, self.date_to, self.tz)
+
+
+class ReportPeriodService:
+    """Shared period resolver for SCADA report endpoints"""
+
+    def __init__(self, env):
+        self.env = env
+
+    # ===== PARSING =====
+
+    @staticmethod
+    def normalize_datetime(value, is_end=False):
+        if not value:
+            return None
+        cleaned = str(value).strip().replace('T', ' ')
+        if not cleaned:
+            return None
+
+        parse_formats = [
+            '%Y-%m-%d %H:%M:%S',
+            '%Y-%m-%d %H:%M',
+            '%Y-%m-%d',
+            '%d/%m/%Y %H:%M:%S',
+            '%d/%m/%Y %H:%M',
+            '%d/%m/%Y',
+        ]
+        for datetime_format in parse_formats:
+            try:
+                parsed = datetime.strptime(cleaned, datetime_format)
+                if datetime_format in ('%Y-%m-%d', '%d/%m/%Y'):
+                    if is_end:
+                        parsed = parsed.replace(hour=23, minute=59, second=59, microsecond=0)
+                    else:
+                        parsed = parsed.replace(hour=0, minute=0, second=0, microsecond=0)
+                elif datetime_format in ('%Y-%m-%d %H:%M', '%d/%m/%Y %H:%M'):
+                    parsed = parsed.replace(second=59 if is_end else 0, microsecond=0)
+                else:
+                    parsed = parsed.replace(microsecond=0)
+                return parsed.strftime(DATETIME_FORMAT)
+            except Exception:
+                continue
+
+        return cleaned
+
+    @staticmethod
+    def period_range(period, now=None):
+        """Return (start, end) strings for a named period.
+
+        (None, None) when no period is given, (False, False) when unknown.
+        """
+        period = (period or '').strip().lower()
+        if not period:
+            return (None, None)
+
+        now = now or datetime.now()
+        start_of = dict(hour=0, minute=0, second=0, microsecond=0)
+        end_of = dict(hour=23, minute=59, second=59, microsecond=0)
+
+        if period == 'today':
+            start_dt = now.replace(**start_of)
+            end_dt = now.replace(**end_of)
+        elif period == 'yesterday':
+            y = now - timedelta(days=1)
+            start_dt = y.replace(**start_of)
+            end_dt = y.replace(**end_of)
+        elif period == 'this_week':
+            week_start = now - timedelta(days=now.weekday())
+            start_dt = week_start.replace(**start_of)
+            end_dt = now.replace(**end_of)
+        elif period == 'last_7_days':
+            start_dt = (now - timedelta(days=6)).replace(**start_of)
+            end_dt = now.replace(**end_of)
+        elif period == 'this_month':
+            start_dt = now.replace(day=1, **start_of)
+            end_dt = now.replace(**end_of)
+        elif period == 'last_month':
+            first_this_month = now.replace(day=1, **start_of)
+            last_prev_month = first_this_month - timedelta(seconds=1)
+            start_dt = last_prev_month.replace(day=1, **start_of)
+            end_dt = last_prev_month.replace(**end_of)
+        elif period == 'this_year':
+            start_dt = now.replace(month=1, day=1, **start_of)
+            end_dt = now.replace(**end_of)
+        else:
+            return (False, False)
+
+        return (start_dt.strftime(DATETIME_FORMAT), end_dt.strftime(DATETIME_FORMAT))
+
+    def _get_tz(self, payload):
+        tz_name = (payload or {}).get('tz') or 'UTC'
+        if tz_name not in pytz.all_timezones_set:
+            tz_name = 'UTC'
+        return tz_name
+
+    def resolve(self, payload, default_period=None):
+        """Resolve date_from/date_to/period from a request payload.
+
+        Explicit date_from/date_to override the bounds of the named period.
+
+        Returns:
+            ReportPeriod, or None when the period name is invalid
+        """
+        payload = payload or {}
+        period = payload.get('period') or default_period
+
+        period_from = None
+        period_to = None
+        if period:
+            period_from, period_to = self.period_range(period)
+            if period_from is False:
+                return None
+
+        date_from = self.normalize_datetime(payload.get('date_from'), is_end=False) or period_from
+        date_to = self.normalize_datetime(payload.get('date_to'), is_end=True) or period_to
+        return ReportPeriod(date_from, date_to, period=period, tz=self._get_tz(payload))
+
+    def resolve_day(self, day_value=None):
+        """Resolve a single report day (default: today)."""
+        if day_value:
+            normalized = self.normalize_datetime(day_value, is_end=False)
+            day_date = datetime.strptime(str(normalized)[:10], '%Y-%m-%d')
+        else:
+            day_date = datetime.now()
+        start_dt = day_date.replace(hour=0, minute=0, second=0, microsecond=0)
+        end_dt = day_date.replace(hour=23, minute=59, second=59, microsecond=0)
+        return ReportPeriod(
+            start_dt.strftime(DATETIME_FORMAT),
+            end_dt.strftime(DATETIME_FORMAT),
+            period='day',
+        )
+
+    # ===== CACHE =====
+
+    def _data_version(self, mo_domain, oee_domain, oee_of_mos=True):
+        """Version of the rows feeding a target/actual result.
+
+        Latest write_date, row count and quantity total of the MOs in the
+        domain and of their OEE rows (of every OEE row in ``oee_domain``
+        when ``oee_of_mos`` is false). Any edit, late record or deletion
+        changes it, in every worker, so a cached result is never served
+        stale. The totals catch edits made within one transaction, which
+        share their write_date.
+        """
+        mo_model = self.env['mrp.production']
+        oee_model = self.env['scada.equipment.oee']
+        mo_from, mo_where, mo_params = self._get_where_sql(mo_model, mo_domain)
+        oee_from, oee_where, oee_params = self._get_where_sql(oee_model, oee_domain)
+        query = """
+            WITH mo AS (
+                SELECT "mrp_production"."id" AS id,
+                       "mrp_production"."write_date" AS write_date,
+                       "mrp_production"."product_qty" AS qty
+                  FROM {mo_from}
+                 WHERE {mo_where}
+            ), oee AS (
+                SELECT "scada_equipment_oee"."write_date" AS write_date,
+                       "scada_equipment_oee"."qty_finished" AS qty
+                  FROM {oee_from}
+                 WHERE {oee_where}
+                   {oee_of_mos}
+            )
+            SELECT (SELECT ROW(MAX(write_date), COUNT(*), SUM(qty)) FROM mo),
+                   (SELECT ROW(MAX(write_date), COUNT(*), SUM(qty)) FROM oee)
+        """.format(
+            mo_from=mo_from,
+            mo_where=mo_where or 'TRUE',
+            oee_from=oee_from,
+            oee_where=oee_where or 'TRUE',
+            oee_of_mos='AND "scada_equipment_oee"."manufacturing_order_id" IN (SELECT id FROM mo)'
+                       if oee_of_mos else '',
+        )
+        self.env.cr.execute(query, list(mo_params) + list(oee_params))
+        return tuple(str(value) for value in self.env.cr.fetchone())
+
+    def cached(self, name, period, params, compute, version=None):
+        """Return compute() result, memoized when the period is closed.
+
+        Args:
+            name: logical result name (e.g. 'daily_target_actual')
+            period: ReportPeriod
+            params: hashable tuple of extra filters affecting the result
+            compute: callable producing a JSON-serializable result
+            version: callable returning the data version of the result
+                (see ``_data_version``); part of the cache key
+        """
+        if not period or not period.is_closed:
+            return compute()
+
+        key = (
+            self.env.cr.dbname,
+            self.env.uid,
+            self.env.lang,
+            tuple(self.env.companies.ids),
+            name,
+            period.to_key(),
+            params,
+            version() if version else None,
+        )
+        now = time.time()
+        with _cache_lock:
+            entry = _cache.get(key)
+            if entry and now - entry[0] < CACHE_TTL_SECONDS:
+                _cache.move_to_end(key)
+                return copy.deepcopy(entry[1])
+            generation = _cache_generation[0]
+
+        result = compute()
+        with _cache_lock:
+            if generation == _cache_generation[0]:
+                _cache[key] = (now, copy.deepcopy(result))
+                _cache.move_to_end(key)
+                while len(_cache) > CACHE_MAX_ENTRIES:
+                    _cache.popitem(last=False)
+        return result
+
+    # ===== BUCKETED AGGREGATES =====
+
+    def _bucket_sql(self, column, granularity, tz):
+        if tz and tz != 'UTC':
+            column = "timezone(%s, timezone('UTC', {}))".format(column)
+            return "date_trunc('{}', {})".format(granularity, column), [tz]
+        return "date_trunc('{}', {})".format(granularity, column), []
+
+    def _get_where_sql(self, model, domain):
+        model.check_access_rights('read')
+        query = model._where_calc(domain)
+        model._apply_ir_rules(query, 'read')
+        return query.get_sql()
+
+    def _fetch_target_actual(self, period, mo_domain, oee_domain, limit, granularity):
+        mo_model = self.env['mrp.production']
+        oee_model = self.env['scada.equipment.oee']
+        mo_from, mo_where, mo_params = self._get_where_sql(mo_model, mo_domain)
+        oee_from, oee_where, oee_params = self._get_where_sql(oee_model, oee_domain)
+        bucket_sql, bucket_params = self._bucket_sql(
+            '"mrp_production"."date_planned_start"', granularity, period.tz
+        )
+
+        query = """
+            WITH mo AS (
+                SELECT "mrp_production"."id" AS id,
+                       "mrp_production"."product_qty" AS target_qty,
+                       {bucket} AS bucket
+                  FROM {mo_from}
+                 WHERE {mo_where}
+                   AND "mrp_production"."date_planned_start" IS NOT NULL
+              ORDER BY "mrp_production"."date_planned_start" ASC, "mrp_production"."id" ASC
+                 {limit}
+            ), actual AS (
+                SELECT "scada_equipment_oee"."manufacturing_order_id" AS mo_id,
+                       SUM("scada_equipment_oee"."qty_finished") AS actual_qty
+                  FROM {oee_from}
+                 WHERE {oee_where}
+                   AND "scada_equipment_oee"."manufacturing_order_id" IN (SELECT id FROM mo)
+              GROUP BY "scada_equipment_oee"."manufacturing_order_id"
+            )
+            SELECT mo.bucket,
+                   SUM(COALESCE(mo.target_qty, 0)),
+                   SUM(COALESCE(actual.actual_qty, 0)),
+                   COUNT(actual.mo_id)
+              FROM mo
+         LEFT JOIN actual ON actual.mo_id = mo.id
+          GROUP BY mo.bucket
+          ORDER BY mo.bucket
+        """.format(
+            bucket=bucket_sql,
+            mo_from=mo_from,
+            mo_where=mo_where or 'TRUE',
+            oee_from=oee_from,
+            oee_where=oee_where or 'TRUE',
+            limit='LIMIT %s' if limit else '',
+        )
+        params = bucket_params + list(mo_params)
+        if limit:
+            params.append(limit)
+        params += list(oee_params)
+        self.env.cr.execute(query, params)
+        return self.env.cr.fetchall()
+
+    def get_daily_target_actual(self, period, mo_domain, oee_domain=None, limit=None):
+        """Target (MO planned qty) vs actual (OEE finished qty) per day.
+
+        Actuals are aligned on the planned day of their MO. All buckets are
+        fetched with one grouped query over ``date_trunc``.
+
+        Returns:
+            list of {'date', 'target_qty', 'actual_qty'} sorted by date; days
+            without MOs are omitted.
+        """
+        self.env['mrp.production'].flush(['date_planned_start', 'product_qty', 'state'])
+        self.env['scada.equipment.oee'].flush(['manufacturing_order_id', 'qty_finished'])
+
+        def _compute():
+            rows = self._fetch_target_actual(period, mo_domain, oee_domain or [], limit, 'day')
+            return [
+                {
+                    'date': bucket.date().isoformat(),
+                    'target_qty': float(target_qty or 0.0),
+                    'actual_qty': float(actual_qty or 0.0),
+                }
+                for bucket, target_qty, actual_qty, _count in rows
+            ]
+
+        params = (repr(mo_domain), repr(oee_domain), limit)
+        return self.cached(
+            'daily_target_actual', period, params, _compute,
+            version=lambda: self._data_version(mo_domain, oee_domain or []),
+        )
+
+    def get_shift_target_actual(self, period, mo_domain, oee_domain=None, shift_starts=DEFAULT_SHIFT_STARTS):
+        """Target vs actual per (day, shift) in the period timezone."""
+        self.env['mrp.production'].flush(['date_planned_start', 'product_qty', 'state'])
+        self.env['scada.equipment.oee'].flush(['manufacturing_order_id', 'qty_finished'])
+
+        def _compute():
+            rows = self._fetch_target_actual(period, mo_domain, oee_domain or [], None, 'hour')
+            shift_map = OrderedDict(
+                (key, {'date': key[0], 'shift': key[1], 'target_qty': 0.0, 'actual_qty': 0.0})
+                for key in period.shift_buckets(shift_starts)
+            )
+            for bucket, target_qty, actual_qty, _count in rows:
+                key = ReportPeriod.shift_key_for_hour(
+                    bucket.date().isoformat(), bucket.hour, shift_starts
+                )
+                row = shift_map.setdefault(
+                    key, {'date': key[0], 'shift': key[1], 'target_qty': 0.0, 'actual_qty': 0.0}
+                )
+                row['target_qty'] += float(target_qty or 0.0)
+                row['actual_qty'] += float(actual_qty or 0.0)
+            return list(shift_map.values())
+
+        params = (repr(mo_domain), repr(oee_domain), tuple(shift_starts))
+        return self.cached(
+            'shift_target_actual', period, params, _compute,
+            version=lambda: self._data_version(mo_domain, oee_domain or []),
+        )
+
+    # ===== OEE SUMMARY =====
+
+    def get_oee_summary(self, period, mo_domain, oee_domain):
+        """OEE totals, quality averages and quality per equipment.
+
+        Returns:
+            dict with the raw read_group rows under 'total', 'quality' and
+            'by_equipment'; closed periods are cached on the data version of
+            the MOs and OEE rows of the period.
+        """
+        oee_model = self.env['scada.equipment.oee']
+        self.env['mrp.production'].flush(['date_planned_start', 'product_qty', 'state'])
+        oee_model.flush()
+        versions = []
+
+        def version():
+            if not versions:
+                versions.append(self._data_version(mo_domain, oee_domain, oee_of_mos=False))
+            return versions[0]
+
+        quality_fields = [
+            'yield_percent:avg',
+            'consumption_ratio:avg',
+            'avg_silo_oee_percent:avg',
+            'max_abs_deviation_percent:avg',
+            'deviation_alert_count:sum',
+            'id:count',
+        ]
+        params = repr(oee_domain)
+        return {
+            'total': self.cached(
+                'oee_total', period, params,
+                lambda: oee_model.read_group(
+                    oee_domain, ['qty_finished:sum', 'qty_planned:sum', 'id:count'], [], lazy=False,
+                ),
+                version=version,
+            ),
+            'quality': self.cached(
+                'oee_quality', period, params,
+                lambda: oee_model.read_group(oee_domain, quality_fields, [], lazy=False),
+                version=version,
+            ),
+            'by_equipment': self.cached(
+                'oee_quality_by_equipment', period, params,
+                lambda: oee_model.read_group(
+                    oee_domain, ['equipment_id'] + quality_fields, ['equipment_id'], lazy=False,
+                ),
+                version=version,
+            ),
+        }
@@ -1,3 +1,6 @@
 """
 Tests for SCADA module
 """
+
+from . import test_oee_bulk
+from . import test_report_period
@@ -0,0 +1,126 @@
+"""
+Test batch OEE creation on MO mark done
+"""
+
+import logging
+import time
+
+from odoo.tests import TransactionCase, tagged
+
+_logger = logging.getLogger(__name__)
+
+
+class ScadaOeeBulkCase(TransactionCase):
+    """Equipment, produk dan BoM untuk test OEE massal"""
+
+    def setUp(self):
+        super().setUp()
+        self.equipment_model = self.env['scada.equipment']
+        self.oee_model = self.env['scada.equipment.oee']
+
+        self.mixer = self.equipment_model.create({
+            'name': 'Mixer Bench',
+            'equipment_code': 'MIXBENCH',
+            'equipment_type': 'plc',
+        })
+        self.silo_a = self.equipment_model.create({
+            'name': 'Silo A',
+            'equipment_code': 'SILOBENCHA',
+            'equipment_type': 'silo',
+        })
+        self.silo_b = self.equipment_model.create({
+            'name': 'Silo B',
+            'equipment_code': 'SILOBENCHB',
+            'equipment_type': 'silo',
+        })
+
+        product_model = self.env['product.product']
+        self.finished = product_model.create({'name': 'Feed Bench', 'type': 'consu'})
+        self.material_a = product_model.create({'name': 'Corn Bench', 'type': 'consu'})
+        self.material_b = product_model.create({'name': 'Soy Bench', 'type': 'consu'})
+
+        self.bom = self.env['mrp.bom'].create({
+            'product_tmpl_id': self.finished.product_tmpl_id.id,
+            'product_qty': 1.0,
+            'consumption': 'flexible',
+            'scada_equipment_id': self.mixer.id,
+            'bom_line_ids': [
+                (0, 0, {
+                    'product_id': self.material_a.id,
+                    'product_qty': 0.6,
+                    'scada_equipment_id': self.silo_a.id,
+                }),
+                (0, 0, {
+                    'product_id': self.material_b.id,
+                    'product_qty': 0.4,
+                    'scada_equipment_id': self.silo_b.id,
+                }),
+            ],
+        })
+
+    def _create_confirmed_mos(self, count):
+        mos = self.env['mrp.production'].create([{
+            'product_id': self.finished.id,
+            'product_uom_id': self.finished.uom_id.id,
+            'product_qty': 10.0,
+            'bom_id': self.bom.id,
+        } for _i in range(count)])
+        mos.action_confirm()
+        for mo in mos:
+            mo.qty_producing = mo.product_qty
+            mo._set_qty_producing()
+        return mos
+
+
+@tagged('post_install', '-at_install', 'scada', 'oee')
+class TestScadaOeeBulk(ScadaOeeBulkCase):
+    """OEE summary dibuat sekaligus untuk banyak MO"""
+
+    def test_prepare_values_matches_single_mo(self):
+        """Batch values sama dengan hasil per MO"""
+        mos = self._create_confirmed_mos(3)
+        equipment_by_mo = {mo.id: self.mixer for mo in mos}
+        batch_vals = self.oee_model._prepare_values_from_mos(mos, equipment_by_mo)
+        for mo, vals in zip(mos, batch_vals):
+            self.assertEqual(vals, self.oee_model.prepare_from_mo(mo, self.mixer))
+
+    def test_mark_done_creates_oee_once(self):
+        """Mark done ulang tidak membuat OEE ganda"""
+        mos = self._create_confirmed_mos(2)
+        mos.button_mark_done()
+        oee = self.oee_model.search([('manufacturing_order_id', 'in', mos.ids)])
+        self.assertEqual(len(oee), 2)
+        self.assertEqual(len(mos._scada_create_oee_summaries()), 0)
+
+
+@tagged('post_install', '-at_install', '-standard', 'scada_benchmark')
+class TestScadaOeeBulkBenchmark(ScadaOeeBulkCase):
+    """Benchmark mark done banyak MO, di luar suite standar"""
+
+    MO_COUNT = 200
+
+    def test_benchmark_mark_done_200_mos(self):
+        """Benchmark: close 200 MOs together"""
+        mos = self._create_confirmed_mos(self.MO_COUNT)
+        mos.flush()
+        mos.invalidate_cache()
+
+        queries_before = self.cr.sql_log_count
+        started = time.time()
+        mos.button_mark_done()
+        elapsed = time.time() - started
+        queries = self.cr.sql_log_count - queries_before
+
+        self.assertTrue(all(mo.state == 'done' for mo in mos))
+        oee = self.oee_model.search([('manufacturing_order_id', 'in', mos.ids)])
+        self.assertEqual(len(oee), self.MO_COUNT)
+        for record in oee:
+            self.assertEqual(record.equipment_id, self.mixer)
+            self.assertEqual(len(record.line_ids), 2)
+            self.assertAlmostEqual(record.qty_finished, 10.0)
+            self.assertAlmostEqual(record.qty_actual_consumption, 10.0)
+
+        _logger.info(
+            'SCADA OEE benchmark: %s MOs marked done in %.2fs (%s queries)',
+            self.MO_COUNT, elapsed, queries,
+        )
@@ -0,0 +1,139 @@
+"""
+Test shared report period resolver
+"""
+
+from datetime import datetime, timedelta
+
+from odoo.tests import TransactionCase, tagged
+
+from ..services.report_period_service import (
+    ReportPeriod,
+    ReportPeriodService,
+    invalidate_report_cache,
+)
+
+
+@tagged('post_install', '-at_install', 'scada', 'report_period')
+class TestReportPeriodService(TransactionCase):
+    """Test cases untuk ReportPeriodService"""
+
+    def setUp(self):
+        super().setUp()
+        invalidate_report_cache()
+        self.service = ReportPeriodService(self.env)
+        self.product = self.env['product.product'].create({
+            'name': 'Period Bench Product',
+            'type': 'consu',
+        })
+
+    def test_resolve_period_and_override(self):
+        """date_from/date_to override named period bounds"""
+        report_period = self.service.resolve({
+            'period': 'this_month',
+            'date_from': '2024-02-03',
+        })
+        self.assertEqual(report_period.date_from, '2024-02-03 00:00:00')
+        self.assertTrue(report_period.date_to.endswith('23:59:59'))
+        self.assertIsNone(self.service.resolve({'period': 'next_decade'}))
+
+    def test_buckets(self):
+        """Day and shift buckets cover the whole period"""
+        report_period = ReportPeriod('2024-02-01 00:00:00', '2024-02-03 23:59:59')
+        self.assertEqual(report_period.day_buckets(), ['2024-02-01', '2024-02-02', '2024-02-03'])
+        self.assertEqual(len(report_period.shift_buckets()), 9)
+        self.assertTrue(report_period.is_closed)
+        self.assertEqual(ReportPeriod.shift_key_for_hour('2024-02-02', 3), ('2024-02-01', 3))
+        self.assertEqual(ReportPeriod.shift_key_for_hour('2024-02-02', 15), ('2024-02-02', 2))
+
+    def test_daily_target_actual_grouped(self):
+        """Grouped query returns per-day target and actual"""
+        base = datetime(2024, 1, 10, 8, 0, 0)
+        mos = self.env['mrp.production'].create([{
+            'product_id': self.product.id,
+            'product_uom_id': self.product.uom_id.id,
+            'product_qty': 5.0 * (index + 1),
+            'date_planned_start': base + timedelta(days=index % 2),
+        } for index in range(4)])
+        equipment = self.env['scada.equipment'].create({
+            'name': 'Period Mixer',
+            'equipment_code': 'PERIODMIX',
+            'equipment_type': 'plc',
+        })
+        self.env['scada.equipment.oee'].create({
+            'manufacturing_order_id': mos[0].id,
+            'equipment_id': equipment.id,
+            'qty_finished': 4.0,
+        })
+
+        report_period = self.service.resolve({
+            'date_from': '2024-01-01',
+            'date_to': '2024-01-31',
+        })
+        mo_domain = [
+            ('id', 'in', mos.ids),
+            ('date_planned_start', '>=', report_period.date_from),
+            ('date_planned_start', '<=', report_period.date_to),
+        ]
+        chart = self.service.get_daily_target_actual(report_period, mo_domain, limit=1000)
+        self.assertEqual(chart, [
+            {'date': '2024-01-10', 'target_qty': 20.0, 'actual_qty': 4.0},
+            {'date': '2024-01-11', 'target_qty': 30.0, 'actual_qty': 0.0},
+        ])
+        # Closed period served from memory while its data is unchanged.
+        self.assertEqual(
+            self.service.get_daily_target_actual(report_period, mo_domain, limit=1000),
+            chart,
+        )
+        # A late MO edit changes the data version: fresh numbers, no
+        # explicit invalidation needed.
+        mos[1].product_qty = 99.0
+        mos.flush()
+        self.assertEqual(
+            self.service.get_daily_target_actual(report_period, mo_domain, limit=1000),
+            [
+                {'date': '2024-01-10', 'target_qty': 20.0, 'actual_qty': 4.0},
+                {'date': '2024-01-11', 'target_qty': 119.0, 'actual_qty': 0.0},
+            ],
+        )
+
+    def test_oee_summary_follows_oee_edits(self):
+        """Closed period OEE totals are fresh after an OEE row is edited"""
+        mo = self.env['mrp.production'].create({
+            'product_id': self.product.id,
+            'product_uom_id': self.product.uom_id.id,
+            'product_qty': 10.0,
+            'date_planned_start': datetime(2024, 1, 10, 8, 0, 0),
+        })
+        equipment = self.env['scada.equipment'].create({
+            'name': 'Summary Mixer',
+            'equipment_code': 'SUMMIX',
+            'equipment_type': 'plc',
+        })
+        oee = self.env['scada.equipment.oee'].create({
+            'manufacturing_order_id': mo.id,
+            'equipment_id': equipment.id,
+            'date_done': datetime(2024, 1, 10, 12, 0, 0),
+            'qty_planned': 10.0,
+            'qty_finished': 4.0,
+        })
+        report_period = self.service.resolve({
+            'date_from': '2024-01-01',
+            'date_to': '2024-01-31',
+        })
+        mo_domain = [
+            ('id', '=', mo.id),
+            ('date_planned_start', '>=', report_period.date_from),
+            ('date_planned_start', '<=', report_period.date_to),
+        ]
+        oee_domain = [
+            ('equipment_id', '=', equipment.id),
+            ('date_done', '>=', report_period.date_from),
+            ('date_done', '<=', report_period.date_to),
+        ]
+        summary = self.service.get_oee_summary(report_period, mo_domain, oee_domain)
+        self.assertEqual(summary['total'][0]['qty_finished'], 4.0)
+        self.assertEqual(summary['by_equipment'][0]['equipment_id'][0], equipment.id)
+
+        oee.qty_finished = 7.0
+        summary = self.service.get_oee_summary(report_period, mo_domain, oee_domain)
+        self.assertEqual(summary['total'][0]['qty_finished'], 7.0)
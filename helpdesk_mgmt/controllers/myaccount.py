@@ -47,12 +47,14 @@ class CustomerPortalHelpdesk(CustomerPortal):
             },
         }
         searchbar_filters = {"all": {"label": _("All"), "domain": []}}
-        for stage in request.env["helpdesk.ticket.stage"].search([]):
+        for stage_id, stage_name, _closed in request.env[
+            "helpdesk.ticket.stage"
+        ]._get_portal_stages():
             searchbar_filters.update(
                 {
-                    str(stage.id): {
-                        "label": stage.name,
-                        "domain": [("stage_id", "=", stage.id)],
+                    str(stage_id): {
+                        "label": stage_name,
+                        "domain": [("stage_id", "=", stage_id)],
                     }
                 }
             )
@@ -110,8 +112,9 @@ class CustomerPortalHelpdesk(CustomerPortal):
         return request.render("helpdesk_mgmt.portal_helpdesk_ticket_page", values)
 
     def _ticket_get_page_view_values(self, ticket, **kwargs):
-        closed_stages = request.env["helpdesk.ticket.stage"].search(
-            [("closed", "=", True)]
+        stage_model = request.env["helpdesk.ticket.stage"]
+        closed_stages = stage_model.browse(
+            [stage[0] for stage in stage_model._get_portal_stages() if stage[2]]
         )
         values = {
             "page_name": "ticket",
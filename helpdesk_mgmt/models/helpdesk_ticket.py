@@ -72,6 +72,7 @@ class HelpdeskTicket(models.Model):
     team_id = fields.Many2one(
         comodel_name="helpdesk.ticket.team",
         string="Team",
+        index=True,
     )
     priority = fields.Selection(
         selection=[
@@ -1,4 +1,4 @@
-from odoo import fields, models
+from odoo import api, fields, models, tools
 
 
 class HelpdeskTicketStage(models.Model):
@@ -31,3 +31,23 @@ class HelpdeskTicketStage(models.Model):
         string="Company",
         default=lambda self: self.env.company,
     )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        self.clear_caches()
+        return super().create(vals_list)
+
+    def write(self, vals):
+        self.clear_caches()
+        return super().write(vals)
+
+    def unlink(self):
+        self.clear_caches()
+        return super().unlink()
+
+    @api.model
+    @tools.ormcache("self.env.uid", "self.env.lang", "tuple(self.env.companies.ids)")
+    def _get_portal_stages(self):
+        """Return the (id, name, closed) of the stages visible in the portal.
+        Cached, the portal reads them on every request."""
+        return tuple((stage.id, stage.name, stage.closed) for stage in self.search([]))
@@ -67,36 +67,47 @@ class HelpdeskTeam(models.Model):
         help="Allow to select this team when creating a new ticket in the portal.",
     )
 
-    @api.depends("ticket_ids", "ticket_ids.stage_id")
-    def _compute_todo_tickets(self):
+    def _get_todo_ticket_counts(self):
+        """Return the open ticket counters of the teams, as a dict of team id
+        -> (total, unassigned, unattended, high priority), with one grouped
+        query. Record rules apply like in a read_group."""
+        team_ids = [team_id for team_id in self.ids if team_id]
+        if not team_ids:
+            return {}
         ticket_model = self.env["helpdesk.ticket"]
-        fetch_data = ticket_model.read_group(
-            [("team_id", "in", self.ids), ("closed", "=", False)],
-            ["team_id", "user_id", "unattended", "priority"],
-            ["team_id", "user_id", "unattended", "priority"],
-            lazy=False,
+        ticket_model.flush(["team_id", "user_id", "unattended", "priority", "stage_id"])
+        query = ticket_model._where_calc(
+            [("team_id", "in", team_ids), ("closed", "=", False)]
+        )
+        ticket_model._apply_ir_rules(query, "read")
+        from_clause, where_clause, where_params = query.get_sql()
+        self.env.cr.execute(
+            """
+            SELECT "helpdesk_ticket"."team_id",
+                COUNT(*),
+                COUNT(*) FILTER (WHERE "helpdesk_ticket"."user_id" IS NULL),
+                COUNT(*) FILTER (WHERE "helpdesk_ticket"."unattended"),
+                COUNT(*) FILTER (WHERE "helpdesk_ticket"."priority" = '3')
+            FROM {}
+            WHERE {}
+            GROUP BY "helpdesk_ticket"."team_id"
+            """.format(
+                from_clause, where_clause
+            ),
+            where_params,
         )
-        result = [
-            [
-                data["team_id"][0],
-                data["user_id"] and data["user_id"][0],
-                data["unattended"],
-                data["priority"],
-                data["__count"],
-            ]
-            for data in fetch_data
-        ]
+        return {row[0]: row[1:] for row in self.env.cr.fetchall()}
+
+    @api.depends("ticket_ids", "ticket_ids.stage_id")
+    def _compute_todo_tickets(self):
+        counts = self._get_todo_ticket_counts()
         for team in self:
-            team.todo_ticket_count = sum([r[4] for r in result if r[0] == team.id])
-            team.todo_ticket_count_unassigned = sum(
-                [r[4] for r in result if r[0] == team.id and not r[1]]
-            )
-            team.todo_ticket_count_unattended = sum(
-                [r[4] for r in result if r[0] == team.id and r[2]]
-            )
-            team.todo_ticket_count_high_priority = sum(
-                [r[4] for r in result if r[0] == team.id and r[3] == "3"]
-            )
+            (
+                team.todo_ticket_count,
+                team.todo_ticket_count_unassigned,
+                team.todo_ticket_count_unattended,
+                team.todo_ticket_count_high_priority,
+            ) = counts.get(team.id, (0, 0, 0, 0))
 
     def _alias_get_creation_values(self):
         values = super()._alias_get_creation_values()
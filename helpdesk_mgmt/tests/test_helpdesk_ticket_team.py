@@ -1,9 +1,14 @@
 # Copyright 2023 Tecnativa - Víctor Martínez
 # License AGPL-3 - See http://www.gnu.org/licenses/agpl-3.0.html
-from odoo.tests.common import users
+import logging
+import time
+
+from odoo.tests.common import SavepointCase, tagged, users
 
 from .common import TestHelpdeskTicketBase
 
+_logger = logging.getLogger(__name__)
+
 
 class TestHelpdeskTicketTeam(TestHelpdeskTicketBase):
     @users("helpdesk_mgmt-user_own")
@@ -103,3 +108,93 @@ class TestHelpdeskTicketTeam(TestHelpdeskTicketBase):
             self.team_a.todo_ticket_count,
             4,
         )
+
+    @users("helpdesk_mgmt-user_own")
+    def test_helpdesk_ticket_todo_user_own(self):
+        team = self.env["helpdesk.ticket.team"].browse(self.team_a.id)
+        self.assertEqual(team.todo_ticket_count, 2)
+        self.assertEqual(team.todo_ticket_count_unassigned, 1)
+        self.assertEqual(team.todo_ticket_count_high_priority, 1)
+
+
+@tagged("post_install", "-at_install", "-standard", "helpdesk_benchmark")
+class TestHelpdeskTicketTeamBenchmark(SavepointCase):
+
+    TEAM_COUNT = 300
+    TICKET_COUNT = 1000000
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.teams = cls.env["helpdesk.ticket.team"].create(
+            [{"name": "Team %s" % i} for i in range(cls.TEAM_COUNT)]
+        )
+        stages = cls.env["helpdesk.ticket.stage"].search([])
+        cls.env["helpdesk.ticket"].flush()
+        cls.env.cr.execute(
+            """
+            INSERT INTO helpdesk_ticket
+                (number, name, description, stage_id, company_id, team_id,
+                 user_id, priority, active, create_uid, create_date,
+                 write_uid, write_date)
+            SELECT 'BENCH' || n, 'Ticket ' || n, '<p>Benchmark</p>',
+                (%(stages)s::int[])[1 + n %% array_length(%(stages)s::int[], 1)],
+                %(company)s,
+                (%(teams)s::int[])[1 + n %% array_length(%(teams)s::int[], 1)],
+                CASE WHEN n %% 3 = 0 THEN NULL ELSE %(uid)s END,
+                (n %% 4)::varchar, true, %(uid)s, now() at time zone 'UTC',
+                %(uid)s, now() at time zone 'UTC'
+            FROM generate_series(1, %(count)s) AS n
+            """,
+            {
+                "stages": stages.ids,
+                "teams": cls.teams.ids,
+                "company": cls.env.company.id,
+                "uid": cls.env.uid,
+                "count": cls.TICKET_COUNT,
+            },
+        )
+        cls.env.cr.execute(
+            """
+            UPDATE helpdesk_ticket t SET unattended = s.unattended
+            FROM helpdesk_ticket_stage s
+            WHERE s.id = t.stage_id AND t.number LIKE 'BENCH%%'
+            """
+        )
+        cls.env.cr.execute("ANALYZE helpdesk_ticket")
+
+    def test_benchmark_team_dashboard(self):
+        self.teams.invalidate_cache()
+        queries_before = self.cr.sql_log_count
+        started = time.time()
+        counts = self.teams.read(
+            [
+                "todo_ticket_count",
+                "todo_ticket_count_unassigned",
+                "todo_ticket_count_unattended",
+                "todo_ticket_count_high_priority",
+            ]
+        )
+        elapsed = time.time() - started
+        queries = self.cr.sql_log_count - queries_before
+
+        self.env.cr.execute(
+            """
+            SELECT COUNT(*) FROM helpdesk_ticket t
+            JOIN helpdesk_ticket_stage s ON s.id = t.stage_id
+            WHERE t.team_id IN %s AND s.closed IS NOT TRUE AND t.active
+            """,
+            (tuple(self.teams.ids),),
+        )
+        self.assertEqual(
+            sum(team["todo_ticket_count"] for team in counts),
+            self.env.cr.fetchone()[0],
+        )
+        _logger.info(
+            "Helpdesk dashboard benchmark: %s teams, %s tickets in %.2fs "
+            "(%s queries)",
+            self.TEAM_COUNT,
+            self.TICKET_COUNT,
+            elapsed,
+            queries,
+        )
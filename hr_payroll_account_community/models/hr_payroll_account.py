@@ -174,3 +174,7 @@ class HrPayslipRun(models.Model):
                                  required=True, help="journal",
                                  default=lambda self: self.env['account.journal'].search([('type', '=', 'general')],
                                                                                          limit=1))
+
+    def _generate_payslips(self, employees):
+        # also reached from the generation jobs, where the wizard context is gone
+        return super(HrPayslipRun, self.with_context(journal_id=self.journal_id.id))._generate_payslips(employees)
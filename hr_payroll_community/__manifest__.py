@@ -25,6 +25,7 @@
         'views/hr_payslip_views.xml',
         'views/hr_employee_views.xml',
         'data/hr_payroll_sequence.xml',
+        'data/hr_payslip_run_job_cron.xml',
         'views/hr_payroll_report.xml',
 #       'data/hr_payroll_data.xml',
 #		'data/hr_payroll_data1.xml',
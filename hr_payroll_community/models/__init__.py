@@ -5,3 +5,4 @@ from . import hr_employee
 from . import res_config_settings
 from . import hr_salary_rule
 from . import hr_payslip
+from . import hr_payslip_run_job
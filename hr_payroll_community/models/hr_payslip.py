@@ -157,6 +157,23 @@ class HrPayslip(models.Model):
                         '|'] + clause_1 + clause_2 + clause_3
         return self.env['hr.contract'].search(clause_final).ids
 
+    @api.model
+    def get_contracts_batch(self, employees, date_from, date_to):
+        """
+        Same as get_contract for many employees with a single search.
+        @return: returns a dict {employee_id: contracts} in get_contract order
+        """
+        clause_1 = ['&', ('date_end', '<=', date_to), ('date_end', '>=', date_from)]
+        clause_2 = ['&', ('date_start', '<=', date_to), ('date_start', '>=', date_from)]
+        clause_3 = ['&', ('date_start', '<=', date_from), '|', ('date_end', '=', False), ('date_end', '>=', date_to)]
+        clause_final = [('employee_id', 'in', employees.ids), ('state', '=', 'open'), '|',
+                        '|'] + clause_1 + clause_2 + clause_3
+        res = {}
+        for contract in self.env['hr.contract'].search(clause_final):
+            res.setdefault(contract.employee_id.id, self.env['hr.contract'])
+            res[contract.employee_id.id] |= contract
+        return res
+
     def compute_sheet(self):
 
         for payslip in self:
@@ -249,14 +266,17 @@ class HrPayslip(models.Model):
         return res
 
     @api.model
-    def get_inputs(self, contracts, date_from, date_to):
-
-        res = []
-
+    def _get_rule_inputs(self, contracts):
         structure_ids = contracts.get_all_structures()
         rule_ids = self.env['hr.payroll.structure'].browse(structure_ids).get_all_rules()
         sorted_rule_ids = [id for id, sequence in sorted(rule_ids, key=lambda x: x[1])]
-        inputs = self.env['hr.salary.rule'].browse(sorted_rule_ids).mapped('input_ids')
+        return self.env['hr.salary.rule'].browse(sorted_rule_ids).mapped('input_ids')
+
+    @api.model
+    def get_inputs(self, contracts, date_from, date_to):
+
+        res = []
+        inputs = self._get_rule_inputs(contracts)
 
         for contract in contracts:
             for input in inputs:
@@ -632,12 +652,97 @@ class HrPayslipRun(models.Model):
                                  help="If its checked, indicates that all payslips generated from here are refund "
                                       "payslips.")
 
+    job_ids = fields.One2many('hr.payslip.run.job', 'payslip_run_id', string='Generation Jobs', readonly=True)
+    generate_progress = fields.Float(string='Generation Progress', compute='_compute_generate_progress',
+                                     help="Percentage of the employees queued for this batch that were processed.")
+    generate_failed_count = fields.Integer(string='Failed Jobs', compute='_compute_generate_progress')
+
+    @api.depends('job_ids.state', 'job_ids.employee_count')
+    def _compute_generate_progress(self):
+        for run in self:
+            total = sum(run.job_ids.mapped('employee_count'))
+            processed = sum(run.job_ids.filtered(lambda job: job.state != 'pending').mapped('employee_count'))
+            run.generate_progress = total and 100.0 * processed / total or 0.0
+            run.generate_failed_count = len(run.job_ids.filtered(lambda job: job.state == 'failed'))
+
     def draft_payslip_run(self):
         return self.write({'state': 'draft'})
 
     def close_payslip_run(self):
         return self.write({'state': 'close'})
 
+    def _prepare_payslip_vals_list(self, employees):
+        """
+        Bulk counterpart of onchange_employee_id for the employees of this batch:
+        the contracts are read with one search and the inputs once per set of
+        salary structures.
+        @return: returns a list of hr.payslip values, one per employee
+        """
+        self.ensure_one()
+        Payslip = self.env['hr.payslip']
+        date_from, date_to = self.date_start, self.date_end
+        contracts_by_employee = Payslip.get_contracts_batch(employees, date_from, date_to)
+        ttyme = datetime.combine(fields.Date.from_string(date_from), time.min)
+        locale = self.env.context.get('lang') or 'en_US'
+        month = tools.ustr(babel.dates.format_date(date=ttyme, format='MMMM-y', locale=locale))
+        rule_inputs = {}
+        vals_list = []
+        for employee in employees:
+            contracts = contracts_by_employee.get(employee.id, self.env['hr.contract'])
+            struct = contracts[:1].struct_id
+            input_line_ids = worked_days_line_ids = []
+            if struct:
+                key = tuple(sorted(contracts.mapped('struct_id').ids))
+                if key not in rule_inputs:
+                    rule_inputs[key] = Payslip._get_rule_inputs(contracts)
+                input_line_ids = [{
+                    'name': input.name,
+                    'code': input.code,
+                    'contract_id': contract.id,
+                } for contract in contracts for input in rule_inputs[key]]
+                worked_days_line_ids = Payslip.get_worked_day_lines(contracts, date_from, date_to)
+            vals_list.append({
+                'employee_id': employee.id,
+                'name': _('Salary Slip of %s for %s') % (employee.name, month),
+                'struct_id': struct.id,
+                'contract_id': contracts[:1].id,
+                'payslip_run_id': self.id,
+                'input_line_ids': [(0, 0, x) for x in input_line_ids],
+                'worked_days_line_ids': [(0, 0, x) for x in worked_days_line_ids],
+                'date_from': date_from,
+                'date_to': date_to,
+                'credit_note': self.credit_note,
+                'company_id': employee.company_id.id,
+            })
+        return vals_list
+
+    def _generate_payslips(self, employees):
+        self.ensure_one()
+        payslips = self.env['hr.payslip'].create(self._prepare_payslip_vals_list(employees))
+        payslips.compute_sheet()
+        return payslips
+
+    def _enqueue_payslip_jobs(self, employees, chunk_size=None):
+        """
+        Split the generation of the payslips of `employees` into jobs of
+        `chunk_size` employees, processed in parallel by the worker crons.
+        """
+        self.ensure_one()
+        Job = self.env['hr.payslip.run.job']
+        chunk_size = chunk_size or Job.JOB_CHUNK_SIZE
+        jobs = Job.create([{
+            'payslip_run_id': self.id,
+            'employee_ids': [(6, 0, employees[start:start + chunk_size].ids)],
+        } for start in range(0, len(employees), chunk_size)])
+        jobs._trigger_workers()
+        return jobs
+
+    def action_retry_failed_jobs(self):
+        jobs = self.mapped('job_ids').filtered(lambda job: job.state == 'failed')
+        jobs.write({'state': 'pending', 'error': False})
+        jobs._trigger_workers()
+        return True
+
 
 class ResourceMixin(models.AbstractModel):
     _inherit = "resource.mixin"
@@ -0,0 +1,101 @@
+# -*- coding:utf-8 -*-
+
+import logging
+
+from odoo import api, fields, models, tools
+
+_logger = logging.getLogger(__name__)
+
+# crons sharing the pending jobs, each one runs in its own cron thread
+JOB_WORKER_CRONS = [
+    'hr_payroll_community.ir_cron_payslip_run_job_1',
+    'hr_payroll_community.ir_cron_payslip_run_job_2',
+    'hr_payroll_community.ir_cron_payslip_run_job_3',
+]
+
+
+class HrPayslipRunJob(models.Model):
+    _name = 'hr.payslip.run.job'
+    _description = 'Payslip Batch Generation Job'
+    _order = 'payslip_run_id, id'
+
+    JOB_CHUNK_SIZE = 100
+
+    payslip_run_id = fields.Many2one('hr.payslip.run', string='Payslip Batch', required=True,
+                                     ondelete='cascade', index=True)
+    employee_ids = fields.Many2many('hr.employee', 'hr_payslip_run_job_employee_rel', 'job_id', 'employee_id',
+                                    string='Employees')
+    employee_count = fields.Integer(compute='_compute_employee_count', store=True)
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], string='Status', default='pending', required=True, index=True, readonly=True)
+    payslip_count = fields.Integer(string='Payslips', readonly=True)
+    date_done = fields.Datetime(string='Processed On', readonly=True)
+    error = fields.Text(readonly=True)
+
+    @api.depends('employee_ids')
+    def _compute_employee_count(self):
+        for job in self:
+            job.employee_count = len(job.employee_ids)
+
+    def _trigger_workers(self):
+        if not self:
+            return
+        for xmlid in JOB_WORKER_CRONS:
+            cron = self.env.ref(xmlid, raise_if_not_found=False)
+            if cron:
+                cron.sudo()._trigger()
+
+    @api.model
+    def _acquire_pending(self):
+        """
+        Lock the next pending job. The lock is held until the transaction of
+        the worker ends, the other workers skip the job in the meantime.
+        """
+        self.flush(['state'])
+        self.env.cr.execute("""
+            SELECT id FROM hr_payslip_run_job
+            WHERE state = 'pending'
+            ORDER BY id
+            LIMIT 1
+            FOR UPDATE SKIP LOCKED
+        """)
+        row = self.env.cr.fetchone()
+        return self.browse(row and row[0])
+
+    def _run(self):
+        """
+        Generate the payslips of the job as the user who queued it. A failing
+        job is rolled back as a whole and kept with its error for a retry.
+        """
+        self.ensure_one()
+        user = self.create_uid
+        run = self.payslip_run_id.with_user(user).with_context(lang=user.lang)
+        try:
+            with self.env.cr.savepoint():
+                payslips = run._generate_payslips(self.employee_ids.with_user(user))
+                payslips.flush()
+        except Exception as e:
+            self.invalidate_cache()
+            _logger.exception('Payslip batch %s: job %s failed', self.payslip_run_id.name, self.id)
+            self.write({'state': 'failed', 'error': tools.ustr(e), 'date_done': fields.Datetime.now()})
+        else:
+            self.write({'state': 'done', 'payslip_count': len(payslips), 'date_done': fields.Datetime.now()})
+
+    @api.model
+    def _cron_process_jobs(self):
+        """
+        Process the pending jobs, one job per transaction, until none is left.
+        """
+        while True:
+            job = self._acquire_pending()
+            if not job:
+                break
+            job._run()
+            self.flush()
+            if not self.env.registry.in_test_mode():
+                self.env.cr.commit()
+            _logger.info('Payslip batch %s: job %s %s (%s employees)',
+                         job.payslip_run_id.name, job.id, job.state, job.employee_count)
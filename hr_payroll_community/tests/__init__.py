@@ -1,3 +1,4 @@
 # -*- coding: utf-8 -*-
 
 from . import test_payslip_flow
+from . import test_payslip_run_job
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+from unittest.mock import patch
+
+from odoo.exceptions import UserError
+from odoo.fields import Date
+from odoo.addons.hr_payroll_community.tests.common import TestPayslipBase
+
+
+class TestPayslipRunJob(TestPayslipBase):
+
+    def setUp(self):
+        super(TestPayslipRunJob, self).setUp()
+        self.payslip_run = self.env['hr.payslip.run'].create({
+            'date_start': Date.today().replace(day=1),
+            'date_end': Date.today(),
+            'name': 'Payslip Batch Jobs',
+        })
+        self.employees = self.richard_emp
+        for index in range(4):
+            employee = self.richard_emp.copy({'name': 'Richard %s' % index})
+            self.richard_emp.contract_ids[:1].copy({'employee_id': employee.id, 'state': 'open'})
+            self.employees |= employee
+        self.richard_emp.contract_ids.write({'state': 'open'})
+
+    def test_prepare_matches_onchange(self):
+        vals_list = self.payslip_run._prepare_payslip_vals_list(self.employees)
+        for employee, vals in zip(self.employees, vals_list):
+            slip_data = self.env['hr.payslip'].onchange_employee_id(
+                self.payslip_run.date_start, self.payslip_run.date_end, employee.id)['value']
+            self.assertEqual(vals['name'], slip_data['name'])
+            self.assertEqual(vals['contract_id'], slip_data['contract_id'])
+            self.assertEqual(vals['struct_id'], slip_data['struct_id'])
+            self.assertEqual([x[2] for x in vals['input_line_ids']], slip_data['input_line_ids'])
+            self.assertEqual([x[2] for x in vals['worked_days_line_ids']], slip_data['worked_days_line_ids'])
+
+    def test_jobs_generate_payslips(self):
+        jobs = self.payslip_run._enqueue_payslip_jobs(self.employees, chunk_size=2)
+        self.assertEqual(len(jobs), 3)
+        self.assertEqual(self.payslip_run.generate_progress, 0.0)
+
+        self.env['hr.payslip.run.job']._cron_process_jobs()
+
+        self.assertEqual(set(jobs.mapped('state')), {'done'})
+        self.assertEqual(self.payslip_run.generate_progress, 100.0)
+        self.assertEqual(self.payslip_run.slip_ids.mapped('employee_id'), self.employees)
+        self.assertTrue(all(self.payslip_run.slip_ids.mapped('line_ids')))
+
+    def test_failed_job_is_isolated(self):
+        jobs = self.payslip_run._enqueue_payslip_jobs(self.employees, chunk_size=3)
+        run_class = type(self.payslip_run)
+        generate = run_class._generate_payslips
+
+        def _generate_payslips(run, employees):
+            payslips = generate(run, employees)
+            if self.richard_emp in employees:
+                raise UserError('Broken contract')
+            return payslips
+
+        with patch.object(run_class, '_generate_payslips', _generate_payslips):
+            self.env['hr.payslip.run.job']._cron_process_jobs()
+
+        self.assertEqual(jobs.mapped('state'), ['failed', 'done'])
+        self.assertIn('Broken contract', jobs[0].error)
+        self.assertEqual(self.payslip_run.generate_progress, 100.0)
+        self.assertEqual(self.payslip_run.generate_failed_count, 1)
+        # the payslips of the failed job were rolled back
+        self.assertEqual(self.payslip_run.slip_ids.mapped('employee_id'), self.employees[3:])
+
+        self.payslip_run.action_retry_failed_jobs()
+        self.env['hr.payslip.run.job']._cron_process_jobs()
+        self.assertEqual(jobs.mapped('state'), ['done', 'done'])
+        self.assertEqual(self.payslip_run.slip_ids.mapped('employee_id'), self.employees)
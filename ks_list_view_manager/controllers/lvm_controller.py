@@ -1,3 +1,4 @@
+import copy
 import json
 
 from odoo import http
@@ -23,13 +24,33 @@ class LvmController(DataSet, http.Controller):
     def ks_prepare_lvm_list_data(self, original_list_data, model, ks_list_view_id):
         list_view_data = original_list_data.get('fields_views').get('list')
 
+        UserSpecific = request.env['user.specific']
         if ks_list_view_id:
-            list_view_data['ks_lvm_user_data'] = self.ks_fetch_lvm_data(model, ks_list_view_id)
-
-            if list_view_data['ks_lvm_user_data']['ks_lvm_user_table_result']['ks_fields_data']:
-                self.ks_process_arch(list_view_data, original_list_data.get('fields'))
+            version = UserSpecific._get_lvm_config_version(request.env.user.id)
+            list_view_data['ks_lvm_user_data'] = self.ks_fetch_lvm_data(model, ks_list_view_id, version)
+            ks_table_result = list_view_data['ks_lvm_user_data']['ks_lvm_user_table_result']
+
+            if ks_table_result['ks_fields_data']:
+                fields_list = original_list_data.get('fields')
+
+                def process():
+                    self.ks_process_arch(list_view_data, fields_list)
+                    added_fields = set(list_view_data['fields']) - set(view_fields)
+                    # ks_process_arch also completes ks_fields_data, keep it with the arch
+                    return (list_view_data['arch'], tuple(added_fields),
+                            copy.deepcopy(ks_table_result['ks_fields_data']))
+
+                view_fields = list(list_view_data['fields'])
+                arch, added_fields, ks_fields_data = UserSpecific._get_lvm_processed_arch(
+                    model, request.env.user.id, ks_list_view_id, version, list_view_data['arch'], process)
+                list_view_data['arch'] = arch
+                ks_table_result['ks_fields_data'] = copy.deepcopy(ks_fields_data)
+                for field_name in added_fields:
+                    list_view_data['fields'][field_name] = fields_list[field_name]
         else:
-            user_mode_data = request.env['user.mode'].check_user_mode(model, request.env.user.id, False)
+            version = UserSpecific._get_lvm_config_version(request.env.user.id)
+            user_mode_data = copy.deepcopy(UserSpecific._get_lvm_user_data(
+                model, request.env.user.id, False, version)['ks_lvm_user_mode_data'])
             user_mode_data['ks_can_advanced_search'] = False
             user_mode_data['ks_can_edit'] = False
             user_mode_data['ks_dynamic_list_show'] = False
@@ -38,16 +59,13 @@ class LvmController(DataSet, http.Controller):
             }
             list_view_data['ks_lvm_user_data'] = ks_lvm_user_data
 
-    def ks_fetch_lvm_data(self, model, ks_view_id=False):
-        ks_lvm_user_data = {}
-        user_mode_model = request.env['user.mode']
-        user_specific_model = request.env['user.specific']
-
-        user_mode_data = user_mode_model.check_user_mode(model, request.env.user.id, ks_view_id)
-        ks_user_table_result = user_specific_model.check_user_exists(model, request.env.user.id, ks_view_id)
-
-        ks_lvm_user_data['ks_lvm_user_table_result'] = ks_user_table_result
-        ks_lvm_user_data['ks_lvm_user_mode_data'] = user_mode_data
+    def ks_fetch_lvm_data(self, model, ks_view_id=False, version=None):
+        UserSpecific = request.env['user.specific']
+        if version is None:
+            version = UserSpecific._get_lvm_config_version(request.env.user.id)
+        # the cached data is shared, ks_process_arch updates its copy
+        ks_lvm_user_data = copy.deepcopy(
+            UserSpecific._get_lvm_user_data(model, request.env.user.id, ks_view_id, version))
         ks_lvm_user_data['ksViewID'] = ks_view_id
         return ks_lvm_user_data
 
@@ -1,4 +1,4 @@
-from odoo import models, fields, api
+from odoo import models, fields, api, tools
 import logging
 
 _logger = logging.getLogger(__name__)
@@ -16,6 +16,47 @@ class UserSpecific(models.Model):
     ks_editable = fields.Boolean(string="Editable List Mode")
     fields = fields.One2many("user.fields", "fields_list", "Fields Information")
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super(UserSpecific, self).create(vals_list)
+        records.mapped('user_id')._bump_lvm_config_version()
+        return records
+
+    def write(self, vals):
+        users = self.mapped('user_id')
+        res = super(UserSpecific, self).write(vals)
+        (users | self.mapped('user_id'))._bump_lvm_config_version()
+        return res
+
+    def unlink(self):
+        self.mapped('user_id')._bump_lvm_config_version()
+        return super(UserSpecific, self).unlink()
+
+    @api.model
+    def _get_lvm_config_version(self, uid):
+        """ Version of the list view configuration of a user, used as
+        ormcache key so that only the entries of that user go stale. """
+        return self.env['res.users'].browse(uid).ks_lvm_config_version
+
+    @api.model
+    @tools.ormcache('model_name', 'uid', 'ks_action_id', 'version')
+    def _get_lvm_user_data(self, model_name, uid, ks_action_id, version):
+        """ User mode and table configuration of a list view, cached per
+        configuration `version` of the user. Callers must copy the result. """
+        return {
+            'ks_lvm_user_mode_data': self.env['user.mode'].check_user_mode(model_name, uid, ks_action_id),
+            'ks_lvm_user_table_result': self.check_user_exists(model_name, uid, ks_action_id),
+        }
+
+    @api.model
+    @tools.ormcache('model_name', 'uid', 'ks_action_id', 'version', 'arch')
+    def _get_lvm_processed_arch(self, model_name, uid, ks_action_id, version, arch, process):
+        """ Arch of a list view rewritten for the configuration of the user.
+        `process()` is only called on a miss and returns the new arch, the
+        names of the fields it added to the view and the field data sent to
+        the client. Callers must copy the result. """
+        return process()
+
     @api.model
     def check_user_exists(self, model_name, uid, ks_action_id):
         ks_user_table_result = {'ks_fields_data': False, 'ks_table_data': False}
@@ -93,6 +134,22 @@ class Userfields(models.Model):
     ks_columns_name = fields.Char(string="Columns Name")
     ks_width = fields.Char(string="Field Width")
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super(Userfields, self).create(vals_list)
+        records.mapped('fields_list.user_id')._bump_lvm_config_version()
+        return records
+
+    def write(self, vals):
+        users = self.mapped('fields_list.user_id')
+        res = super(Userfields, self).write(vals)
+        (users | self.mapped('fields_list.user_id'))._bump_lvm_config_version()
+        return res
+
+    def unlink(self):
+        self.mapped('fields_list.user_id')._bump_lvm_config_version()
+        return super(Userfields, self).unlink()
+
 
 class KsUserStandardSpecific(models.Model):
     _name = "ks.user.standard.specific"
@@ -198,6 +255,22 @@ class UserMode(models.Model):
 
     editable = fields.Char(string="Define user editable mode")
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super(UserMode, self).create(vals_list)
+        records.mapped('user_id')._bump_lvm_config_version()
+        return records
+
+    def write(self, vals):
+        users = self.mapped('user_id')
+        res = super(UserMode, self).write(vals)
+        (users | self.mapped('user_id'))._bump_lvm_config_version()
+        return res
+
+    def unlink(self):
+        self.mapped('user_id')._bump_lvm_config_version()
+        return super(UserMode, self).unlink()
+
     @api.model
     def check_user_mode(self, ks_model_name, uid, ks_action_id):
         ks_list_view_data = {
@@ -248,6 +321,22 @@ class UserMode(models.Model):
             return self.env[model].search_read([(field, 'ilike', value)], [field])
 
 
+class KsResUsers(models.Model):
+    _inherit = 'res.users'
+
+    ks_lvm_config_version = fields.Integer(string="List View Manager Version", readonly=True, copy=False)
+
+    def _bump_lvm_config_version(self):
+        """ Invalidate the cached list view data of these users only. """
+        if not self:
+            return
+        self.env.cr.execute("""
+            UPDATE res_users SET ks_lvm_config_version = COALESCE(ks_lvm_config_version, 0) + 1
+            WHERE id IN %s
+        """, (tuple(self.ids),))
+        self.invalidate_cache(['ks_lvm_config_version'], self.ids)
+
+
 class KsHttp(models.AbstractModel):
     _inherit = 'ir.http'
 
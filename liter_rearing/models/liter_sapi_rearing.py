@@ -3,6 +3,8 @@ from datetime import datetime, timedelta
 from collections import defaultdict
 from odoo.exceptions import UserError
 
+PERSEDIAAN_ACCOUNT_CODE = '101.0402.001'
+
 
 class liter_sapi_rearing(models.Model):
     _name = "liter.sapi.rearing"
@@ -77,58 +79,61 @@ class liter_sapi_rearing(models.Model):
             else:
                 record.harga_satuan = 0.0
 
+    def _get_persediaan_balances(self):
+        """ Saldo akun persediaan rearing untuk semua record dengan satu query,
+            dikelompokkan per record dan akun """
+        self.flush(['tgl_setoran'])
+        self.env['account.move.line'].flush(['account_id', 'date', 'debit', 'credit', 'balance', 'parent_state'])
+        self.env.cr.execute("""
+            SELECT r.id, aml.account_id, SUM(aml.debit), SUM(aml.credit), SUM(aml.balance), MIN(aml.date)
+            FROM liter_sapi_rearing r
+            JOIN account_move_line aml ON aml.date <= r.tgl_setoran
+            JOIN account_account acc ON acc.id = aml.account_id
+            WHERE r.id IN %s
+              AND acc.code = %s
+              AND aml.parent_state = 'posted'
+            GROUP BY r.id, aml.account_id
+        """, (tuple(self.ids), PERSEDIAAN_ACCOUNT_CODE))
+        balances = defaultdict(list)
+        for rearing_id, account_id, debit, credit, balance, date in self.env.cr.fetchall():
+            balances[rearing_id].append({
+                'account_id': account_id,
+                'debit': debit,
+                'credit': credit,
+                'balance': balance,
+                'date': date,
+            })
+        return balances
+
     def get_nilai_persediaan_transactions(self):
         """Function to fetch rearing transactions and populate PersediaanNilaiLine"""
         # Delete all PersediaanNilaiLine related to the current instance
         self.persediaan_nilai_ids.unlink()
+        if not self.ids:
+            return
 
+        balances = self._get_persediaan_balances()
+        persediaan_nilai_vals = []
         for persediaan in self:
-            # Replace 'account.move.line' with the appropriate model
-            account_move_lines = self.env['account.move.line'].search([
-                ('account_id.code', '=', '101.0402.001'),
-                ('date', '<=', persediaan.tgl_setoran),
-                ('move_id.state', '=', 'posted'),
-                # Add other criteria as needed
-            ])
-
-            # Use defaultdict to store aggregated values based on account_id
-            aggregated_values = defaultdict(lambda: {'debit': 0.0, 'credit': 0.0, 'balance': 0.0, 'count': 0})
-
-            for move_line in account_move_lines:
-                account_id = move_line.account_id.id
-                aggregated_values[account_id]['debit'] += move_line.debit
-                aggregated_values[account_id]['credit'] += move_line.credit
-                aggregated_values[account_id]['balance'] += move_line.balance
-                aggregated_values[account_id]['count'] += 1
-
-            # Access the related account.move and get its date
-            move_date = move_line.move_id.date
-
-            tot_nilai = sum(values['balance'] for values in aggregated_values.values())
-
-            for account_id, values in aggregated_values.items():
-                # Check if count is greater than 0 to avoid division by zero
-
-                persediaan_nilai_data = {
+            values = balances.get(persediaan.id, [])
+            tot_nilai = sum(value['balance'] for value in values)
+            # Check if tot_nilai is negative, if so, raise a warning
+            if tot_nilai < 0:
+                raise UserError("Total Nilai tidak boleh negatif!")
+            # tanggal baris = tanggal move line paling awal, seperti sebelumnya
+            move_date = min(value['date'] for value in values) if values else False
+            for value in values:
+                persediaan_nilai_vals.append({
                     'liter_sapi_rearing_id': persediaan.id,
                     'date': move_date,
-                    'account_id': account_id,
-                    'debit': values['debit'],
-                    'credit': values['credit'],
-                    'balance': values['balance'],
-                }
-
-                # Create a new PersediaanNilaiLine
-                self.env['persediaan.nilai.line'].create(persediaan_nilai_data)
+                    'account_id': value['account_id'],
+                    'debit': value['debit'],
+                    'credit': value['credit'],
+                    'balance': value['balance'],
+                })
+            persediaan.tot_nilai = tot_nilai
 
-        # Change the status of PersediaanNilai to 'calculate' after fetching the data
-        # self.write({'state': 'calculate'})
-
-        # Check if tot_nilai is negative, if so, raise a warning
-        if tot_nilai < 0:
-            raise UserError("Total Nilai tidak boleh negatif!")
-
-        persediaan.write({'tot_nilai': tot_nilai})
+        self.env['persediaan.nilai.line'].create(persediaan_nilai_vals)
 
     # Add a button to the form view
     def button_get_nilai_persediaan_transactions(self):
@@ -227,45 +232,51 @@ class liter_sapi_rearing(models.Model):
     #         purchase_order_line = purchase_order_line_obj.create(po_line_vals)
 
     def generate_setoran_lines(self):
-        # Hapus setoran yang sudah ada untuk tipe_setor yang sama sebelum membuat atau memperbarui setoran baru
+        uom = self.env['uom.uom'].search([('name', '=', 'Kg')], limit=1)
+        tgl_setor = fields.Datetime.now()
+
+        # Semua setoran yang sudah ada, diindeks per (rearing, tipe_setor, sapi)
         existing_setoran_lines = self.env['setoran.line.rearing'].search([
-            ('liter_sapi_rearing_id', '=', self.id),
-            ('tipe_setor', '=', self.tipe_setor),
+            ('liter_sapi_rearing_id', 'in', self.ids),
         ])
+        lines_by_sapi = defaultdict(lambda: self.env['setoran.line.rearing'])
+        for line in existing_setoran_lines:
+            lines_by_sapi[(line.liter_sapi_rearing_id.id, line.tipe_setor, line.sapi_id.id)] |= line
 
-        # Hitung jumlah total rekaman dalam sapi_ids
-        total_sapi_records = len(self.sapi_ids)
-
-        # Distribusikan total setoran di antara sapi_ids dan buat atau perbarui setoran_line_rearing_ids
-        for sapi in self.sapi_ids:
-            setoran_line_values = {
-                'liter_sapi_rearing_id': self.id,
-                'uom_id': self.env['uom.uom'].search([('name', '=', 'Kg')], limit=1).id,
-                'tgl_setor': fields.Datetime.now(),
-                'tipe_setor': self.tipe_setor,
-                'sapi_id': sapi.id,
-                'eartag_id': sapi.eartag_id,
-                'product_id_2': self.product_id_3.id,
+        create_vals = []
+        write_groups = defaultdict(list)
+        unused_line_ids = []
+        for record in self:
+            common_values = {
+                'liter_sapi_rearing_id': record.id,
+                'uom_id': uom.id,
+                'tgl_setor': tgl_setor,
+                'tipe_setor': record.tipe_setor,
+                'product_id_2': record.product_id_3.id,
             }
-
-            if self.tipe_setor == '1':  # Pagi
-                setoran_line_values['setoran'] = (1 / total_sapi_records) * self.hasil_prod
-            elif self.tipe_setor == '2':  # Sore
-                setoran_line_values['setoran'] = (1 / total_sapi_records) * self.hasil_prod
-
-            # Cari baris setoran yang sudah ada untuk sapi ini
-            existing_line = existing_setoran_lines.filtered(lambda line: line.sapi_id == sapi)
-
-            if existing_line:  # Jika sudah ada, perbarui nilainya
-                existing_line.write(setoran_line_values)
-            else:  # Jika belum ada, buat baris baru
-                self.env['setoran.line.rearing'].create(setoran_line_values)
-
-        # Hapus setoran yang tidak terpakai
-        unused_setoran_lines = existing_setoran_lines - self.env['setoran.line.rearing'].search([
-            ('liter_sapi_rearing_id', '=', self.id),
-            ('tipe_setor', '=', self.tipe_setor),
-        ])
+            # Distribusikan total setoran di antara sapi_ids
+            if record.tipe_setor in ('1', '2') and record.sapi_ids:
+                common_values['setoran'] = (1 / len(record.sapi_ids)) * record.hasil_prod
+
+            for sapi in record.sapi_ids:
+                existing_line = lines_by_sapi.pop((record.id, record.tipe_setor, sapi.id), None)
+                if existing_line:  # Jika sudah ada, perbarui nilainya
+                    key = tuple(sorted(dict(common_values, eartag_id=sapi.eartag_id).items()))
+                    write_groups[key].extend(existing_line.ids)
+                else:  # Jika belum ada, buat baris baru
+                    create_vals.append(dict(common_values, sapi_id=sapi.id, eartag_id=sapi.eartag_id))
+
+        # Sisa setoran dengan tipe_setor yang sama milik sapi yang tidak lagi dipilih
+        tipe_setor_by_record = {record.id: record.tipe_setor for record in self}
+        for (rearing_id, tipe_setor, sapi_id), lines in lines_by_sapi.items():
+            if sapi_id and tipe_setor == tipe_setor_by_record[rearing_id]:
+                unused_line_ids.extend(lines.ids)
+
+        setoran_line_obj = self.env['setoran.line.rearing']
+        for values, line_ids in write_groups.items():
+            setoran_line_obj.browse(line_ids).write(dict(values))
+        setoran_line_obj.create(create_vals)
+        unused_setoran_lines = setoran_line_obj.browse(unused_line_ids)
         unused_setoran_lines.unlink()
 
 
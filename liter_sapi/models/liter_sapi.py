@@ -823,8 +823,10 @@ class liter_sapi(models.Model):
         # Panggil fungsi write dari parent class
         result = super(liter_sapi, self).write(values)
 
-        # Jalankan merge_setoran_line secara otomatis
-        self.merge_setoran_line()
+        # Jalankan merge_setoran_line secara otomatis, per record
+        if not self.env.context.get('skip_merge_setoran'):
+            for record in self:
+                record.merge_setoran_line()
 
         return result
 
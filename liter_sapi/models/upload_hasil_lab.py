@@ -1,4 +1,6 @@
-from odoo import models, fields, api
+from collections import defaultdict
+
+from odoo import models, fields, api, _
 
 class UploadHasilLab(models.Model):
     _name = "upload.hasil.lab"
@@ -9,26 +11,52 @@ class UploadHasilLab(models.Model):
     tps_id = fields.Many2one('tps.liter', string='TPS')
     upload_lab_ids = fields.One2many('upload.lab.line', 'upload_lab_id', 'Upload Hasil Lab')
 
+    def _get_lab_values(self, upload_lab_line):
+        return {
+            'fat_id': upload_lab_line.fat_id.id,
+            'snf': upload_lab_line.snf,
+            'pro': upload_lab_line.pro,
+            'salts': upload_lab_line.salts,
+            'freez_point': upload_lab_line.freeze,
+            'tpc_kan': upload_lab_line.tpc_kan,
+        }
+
+    def _get_liter_sapi_map(self):
+        # Satu query untuk semua baris: {(periode_id, tps_id, peternak_id): liter.sapi}
+        liter_sapi_records = self.env['liter.sapi'].search([
+            ('periode_id', 'in', self.mapped('periode_id').ids),
+            ('tps_id', 'in', self.mapped('tps_id').ids),
+            ('peternak_id', 'in', self.mapped('upload_lab_ids.peternak_id').ids),
+        ], order='id')
+        liter_sapi_map = {}
+        for record in liter_sapi_records:
+            key = (record.periode_id.id, record.tps_id.id, record.peternak_id.id)
+            liter_sapi_map.setdefault(key, record)
+        return liter_sapi_map
+
     def push_hasil_lab(self):
-        for upload_lab_line in self.upload_lab_ids:
-            # Ambil record liter.sapi yang sesuai dengan periode_id, tps_id, dan peternak_id dari baris upload_mbrt_line
-            liter_sapi_record = self.env['liter.sapi'].search([
-                ('periode_id', '=', self.periode_id.id),
-                ('tps_id', '=', self.tps_id.id),
-                ('peternak_id', '=', upload_lab_line.peternak_id.id),
-            ], limit=1)
+        liter_sapi_map = self._get_liter_sapi_map()
+
+        # Kelompokkan liter.sapi berdasarkan nilai lab yang sama, satu write per kelompok
+        values_groups = defaultdict(list)
+        unmatched = defaultdict(list)
+        for upload in self:
+            for upload_lab_line in upload.upload_lab_ids:
+                liter_sapi_record = liter_sapi_map.get((upload.periode_id.id, upload.tps_id.id, upload_lab_line.peternak_id.id))
+                if not upload_lab_line.peternak_id or not liter_sapi_record:
+                    unmatched[upload].append(upload_lab_line)
+                    continue
+                values = self._get_lab_values(upload_lab_line)
+                values_groups[tuple(sorted(values.items()))].append(liter_sapi_record.id)
 
-            # Jika ditemukan record liter.sapi, update mbrt_id dan is_mbrt sesuai dengan nilai dari baris upload_mbrt_line
-            if liter_sapi_record:
-                liter_sapi_record.write({
-                    'fat_id': upload_lab_line.fat_id.id,
-                    'snf': upload_lab_line.snf,
-                    'pro': upload_lab_line.pro,
-                    'salts': upload_lab_line.salts,
-                    'freez_point': upload_lab_line.freeze,
-                    'tpc_kan': upload_lab_line.tpc_kan,
+        # Nilai lab tidak mengubah setoran line, merge_setoran_line tidak perlu dijalankan
+        liter_sapi_obj = self.env['liter.sapi'].with_context(skip_merge_setoran=True)
+        for values, liter_sapi_ids in values_groups.items():
+            liter_sapi_obj.browse(liter_sapi_ids).write(dict(values))
 
-                })
+        for upload, lines in unmatched.items():
+            upload.message_post(body=_('Hasil lab tidak ditemukan di setoran liter: %s') % ', '.join(
+                line.peternak_id.display_name or line.kode_peternak or '-' for line in lines))
 
         return True
 
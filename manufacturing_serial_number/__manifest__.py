@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 {
     'name': 'Manufacturing Serial Number',
-    'version': '14.0.1.0.0',
+    'version': '14.0.1.1.0',
     'category': 'Manufacturing',
     'summary': 'Automatic Serial Number Generation for Manufacturing Products',
     'description': """
@@ -22,6 +22,7 @@
     'depends': ['mrp', 'stock', 'product'],
     'data': [
         'security/ir.model.access.csv',
+        'data/ir_sequence_data.xml',
         'views/manufacturing_serial_views.xml',
         'views/mrp_production_views.xml',
         'views/product_template_views.xml',
@@ -1,9 +1,11 @@
 # -*- coding: utf-8 -*-
 
+import psycopg2
+
 from odoo import models, fields, api, _
-from odoo.exceptions import ValidationError
-import random
-import string
+from odoo.exceptions import UserError
+
+SERIAL_SEQUENCE_CODE = 'manufacturing.serial'
 
 
 class ManufacturingSerial(models.Model):
@@ -12,6 +14,8 @@ class ManufacturingSerial(models.Model):
     _order = 'serial_number desc'
     _rec_name = 'serial_number'
 
+    SERIAL_BATCH_SIZE = 10000
+
     serial_number = fields.Char(
         string='Serial Number',
         required=True,
@@ -66,34 +70,108 @@ class ManufacturingSerial(models.Model):
          'Serial number must be unique per company!')
     ]
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        todo = [vals for vals in vals_list if vals.get('serial_number', 'New') == 'New']
+        if todo:
+            serials = self._generate_serial_numbers([vals.get('product_id') for vals in todo])
+            for vals, serial_number in zip(todo, serials):
+                vals['serial_number'] = serial_number
+        return super(ManufacturingSerial, self).create(vals_list)
+
+    @api.model
+    def _get_serial_sequence(self):
+        return self.env['ir.sequence'].search([
+            ('code', '=', SERIAL_SEQUENCE_CODE),
+            ('company_id', 'in', [self.env.company.id, False]),
+        ], order='company_id', limit=1)
+
     @api.model
-    def create(self, vals):
-        if vals.get('serial_number', 'New') == 'New':
-            vals['serial_number'] = self._generate_serial_number(vals.get('product_id'))
-        return super(ManufacturingSerial, self).create(vals)
+    def _reserve_sequence_numbers(self, count):
+        """Reserve `count` numbers of the serial sequence in one query.
+        Falls back to one next_by_code per number for date range sequences."""
+        if count <= 0:
+            return []
+        sequence = self._get_serial_sequence()
+        if not sequence:
+            raise UserError(_('Sequence "%s" for manufacturing serials is missing.') % SERIAL_SEQUENCE_CODE)
+        sequence = sequence.sudo()
+        if sequence.use_date_range:
+            return [sequence._next() for dummy in range(count)]
+        if sequence.implementation == 'standard':
+            self.env.cr.execute(
+                "SELECT nextval('ir_sequence_%03d') FROM generate_series(1, %%s)" % sequence.id,
+                (count,))
+            numbers = [row[0] for row in self.env.cr.fetchall()]
+        else:
+            self.env.cr.execute("""
+                UPDATE ir_sequence SET number_next = number_next + %s
+                WHERE id = %s RETURNING number_next
+            """, (count * sequence.number_increment, sequence.id))
+            number_end = self.env.cr.fetchone()[0]
+            sequence.invalidate_cache(['number_next'])
+            number_start = number_end - count * sequence.number_increment
+            numbers = range(number_start, number_end, sequence.number_increment)
+        prefix, suffix = sequence._get_prefix_suffix()
+        number_format = '%%0%sd' % sequence.padding
+        return [prefix + number_format % number + suffix for number in numbers]
+
+    @api.model
+    def _get_serial_prefixes(self, product_ids):
+        """Serial prefix per product id, from the product reference"""
+        prefixes = {}
+        for product in self.env['product.product'].browse({pid for pid in product_ids if pid}):
+            prefixes[product.id] = product.default_code[:6].upper() if product.default_code else 'MFG'
+        return prefixes
+
+    @api.model
+    def _generate_serial_numbers(self, product_ids):
+        """Serial numbers for a list of product ids (one per item).
+        The sequence numbers are unique, so the serials never collide; the
+        unique constraint on serial_number guards against a reset sequence."""
+        prefixes = self._get_serial_prefixes(product_ids)
+        numbers = self._reserve_sequence_numbers(len(product_ids))
+        return ['%s-%s' % (prefixes.get(product_id, 'MFG'), number)
+                for product_id, number in zip(product_ids, numbers)]
 
     def _generate_serial_number(self, product_id=None):
         """Generate unique serial number"""
-        prefix = 'MFG'
-        
-        if product_id:
-            product = self.env['product.product'].browse(product_id)
-            if product.default_code:
-                prefix = product.default_code[:6].upper()
-        
-        # Generate sequential number
-        sequence = self.env['ir.sequence'].next_by_code('manufacturing.serial') or '0001'
-        
-        # Add random suffix for extra uniqueness
-        random_suffix = ''.join(random.choices(string.ascii_uppercase + string.digits, k=4))
-        
-        serial_number = f"{prefix}-{sequence}-{random_suffix}"
-        
-        # Check if exists, regenerate if needed
-        if self.search([('serial_number', '=', serial_number)], limit=1):
-            return self._generate_serial_number(product_id)
-        
-        return serial_number
+        return self._generate_serial_numbers([product_id])[0]
+
+    @api.model
+    def _create_serials_bulk(self, product, count, production=None, state='produced', company=None):
+        """Insert `count` serials of `product` with one INSERT per chunk of
+        SERIAL_BATCH_SIZE rows, bypassing the per-record ORM create. Meant for
+        batches of thousands of serials; returns the created records."""
+        if count <= 0:
+            return self.browse()
+        company = company or (production and production.company_id) or self.env.company
+        now = fields.Datetime.now()
+        serials = self._generate_serial_numbers([product.id] * count)
+        self.flush()
+        ids = []
+        try:
+            with self.env.cr.savepoint():
+                for start in range(0, count, self.SERIAL_BATCH_SIZE):
+                    chunk = serials[start:start + self.SERIAL_BATCH_SIZE]
+                    self.env.cr.execute("""
+                        INSERT INTO manufacturing_serial
+                            (serial_number, product_id, mrp_production_id, production_date, state,
+                             company_id, create_uid, create_date, write_uid, write_date)
+                        SELECT serial_number, %s, %s, %s, %s, %s, %s, %s, %s, %s
+                        FROM unnest(%s::varchar[]) AS serial_number
+                        RETURNING id
+                    """, (product.id, production and production.id or None, now, state, company.id,
+                          self.env.uid, now, self.env.uid, now, chunk))
+                    ids.extend(row[0] for row in self.env.cr.fetchall())
+        except psycopg2.IntegrityError:
+            raise UserError(_('Generated serial numbers already exist. '
+                              'Please check the "%s" sequence.') % SERIAL_SEQUENCE_CODE)
+        self.invalidate_cache()
+        self.env['product.product'].invalidate_cache(['serial_ids'], product.ids)
+        if production:
+            production.invalidate_cache(['serial_ids', 'serial_count'])
+        return self.browse(ids)
 
     def action_set_produced(self):
         self.write({'state': 'produced'})
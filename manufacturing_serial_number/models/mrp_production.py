@@ -1,7 +1,6 @@
 # -*- coding: utf-8 -*-
 
 from odoo import models, fields, api, _
-from odoo.exceptions import UserError
 
 
 class MrpProduction(models.Model):
@@ -55,24 +54,8 @@ class MrpProduction(models.Model):
         if qty_to_generate <= 0:
             return
         
-        # Limit to reasonable number
-        if qty_to_generate > 1000:
-            raise UserError(_('Cannot generate more than 1000 serial numbers at once. Please reduce quantity.'))
-        
-        serial_list = []
-        for i in range(qty_to_generate):
-            serial_vals = {
-                'product_id': self.product_id.id,
-                'mrp_production_id': self.id,
-                'production_date': fields.Datetime.now(),
-                'state': 'produced',
-                'company_id': self.company_id.id,
-            }
-            serial_list.append(serial_vals)
-        
-        # Batch create serials
-        if serial_list:
-            SerialObj.create(serial_list)
+        # Batch create serials, the sequence numbers are reserved at once
+        SerialObj._create_serials_bulk(self.product_id, qty_to_generate, production=self)
             
         return True
 
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import time
+
+from odoo.exceptions import UserError
+from odoo.tests.common import SavepointCase, tagged
+from odoo.tools import mute_logger
+
+_logger = logging.getLogger(__name__)
+
+
+class SerialBulkCommon(SavepointCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Serial = cls.env['manufacturing.serial']
+        cls.product = cls.env['product.product'].create({
+            'name': 'Serial Product',
+            'type': 'product',
+            'default_code': 'widget-01',
+        })
+
+
+@tagged('post_install', '-at_install')
+class TestSerialBulk(SerialBulkCommon):
+
+    def test_create_assigns_sequence_serials(self):
+        serials = self.Serial.create([{'product_id': self.product.id} for dummy in range(3)])
+        numbers = serials.mapped('serial_number')
+        self.assertEqual(len(set(numbers)), 3)
+        for number in numbers:
+            self.assertTrue(number.startswith('WIDGET-S'))
+
+    def test_bulk_create(self):
+        serials = self.Serial._create_serials_bulk(self.product, 1500)
+        self.assertEqual(len(serials), 1500)
+        self.assertEqual(len(set(serials.mapped('serial_number'))), 1500)
+        self.assertEqual(set(serials.mapped('state')), {'produced'})
+        self.assertEqual(self.product.serial_ids, serials)
+
+    def test_bulk_create_collision(self):
+        serials = self.Serial._create_serials_bulk(self.product, 2)
+        sequence = self.Serial._get_serial_sequence()
+        sequence.write({'number_next': int(serials[0].serial_number.rsplit('S', 1)[1])})
+        with mute_logger('odoo.sql_db'), self.assertRaises(UserError):
+            self.Serial._create_serials_bulk(self.product, 2)
+
+
+@tagged('post_install', '-at_install', '-standard', 'serial_benchmark')
+class TestSerialBulkBenchmark(SerialBulkCommon):
+
+    def test_benchmark_bulk_create(self):
+        count = 50000
+        started = time.time()
+        serials = self.Serial._create_serials_bulk(self.product, count)
+        elapsed = time.time() - started
+        self.assertEqual(len(serials), count)
+        _logger.info('Serial benchmark: %s serials in %.2fs (%.0f serials/s)',
+                     count, elapsed, count / elapsed)
@@ -7,8 +7,7 @@ from odoo.exceptions import UserError, ValidationError
 from odoo.addons.base.models.res_bank import sanitize_account_number
 import io
 import logging
-import tempfile
-import binascii
+import zipfile
 from datetime import datetime
 
 _logger = logging.getLogger(__name__)
@@ -23,6 +22,13 @@ try:
 except ImportError:
     _logger.debug('Cannot `import xlrd`.')
 
+try:
+    import openpyxl
+    from openpyxl.utils.exceptions import InvalidFileException
+except ImportError:
+    openpyxl = None
+    _logger.debug('Cannot `import openpyxl`.')
+
 
 class AccountBankStatementLine(models.Model):
     _inherit = "account.bank.statement.line"
@@ -43,98 +49,151 @@ class AccountBankStatementImport(models.TransientModel):
                                       help='Get you bank statements in electronic format from your bank and'
                                            ' select them here.')
 
-    def get_partner(self, value):
+    IMPORT_CHUNK_SIZE = 500
+
+    def get_partner(self, value, cache=None):
+        if cache is not None and value in cache:
+            return cache[value]
         partner = self.env['res.partner'].search([('name', '=', value)])
         return partner.id if partner else False
 
-    def get_currency(self, value):
+    def get_currency(self, value, cache=None):
+        if cache is not None and value in cache:
+            return cache[value]
         currency = self.env['res.currency'].search([('name', '=', value)])
         return currency.id if currency else False
 
+    def _preload_lookups(self, rows, partners, currencies):
+        """ Resolve the partner and currency names of a chunk of rows with one
+        search each and remember them for the rest of the import. """
+        partner_names = {row[3] for row in rows if row[3] not in partners}
+        if partner_names:
+            for name in partner_names:
+                partners[name] = False
+            for partner in self.env['res.partner'].search([('name', 'in', list(partner_names))], order='id desc'):
+                partners[partner.name] = partner.id
+        currency_names = {row[5] for row in rows if row[5] not in currencies}
+        if currency_names:
+            for name in currency_names:
+                currencies[name] = False
+            for currency in self.env['res.currency'].search([('name', 'in', list(currency_names))]):
+                currencies[currency.name] = currency.id
+
+    def _attachment_stream(self, attachment):
+        """ Binary file object on the attachment content, read from the
+        filestore when possible instead of decoding it in memory. """
+        if attachment.store_fname:
+            return open(attachment._full_path(attachment.store_fname), 'rb')
+        return io.BytesIO(base64.b64decode(attachment.datas))
+
+    def _iter_csv_rows(self, attachment):
+        with self._attachment_stream(attachment) as binary:
+            reader = csv.reader(io.TextIOWrapper(binary, encoding='utf-8', newline=''), delimiter=',')
+            next(reader, None)
+            for row in reader:
+                if row:
+                    yield list(map(str, row))
+
+    def _iter_xlsx_rows(self, attachment):
+        """ Rows of the first sheet. openpyxl in read-only mode parses the
+        sheet as it is iterated; without it the file is read with xlrd, which
+        loads the whole .xlsx sheet in memory even with on_demand. """
+        if openpyxl is None:
+            yield from self._iter_xlsx_rows_xlrd(attachment)
+            return
+        with self._attachment_stream(attachment) as binary:
+            try:
+                workbook = openpyxl.load_workbook(binary, read_only=True, data_only=True)
+            except (InvalidFileException, zipfile.BadZipFile, KeyError):
+                raise UserError(_("Invalid file!"))
+            try:
+                for row in workbook.worksheets[0].iter_rows(min_row=2, values_only=True):
+                    if any(value is not None for value in row):
+                        yield [self._xlsx_value_to_str(value) for value in row]
+            finally:
+                workbook.close()
+
+    def _xlsx_value_to_str(self, value):
+        if value is None:
+            return ''
+        if isinstance(value, datetime):
+            return fields.Date.to_string(value)
+        return str(value)
+
+    def _iter_xlsx_rows_xlrd(self, attachment):
+        if attachment.store_fname:
+            workbook = xlrd.open_workbook(attachment._full_path(attachment.store_fname), on_demand=True)
+        else:
+            workbook = xlrd.open_workbook(file_contents=base64.b64decode(attachment.datas), on_demand=True)
+        try:
+            sheet = workbook.sheet_by_index(0)
+            rows = sheet.get_rows()
+            next(rows, None)
+            for row in rows:
+                yield [isinstance(cell.value, bytes) and cell.value.encode('utf-8') or str(cell.value)
+                       for cell in row]
+        finally:
+            workbook.release_resources()
+
+    def _iter_chunks(self, rows, size):
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _import_rows(self, rows):
+        """ Create a statement from an iterator of rows, statement lines being
+        created in chunks of IMPORT_CHUNK_SIZE. """
+        statement = False
+        partners, currencies = {}, {}
+        line_model = self.env['account.bank.statement.line']
+        for chunk in self._iter_chunks(rows, self.IMPORT_CHUNK_SIZE):
+            chunk = [row + [''] * (6 - len(row)) for row in chunk]
+            self._preload_lookups(chunk, partners, currencies)
+            vals_list = [{
+                'date': row[0],
+                'payment_ref': row[1],
+                'ref': row[2],
+                'partner_id': self.get_partner(row[3], partners),
+                'amount': row[4],
+                'currency_id': self.get_currency(row[5], currencies),
+            } for row in chunk]
+            if not statement:
+                statement = self.create_statement({
+                    'name': 'Statement Of ' + str(datetime.today().date()),
+                    'journal_id': self.env.context.get('active_id'),
+                    'line_ids': [(0, 0, vals) for vals in vals_list],
+                })
+                continue
+            for vals in vals_list:
+                vals['statement_id'] = statement.id
+            line_model.create(vals_list)
+        if statement and statement.journal_type == 'bank':
+            # Statement lines added after the creation are not part of the
+            # computed ending balance.
+            statement.balance_end_real = statement.balance_start + sum(statement.line_ids.mapped('amount'))
+        return statement
+
     def create_statement(self, values):
         statement = self.env['account.bank.statement'].create(values)
         return statement
 
     def import_file(self):
         for data_file in self.attachment_ids:
-            file_name = data_file.name.lower()
-            if file_name.strip().endswith('.csv') or file_name.strip().endswith('.xlsx'):
-                statement = False
-                if file_name.strip().endswith('.csv'):
-                    keys = ['date', 'payment_ref', 'partner_id', 'amount', 'currency_id']
-                    try:
-                        csv_data = base64.b64decode(data_file.datas)
-                        data_file = io.StringIO(csv_data.decode("utf-8"))
-                        data_file.seek(0)
-                        file_reader = []
-                        values = {}
-                        csv_reader = csv.reader(data_file, delimiter=',')
-                        file_reader.extend(csv_reader)
-                    except:
-                        raise UserError(_("Invalid file!"))
-                    vals_list = []
-                    date = False
-                    for i in range(len(file_reader)):
-                        field = list(map(str, file_reader[i]))
-                        values = dict(zip(keys, field))
-                        if values:
-                            if i == 0:
-                                continue
-                            else:
-                                if not date:
-                                    date = field[0]
-                                values.update({
-                                    'date': field[0],
-                                    'payment_ref': field[1],
-                                    'ref': field[2],
-                                    'partner_id': self.get_partner(field[3]),
-                                    'amount': field[4],
-                                    'currency_id':  self.get_currency(field[5])
-                                })
-                                vals_list.append((0, 0, values))
-                    statement_vals = {
-                        'name': 'Statement Of ' + str(datetime.today().date()),
-                        'journal_id': self.env.context.get('active_id'),
-                        'line_ids': vals_list
-                    }
-                    if len(vals_list) != 0:
-                        statement = self.create_statement(statement_vals)
-                elif file_name.strip().endswith('.xlsx'):
-                    try:
-                        fp = tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx")
-                        fp.write(binascii.a2b_base64(data_file.datas))
-                        fp.seek(0)
-                        values = {}
-                        workbook = xlrd.open_workbook(fp.name)
-                        sheet = workbook.sheet_by_index(0)
-                    except:
-                        raise UserError(_("Invalid file!"))
-                    vals_list = []
-                    for row_no in range(sheet.nrows):
-                        val = {}
-                        values = {}
-                        if row_no <= 0:
-                            fields = map(lambda row: row.value.encode('utf-8'), sheet.row(row_no))
-                        else:
-                            line = list(map(
-                                lambda row: isinstance(row.value, bytes) and row.value.encode('utf-8') or str(
-                                    row.value), sheet.row(row_no)))
-                            values.update({
-                                'date': line[0],
-                                'payment_ref': line[1],
-                                'ref': line[2],
-                                'partner_id': self.get_partner(line[3]),
-                                'amount': line[4],
-                                'currency_id': self.get_currency(line[5])
-                            })
-                            vals_list.append((0, 0, values))
-                    statement_vals = {
-                        'name': 'Statement Of ' + str(datetime.today().date()),
-                        'journal_id': self.env.context.get('active_id'),
-                        'line_ids': vals_list
-                    }
-                    if len(vals_list) != 0:
-                        statement = self.create_statement(statement_vals)
+            file_name = data_file.name.lower().strip()
+            if file_name.endswith('.csv') or file_name.endswith('.xlsx'):
+                if file_name.endswith('.csv'):
+                    rows = self._iter_csv_rows(data_file)
+                else:
+                    rows = self._iter_xlsx_rows(data_file)
+                try:
+                    statement = self._import_rows(rows)
+                except (csv.Error, UnicodeDecodeError, xlrd.XLRDError):
+                    raise UserError(_("Invalid file!"))
                 if statement:
                     return {
                         'type': 'ir.actions.act_window',
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+import base64
+import csv
+import io
+import logging
+import time
+import tracemalloc
+import unittest
+
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+from odoo.tests import tagged
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+_logger = logging.getLogger(__name__)
+
+
+class BankStatementImportCommon(AccountTestInvoicingCommon):
+
+    @classmethod
+    def setUpClass(cls, chart_template_ref=None):
+        super().setUpClass(chart_template_ref=chart_template_ref)
+        cls.journal = cls.company_data['default_journal_bank']
+        cls.partners = cls.env['res.partner'].create([
+            {'name': 'Statement Partner %s' % index} for index in range(20)
+        ])
+
+    def _generate_rows(self, lines):
+        currency = self.journal.currency_id.name or self.env.company.currency_id.name
+        for index in range(lines):
+            yield [
+                '2021-01-%02d' % (index % 28 + 1),
+                'Line %s' % index,
+                'REF%s' % index,
+                self.partners[index % len(self.partners)].name if index % 5 else 'Unknown Partner',
+                (index % 100) - 40.5,
+                currency,
+            ]
+
+    def _generate_csv(self, lines):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(['Date', 'Label', 'Reference', 'Partner', 'Amount', 'Currency'])
+        for row in self._generate_rows(lines):
+            row[4] = '%.2f' % row[4]
+            writer.writerow(row)
+        return self.env['ir.attachment'].create({
+            'name': 'statement.csv',
+            'datas': base64.b64encode(buffer.getvalue().encode('utf-8')),
+        })
+
+    def _generate_xlsx(self, lines):
+        buffer = io.BytesIO()
+        workbook = xlsxwriter.Workbook(buffer, {'constant_memory': True})
+        sheet = workbook.add_worksheet()
+        sheet.write_row(0, 0, ['Date', 'Label', 'Reference', 'Partner', 'Amount', 'Currency'])
+        for index, row in enumerate(self._generate_rows(lines), 1):
+            sheet.write_row(index, 0, row)
+        workbook.close()
+        return self.env['ir.attachment'].create({
+            'name': 'statement.xlsx',
+            'datas': base64.b64encode(buffer.getvalue()),
+        })
+
+    def _import(self, attachment):
+        wizard = self.env['account.bank.statement.import'].with_context(active_id=self.journal.id).create({
+            'attachment_ids': [(6, 0, attachment.ids)],
+        })
+        action = wizard.import_file()
+        return self.env['account.bank.statement'].browse(action['res_id'])
+
+
+@tagged('post_install', '-at_install')
+class TestBankStatementImportStream(BankStatementImportCommon):
+
+    def test_import_lines_and_lookups(self):
+        statement = self._import(self._generate_csv(12))
+        lines = statement.line_ids.sorted(lambda line: int(line.ref[3:]))
+        self.assertEqual(len(lines), 12)
+        self.assertFalse(lines[0].partner_id)
+        self.assertEqual(lines[1].partner_id, self.partners[1])
+        self.assertEqual(lines[1].payment_ref, 'Line 1')
+        self.assertAlmostEqual(sum(lines.mapped('amount')), sum((index % 100) - 40.5 for index in range(12)))
+        self.assertAlmostEqual(statement.balance_end_real, statement.balance_end)
+
+    @unittest.skipUnless(openpyxl and xlsxwriter, "openpyxl and xlsxwriter are required")
+    def test_import_xlsx(self):
+        statement = self._import(self._generate_xlsx(12))
+        lines = statement.line_ids.sorted(lambda line: int(line.ref[3:]))
+        self.assertEqual(len(lines), 12)
+        self.assertFalse(lines[0].partner_id)
+        self.assertEqual(lines[1].partner_id, self.partners[1])
+        self.assertAlmostEqual(sum(lines.mapped('amount')), sum((index % 100) - 40.5 for index in range(12)))
+
+
+@tagged('post_install', '-at_install', '-standard', 'bank_statement_import_benchmark')
+class TestBankStatementImportBenchmark(BankStatementImportCommon):
+
+    LINES = 5000
+
+    def _benchmark(self, attachment, label):
+        queries_before = self.cr.sql_log_count
+        tracemalloc.start()
+        started = time.time()
+        statement = self._import(attachment)
+        elapsed = time.time() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self.assertEqual(len(statement.line_ids), self.LINES)
+        self.assertAlmostEqual(statement.balance_end_real, statement.balance_end)
+        _logger.info(
+            "Bank statement %s import benchmark: %s lines in %.2fs, peak %.1f MiB, %s queries",
+            label, self.LINES, elapsed, peak / 1024.0 / 1024.0, self.cr.sql_log_count - queries_before,
+        )
+
+    def test_benchmark_generated_file(self):
+        self._benchmark(self._generate_csv(self.LINES), 'CSV')
+
+    @unittest.skipUnless(openpyxl and xlsxwriter, "openpyxl and xlsxwriter are required")
+    def test_benchmark_generated_xlsx(self):
+        self._benchmark(self._generate_xlsx(self.LINES), 'XLSX')
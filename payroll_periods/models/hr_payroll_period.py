@@ -19,6 +19,8 @@ class HrPayrollPeriod(models.Model):
     _inherit = ["mail.thread", "mail.activity.mixin"]
     _order = "date_start, name desc"
 
+    ATTENDANCE_CHUNK_SIZE = 1000
+
     name = fields.Char(string="Description", size=256, required=True)
     schedule_id = fields.Many2one(
         string="Payroll Period Schedule",
@@ -57,29 +59,37 @@ class HrPayrollPeriod(models.Model):
         compute="_compute_pex_all",
     )
 
+    def _get_pex_by_period(self, severities):
+        """Return the exceptions of the given severities for every period in
+        self with a single search, as a dict of period id -> exception ids.
+        """
+
+        res = {period.id: [] for period in self}
+        slip_period = {}
+        for period in self:
+            for slip in period.run_ids.slip_ids:
+                slip_period[slip.id] = period.id
+        if not slip_period:
+            return res
+        ex = self.env["hr.payslip.exception"].search(
+            [("severity", "in", severities), ("slip_id", "in", list(slip_period))]
+        )
+        for severity in severities:
+            for e in ex.filtered(lambda e: e.severity == severity):
+                res[slip_period[e.slip_id.id]].append(e.id)
+        return res
+
     def _get_pex(self, severity):
 
         self.ensure_one()
-        PayslipException = self.env["hr.payslip.exception"]
-
-        slip_ids = []
-        for run in self.run_ids:
-            [slip_ids.append(slip.id) for slip in run.slip_ids]
-        ex = PayslipException.search(
-            [("severity", "=", severity), ("slip_id", "in", slip_ids)]
-        )
-        return ex.ids
+        return self._get_pex_by_period([severity])[self.id]
 
     @api.depends("run_ids.slip_ids")
     def _compute_pex_all(self):
 
+        res = self._get_pex_by_period(["critical", "medium", "low"])
         for period in self:
-            res = period._get_pex("critical")
-            res += period._get_pex("medium")
-            res += period._get_pex(
-                "low",
-            )
-            period.exception_ids = [(6, 0, res)]
+            period.exception_ids = [(6, 0, res[period.id])]
 
     def _track_subtype(self, init_values):
         self.ensure_one()
@@ -173,37 +183,69 @@ class HrPayrollPeriod(models.Model):
 
         self.write({"state": "generate"})
 
-    def set_state_closed(self):
-
-        # When we close a pay period, also de-activate related attendances
-        Attendance = self.env["hr.attendance"]
+    def _get_attendance_windows(self):
+        """Group the periods in self by the (naive UTC) window of attendances
+        they cover. Periods of schedules in the same time zone ending at the
+        same time share a window, together with the employees of their
+        schedules.
+        """
 
+        windows = {}
         for period in self:
             #
             # XXX - Someone who cares about DST should update this code to handle it.
             #
-            utc_tz = timezone("UTC")
-            utcDtStart = utc_tz.localize(period.date_start, is_dst=False)
-            dt = period.date_end + relativedelta(
-                hours=period.sched_id.ot_max_rollover_hours
+            dtStart = period.date_start
+            dtEnd = period.date_end + relativedelta(
+                hours=period.schedule_id.ot_max_rollover_hours
             )
-            utcDtEnd = utc_tz.localize(dt, is_dst=False)
-            dtStart = utcDtStart.replace(tzinfo=None)
-            dtEnd = utcDtEnd.replace(tzinfo=None)
-            for contract in period.schedule_id.contract_ids:
-                employee = contract.employee_id
-
-                # De-activate sign-in and sign-out attendance records
-                punch_ids = Attendance.search(
-                    [
-                        ("employee_id", "=", employee.id),
-                        "&",
-                        ("checkin", ">=", dtStart),
-                        ("check_out", "<=", dtEnd),
-                    ],
+            key = (period.schedule_id.tz, dtStart, dtEnd)
+            employee_ids = windows.setdefault(key, set())
+            employee_ids.update(
+                period.schedule_id.contract_ids.mapped("employee_id").ids
+            )
+        return windows
+
+    def _deactivate_attendances(self):
+        """De-activate the sign-in and sign-out records of the schedule's
+        employees within the period window with one update per chunk of
+        employees. Cron callers may set ``commit_attendance_chunks`` in the
+        context to commit each chunk on its own; otherwise everything stays
+        in the transaction of the caller (e.g. the Close button).
+        """
+
+        if "hr.attendance" not in self.env:
+            return
+        Attendance = self.env["hr.attendance"]
+        if "active" not in Attendance._fields:
+            return
+        Attendance.flush(["employee_id", "check_in", "check_out", "active"])
+        chunk_size = self.ATTENDANCE_CHUNK_SIZE
+        windows = self._get_attendance_windows()
+        for (_tz, dtStart, dtEnd), employee_ids in windows.items():
+            employee_ids = sorted(employee_ids)
+            for i in range(0, len(employee_ids), chunk_size):
+                self.env.cr.execute(
+                    """
+                    UPDATE hr_attendance
+                    SET active = false, write_uid = %s,
+                        write_date = now() at time zone 'UTC'
+                    WHERE active
+                      AND employee_id = ANY(%s)
+                      AND check_in >= %s
+                      AND check_out <= %s
+                    """,
+                    (self.env.uid, employee_ids[i : i + chunk_size], dtStart, dtEnd),
                 )
-                punch_ids.write({"active": False})
+                # the update is idempotent, a cron may keep each chunk in its own transaction
+                if self.env.context.get("commit_attendance_chunks") and not self.env.registry.in_test_mode():
+                    self.env.cr.commit()
+        Attendance.invalidate_cache(["active", "write_uid", "write_date"])
+
+    def set_state_closed(self):
 
+        # When we close a pay period, also de-activate related attendances
+        self._deactivate_attendances()
         return self.write({"state": "closed"})
 
     @api.model
@@ -249,65 +291,88 @@ class HrPayrollPeriod(models.Model):
     def create_payslip(self, employee_id, run_id=False):
 
         self.ensure_one()
-        annual_pay_periods = self.schedule_id.annual_pay_periods
-        dPeriodStart = self.date_start.date()
-        dPeriodEnd = self.date_end.date()
-        Payslip = self.env["hr.payslip"]
-        ee = self.env["hr.employee"].browse(employee_id)
-        (
-            dEarliestContractStart,
-            dLastContractEnd,
-            found_contracts,
-        ) = self.get_contracts_hook(ee, dPeriodStart, dPeriodEnd)
-
-        if len(found_contracts) == 0:
-            return False
-
-        # If the contract doesn't cover the full pay period use the contract
-        # dates as start/end dates instead of the full period.
-        #
-        period_start_date = dPeriodStart
-        period_end_date = dPeriodEnd
-        temp_date_start = period_start_date
-        temp_date_end = period_end_date
-        if dEarliestContractStart > period_start_date:
-            temp_date_start = dEarliestContractStart
-        if dLastContractEnd and dLastContractEnd < period_end_date:
-            temp_date_end = dLastContractEnd
-
-        # If termination procedures have begun within the contract period, use the
-        # effective date of the termination as the end date.
-        #
+        slip = self.create_payslips([employee_id], run_id=run_id)
+        return slip or False
+
+    def _get_termination_dates(self, employees):
+        """Return the effective termination dates of the employees with a
+        single search, as a dict of employee id -> list of dates.
+        """
+
+        res = {}
         Termination = self.env["hr.employee.termination"]
         term_ids = Termination.search(
             [
-                ("employee_id", "=", found_contracts[0].employee_id.id),
+                ("employee_id", "in", employees.ids),
                 ("employee_id.status", "in", ["pending_inactive", "inactive"]),
                 ("state", "in", ["draft", "done"]),
             ]
         )
-        if len(term_ids) > 0:
-            for term in term_ids:
-                if term.name >= temp_date_start and term.name < temp_date_end:
-                    temp_date_end = term.name
+        for term in term_ids:
+            res.setdefault(term.employee_id.id, []).append(term.name)
+        return res
+
+    def create_payslips(self, employee_ids, run_id=False):
+        """Create the pay slips of several employees in this period at once.
+        Contracts are prefetched for all employees, terminations are read with
+        one search and the pay slips are created in one call.
+        """
 
+        self.ensure_one()
+        annual_pay_periods = self.schedule_id.annual_pay_periods
+        dPeriodStart = self.date_start.date()
+        dPeriodEnd = self.date_end.date()
+        Payslip = self.env["hr.payslip"]
+        employees = self.env["hr.employee"].browse(employee_ids)
+        employees.mapped("contract_ids")
+        terminations = self._get_termination_dates(employees)
         month_name, month_no, year_no = get_period_year(
             dPeriodStart, annual_pay_periods
         )
-        slip_name = _("Pay Slip for %s for %s/%s") % (ee.name, year_no, month_name)
-        res = {
-            "employee_id": ee.id,
-            "name": slip_name,
-            "payslip_run_id": run_id,
-            "date_from": temp_date_start,
-            "date_to": temp_date_end,
-        }
-        # allow other modules to modify payslip creation values dict
-        res = self.payslip_create_hook(res)
 
-        slip = Payslip.create(res)
-        slip.onchange_employee()
-        return slip
+        vals_list = []
+        for ee in employees:
+            (
+                dEarliestContractStart,
+                dLastContractEnd,
+                found_contracts,
+            ) = self.get_contracts_hook(ee, dPeriodStart, dPeriodEnd)
+
+            if len(found_contracts) == 0:
+                continue
+
+            # If the contract doesn't cover the full pay period use the contract
+            # dates as start/end dates instead of the full period.
+            #
+            temp_date_start = dPeriodStart
+            temp_date_end = dPeriodEnd
+            if dEarliestContractStart > dPeriodStart:
+                temp_date_start = dEarliestContractStart
+            if dLastContractEnd and dLastContractEnd < dPeriodEnd:
+                temp_date_end = dLastContractEnd
+
+            # If termination procedures have begun within the contract period, use
+            # the effective date of the termination as the end date.
+            #
+            for term_date in terminations.get(found_contracts[0].employee_id.id, []):
+                if term_date >= temp_date_start and term_date < temp_date_end:
+                    temp_date_end = term_date
+
+            slip_name = _("Pay Slip for %s for %s/%s") % (ee.name, year_no, month_name)
+            res = {
+                "employee_id": ee.id,
+                "name": slip_name,
+                "payslip_run_id": run_id,
+                "date_from": temp_date_start,
+                "date_to": temp_date_end,
+            }
+            # allow other modules to modify payslip creation values dict
+            vals_list.append(self.payslip_create_hook(res))
+
+        slips = Payslip.create(vals_list)
+        for slip in slips:
+            slip.onchange_employee()
+        return slips
 
     def print_contribution_registers(self):
 
@@ -179,20 +179,9 @@ class HrPayslipRun(models.Model):
             # Create a pay slip for each employee in each department that has
             # a contract in the pay period schedule of this pay period
             #
-            slip_ids = []
-            for ee in ee_ids:
-
-                if ee.id in seen_ee_ids:
-                    continue
-
-                # _logger.warning('Employee: %s', ee.name)
-                slip_id = PayrollPeriod.create_payslip(
-                    ee.id, date_start, date_end, psa_codes, run_id, annual_pay_periods
-                )
-                if slip_id is not False:
-                    slip_ids.append(slip_id)
-
-                seen_ee_ids.append(ee.id)
+            new_ee_ids = [ee.id for ee in ee_ids if ee.id not in seen_ee_ids]
+            slip_ids = period.create_payslips(new_ee_ids, run_id=run_id)
+            seen_ee_ids.extend(new_ee_ids)
 
             # Calculate payroll for all the pay slips in this batch (run)
             slip_ids.compute_sheet()
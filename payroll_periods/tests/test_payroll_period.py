@@ -335,3 +335,75 @@ class TestSchedule(common.SavepointCase):
 
         self.assertEqual(1, slip.get_salary_line_total("NET"))
         self.assertNotEqual(id_old, slip.id)
+
+    def test_create_payslips_batch(self):
+        """Batch creation makes one payslip per employee with a contract"""
+
+        start = datetime(2021, 1, 1)
+        end = datetime(2021, 1, 31, 23, 59, 59)
+        eeJane = self.env["hr.employee"].create({"name": "EE Jane"})
+        eeNoContract = self.env["hr.employee"].create({"name": "EE None"})
+        self.create_contract(self.eeJohn.id, "draft", "done", start)
+        self.create_contract(
+            eeJane.id, "draft", "done", start, start + relativedelta(days=14)
+        )
+        pps = self.create_payroll_schedule("manual", start.date())
+        pp = self.create_payroll_period(pps.id, start, end)
+        run = self.Run.create(
+            {
+                "name": "Run A",
+                "date_start": start.date(),
+                "date_end": end.date(),
+                "period_id": pp.id,
+            }
+        )
+        slips = pp.create_payslips(
+            [self.eeJohn.id, eeJane.id, eeNoContract.id], run_id=run.id
+        )
+
+        self.assertEqual(2, len(slips))
+        self.assertEqual(run, slips.mapped("payslip_run_id"))
+        slipJane = slips.filtered(lambda s: s.employee_id == eeJane)
+        self.assertEqual(pp.date_start.date(), slipJane.date_from)
+        self.assertEqual((start + relativedelta(days=14)).date(), slipJane.date_to)
+
+    def test_exceptions_by_period(self):
+        """Exceptions are gathered per period and severity"""
+
+        start = datetime(2021, 1, 1)
+        end = datetime(2021, 1, 31, 23, 59, 59)
+        pps = self.create_payroll_schedule("manual", start.date())
+        pp1 = self.create_payroll_period(pps.id, start, end)
+        pp2 = self.create_payroll_period(
+            pps.id, end + relativedelta(seconds=1), end + relativedelta(months=1)
+        )
+        exceptions = {}
+        for pp in pp1 | pp2:
+            run = self.Run.create(
+                {
+                    "name": "Run A",
+                    "date_start": pp.date_start.date(),
+                    "date_end": pp.date_end.date(),
+                    "period_id": pp.id,
+                }
+            )
+            slip = self.Payslip.create(
+                {
+                    "name": "A Payslip",
+                    "employee_id": self.eeJohn.id,
+                    "payslip_run_id": run.id,
+                }
+            )
+            exceptions[pp.id] = self.Exception.create(
+                {
+                    "name": "Net salary less than 1/3 of GROSS",
+                    "rule_id": self.exRuleCrit.id,
+                    "slip_id": slip.id,
+                }
+            )
+
+        res = (pp1 | pp2)._get_pex_by_period(["critical"])
+        self.assertEqual(exceptions[pp1.id].ids, res[pp1.id])
+        self.assertEqual(exceptions[pp2.id].ids, res[pp2.id])
+        self.assertEqual([], pp1._get_pex("low"))
+        self.assertEqual(exceptions[pp2.id], pp2.exception_ids)
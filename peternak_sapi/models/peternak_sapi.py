@@ -1,6 +1,10 @@
+from collections import defaultdict
+
 from odoo import models, fields, api, _
 from odoo import exceptions
 
+LINK_FIELDS = {'peternak_ids', 'user_id'}
+
 class peternak_sapi(models.Model):
     _name = "peternak.sapi"
     _description = "Peternak Sapi"
@@ -267,30 +271,53 @@ class peternak_sapi(models.Model):
 		
     count_sapi = fields.Integer(string='Jumlah Sapi', compute='_compute_count_sapi_field', store=True)
 
+    def _get_herd_counts(self):
+        """ Jumlah sapi per peternak dengan satu query grup (peternak, status, tipe)
+            {peternak_id: {'total', 'kering', 'laktasi', 'dara'}} """
+        counts = {record.id: dict.fromkeys(('total', 'kering', 'laktasi', 'dara'), 0) for record in self}
+
+        def add(herd, state, tipe, count):
+            herd['total'] += count
+            if state == 'kering' and tipe == 'INDUK':
+                herd['kering'] += count
+            elif state == 'laktasi' and tipe == 'INDUK':
+                herd['laktasi'] += count
+            elif tipe == 'DARA':
+                herd['dara'] += count
+
+        # record baru (onchange) dihitung dari data di form
+        for record in self.filtered(lambda rec: not rec.id):
+            for sapi in record.list_sapi_ids:
+                add(counts[record.id], sapi.state, sapi.tipe_id.nama_tipe_sapi, 1)
+
+        peternak_ids = [record_id for record_id in self.ids if record_id]
+        if not peternak_ids:
+            return counts
+        groups = self.env['sapi'].read_group([('peternak_id', 'in', peternak_ids)],
+                                             ['peternak_id', 'state', 'tipe_id'],
+                                             ['peternak_id', 'state', 'tipe_id'], lazy=False)
+        tipe_ids = {group['tipe_id'][0] for group in groups if group['tipe_id']}
+        tipe_names = {tipe.id: tipe.nama_tipe_sapi for tipe in self.env['master.tipe.sapi'].browse(tipe_ids)}
+        for group in groups:
+            tipe = group['tipe_id'] and tipe_names.get(group['tipe_id'][0])
+            add(counts[group['peternak_id'][0]], group['state'], tipe, group['__count'])
+        return counts
+
+    # Nilai yang tidak berubah tidak ditulis ulang oleh ORM
     @api.depends('list_sapi_ids.active')
     def _compute_count_sapi_field(self):
+        counts = self._get_herd_counts()
         for record in self:
-            active_sapi_count = len(record.list_sapi_ids.filtered(lambda sapi: sapi.active))
-            record.count_sapi = active_sapi_count
+            record.count_sapi = counts[record.id]['total']
 
     @api.depends('list_sapi_ids.state', 'list_sapi_ids.tipe_id')
     def _compute_jumlah_sapi_per_status(self):
+        counts = self._get_herd_counts()
         for record in self:
-            count_kering = 0
-            count_laktasi = 0
-            count_dara = 0
-            for sapi in record.list_sapi_ids:
-                state = sapi.state
-                tipe_id = sapi.tipe_id
-                if state == 'kering' and tipe_id and tipe_id.nama_tipe_sapi == 'INDUK':
-                    count_kering += 1
-                elif state == 'laktasi' and tipe_id and tipe_id.nama_tipe_sapi == 'INDUK':
-                    count_laktasi += 1
-                elif tipe_id and tipe_id.nama_tipe_sapi == 'DARA':
-                    count_dara += 1
-            record.jumlah_sapi_kering = count_kering
-            record.jumlah_sapi_laktasi = count_laktasi
-            record.jumlah_sapi_dara = count_dara
+            herd = counts[record.id]
+            record.jumlah_sapi_kering = herd['kering']
+            record.jumlah_sapi_laktasi = herd['laktasi']
+            record.jumlah_sapi_dara = herd['dara']
 
     jumlah_sapi_kering = fields.Integer(compute='_compute_jumlah_sapi_per_status', string='Jumlah Sapi Kering',
                                         store=True)
@@ -389,9 +416,11 @@ class peternak_sapi(models.Model):
         return action
 
     def compute_pelanggaran_count(self):
+        groups = self.env['pelanggaran.peternak'].read_group([('peternak_id', 'in', self.ids)],
+                                                             ['peternak_id'], ['peternak_id'])
+        counts = {group['peternak_id'][0]: group['peternak_id_count'] for group in groups}
         for record in self:
-            record.pelanggaran_count = self.env['pelanggaran.peternak'].search_count(
-                [('peternak_id', 'in', self.ids)])
+            record.pelanggaran_count = counts.get(record.id, 0)
 
     kandang_line = fields.Many2many('kandang.line', 'kandang_id', string='Kandang Lines')
 
@@ -421,51 +450,56 @@ class KandangLine(models.Model):
 class sapi(models.Model):
     _inherit = "sapi"
 
-    peternak_ids = fields.Many2many('peternak_sapi', string='Peternak')
+    # relasi yang sama dengan peternak.sapi.sapi_ids (peternak_sapi_sapi_rel)
+    peternak_ids = fields.Many2many('peternak.sapi', string='Peternak')
+
+    def _get_peternak_user_links(self):
+        return {record.id: (record.peternak_ids, record.user_id) for record in self}
+
+    def _sync_peternak_user_children(self, old_links, new_links):
+        """ Perbarui child_ids user peternak hanya untuk relasi yang berubah,
+            dengan perintah (3,)/(4,) per user. Return True jika ada perubahan. """
+        if 'child_ids' not in self.env['res.users']._fields:
+            return False
+        commands = defaultdict(list)
+        for sapi_id, (new_peternaks, new_user) in new_links.items():
+            old_peternaks, old_user = old_links.get(sapi_id, (self.env['peternak.sapi'], self.env['res.users']))
+            if old_user == new_user:
+                removed, added = old_peternaks - new_peternaks, new_peternaks - old_peternaks
+            else:
+                removed, added = old_peternaks, new_peternaks
+            for peternak in removed.filtered('user_id'):
+                if old_user:
+                    commands[peternak.user_id].append((3, old_user.id))
+            for peternak in added.filtered('user_id'):
+                if new_user:
+                    commands[peternak.user_id].append((4, new_user.id))
+        for user, user_commands in commands.items():
+            user.write({'child_ids': user_commands})
+        return bool(commands)
 
     @api.model
     def create(self, vals):
         res = super(sapi, self).create(vals)
-        if vals.get('peternak_ids', False):
-            for peternak_id in res.peternak_ids:
-                if peternak_id.user_id:
-                    user_ids = [x.user_id.id for x in peternak_id.peternak_ids
-                                if x.user_id]
-                    peternak_id.user_id.child_ids = [(6, 0, user_ids)]
+        if vals.get('peternak_ids') and res._sync_peternak_user_children({}, res._get_peternak_user_links()):
+            self.clear_caches()
         return res
 
     def write(self, vals):
+        # hanya peternak_ids dan user_id yang mempengaruhi hirarki user
+        if not LINK_FIELDS.intersection(vals):
+            return super(sapi, self).write(vals)
+        old_links = self._get_peternak_user_links()
         res = super(sapi, self).write(vals)
-        if vals.get('peternak_ids', False):
-            user_ids = []
-            if self.peternak_ids:
-                for peternak in self.peternak_ids:
-                    if peternak.user_id:
-                        user_ids = [x.user_id.id for x in peternak.sapi_ids
-                                    if x.user_id]
-                        peternak.user_id.child_ids = [(6, 0, user_ids)]
-            else:
-                user_ids = self.env['res.users'].search([
-                    ('child_ids', 'in', self.user_id.id)])
-                for user_id in user_ids:
-                    child_ids = user_id.child_ids.ids
-                    child_ids.remove(self.user_id.id)
-                    user_id.child_ids = [(6, 0, child_ids)]
-        if vals.get('user_id', False):
-            for peternak_id in self.peternak_id:
-                child_ids = peternak_id.user_id.child_ids.ids
-                child_ids.append(vals['user_id'])
-                peternak_id.name.user_id.child_ids = [(6, 0, child_ids)]
-        self.clear_caches()
+        if self._sync_peternak_user_children(old_links, self._get_peternak_user_links()):
+            # ormcache Odoo 14 tidak bisa dihapus per cache, hapus hanya saat hirarki user berubah
+            self.clear_caches()
         return res
 
     def unlink(self):
-        for record in self:
-            if record.peternak_ids:
-                for peternak_id in record.peternak_ids:
-                    child_ids = peternak_id.user_id.child_ids.ids
-                    child_ids.remove(record.user_id.id)
-                    peternak_id.user_id.child_ids = [(6, 0, child_ids)]
+        empty = (self.env['peternak.sapi'], self.env['res.users'])
+        if self._sync_peternak_user_children(self._get_peternak_user_links(), dict.fromkeys(self.ids, empty)):
+            self.clear_caches()
         return super(sapi, self).unlink()
 
     peternak_count = fields.Integer(compute='compute_peternak_count')
@@ -477,9 +511,11 @@ class sapi(models.Model):
         return action
 
     def compute_peternak_count(self):
+        groups = self.env['peternak.sapi'].read_group([('sapi_ids', 'in', self.ids)],
+                                                      ['sapi_ids'], ['sapi_ids'])
+        counts = {group['sapi_ids'][0]: group['sapi_ids_count'] for group in groups if group['sapi_ids']}
         for record in self:
-            record.peternak_count = self.env['peternak.sapi'].search_count(
-                [('sapi_ids', 'in', self.ids)])
+            record.peternak_count = counts.get(record.id, 0)
 
 class PeternakSapiInherit(models.Model):
     _inherit = "sapi"
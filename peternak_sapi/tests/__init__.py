@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+
+from . import test_sapi_cache
+from . import test_herd_counts
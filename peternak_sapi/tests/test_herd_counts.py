@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests import tagged
+from odoo.tests.common import SavepointCase
+
+
+@tagged('post_install', '-at_install')
+class TestHerdCounts(SavepointCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super(TestHerdCounts, cls).setUpClass()
+        tipe = cls.env['master.tipe.sapi']
+        cls.induk = tipe.create({'nama_tipe_sapi': 'INDUK'})
+        cls.dara = tipe.create({'nama_tipe_sapi': 'DARA'})
+        cls.peternaks = cls.env['peternak.sapi'].create([
+            {'peternak_name': 'Peternak %s' % index, 'gender': 'laki'} for index in range(3)
+        ])
+        cls.sapis = cls.env['sapi'].create([{
+            'name': 'Sapi %s' % index,
+            'first_name': 'Sapi %s' % index,
+            'peternak_id': cls.peternaks[index % 3].id,
+            'state': ['kering', 'laktasi', 'tdk_ada'][(index // 3) % 3],
+            'tipe_id': (cls.dara if index % 4 == 0 else cls.induk).id,
+        } for index in range(30)])
+
+    def _expected(self, peternak):
+        sapis = self.sapis.filtered(lambda sapi: sapi.peternak_id == peternak)
+        induk = sapis.filtered(lambda sapi: sapi.tipe_id == self.induk)
+        return {
+            'count_sapi': len(sapis),
+            'jumlah_sapi_kering': len(induk.filtered(lambda sapi: sapi.state == 'kering')),
+            'jumlah_sapi_laktasi': len(induk.filtered(lambda sapi: sapi.state == 'laktasi')),
+            'jumlah_sapi_dara': len(sapis.filtered(lambda sapi: sapi.tipe_id == self.dara)),
+        }
+
+    def _assert_counts(self):
+        for peternak in self.peternaks:
+            expected = self._expected(peternak)
+            self.assertEqual({name: peternak[name] for name in expected}, expected)
+
+    def test_counts_follow_bulk_state_change(self):
+        self._assert_counts()
+        self.sapis.write({'state': 'laktasi'})
+        self._assert_counts()
+        self.sapis[:5].write({'tipe_id': self.dara.id})
+        self._assert_counts()
+
+    def test_pelanggaran_and_peternak_count(self):
+        self.peternaks[0].sapi_ids = self.sapis[:2]
+        self.peternaks[1].sapi_ids = self.sapis[1:2]
+        self.assertEqual(self.sapis[:3].mapped('peternak_count'), [1, 2, 0])
+        self.env['pelanggaran.peternak'].create([
+            {'peternak_id': self.peternaks[2].id, 'jns_kegiatan': '1'},
+            {'peternak_id': self.peternaks[2].id, 'jns_kegiatan': '2'},
+        ])
+        self.assertEqual(self.peternaks.mapped('pelanggaran_count'), [0, 0, 2])
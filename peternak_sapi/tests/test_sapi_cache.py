@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import time
+from unittest.mock import patch
+
+from odoo.modules.registry import Registry
+from odoo.tests import tagged
+from odoo.tests.common import SavepointCase
+
+_logger = logging.getLogger(__name__)
+
+
+class SapiCacheCase(SavepointCase):
+
+    HERD_SIZE = 5
+
+    @classmethod
+    def setUpClass(cls):
+        super(SapiCacheCase, cls).setUpClass()
+        cls.peternak = cls.env['peternak.sapi'].create({
+            'peternak_name': 'Peternak Benchmark',
+            'gender': 'laki',
+        })
+        cls.sapis = cls.env['sapi'].create([{
+            'name': 'Sapi %s' % index,
+            'first_name': 'Sapi %s' % index,
+            'eartag_id': 'ET%05d' % index,
+            'peternak_ids': [(6, 0, cls.peternak.ids)],
+        } for index in range(cls.HERD_SIZE)])
+
+    def _count_clears(self):
+        return patch.object(Registry, '_clear_cache', autospec=True, side_effect=Registry._clear_cache)
+
+    def _update_herd(self):
+        for index, record in enumerate(self.sapis):
+            record.write({'bobot': 300.0 + index, 'kondisi_sapi': 'Sehat', 'eartag_id': 'NEW%05d' % index})
+        self.sapis.write({'state': 'laktasi'})
+        self.sapis.flush()
+
+
+@tagged('post_install', '-at_install')
+class TestSapiCache(SapiCacheCase):
+
+    def test_peternak_link_is_inverse(self):
+        self.assertEqual(self.peternak.sapi_ids, self.sapis)
+        other = self.env['peternak.sapi'].create({'peternak_name': 'Peternak Lain', 'gender': 'p'})
+        self.sapis[0].write({'peternak_ids': [(4, other.id)]})
+        self.assertEqual(other.sapi_ids, self.sapis[0])
+
+    def test_update_no_cache_clear(self):
+        with self._count_clears() as clear_cache:
+            self._update_herd()
+        self.assertEqual(clear_cache.call_count, 0)
+
+
+@tagged('post_install', '-at_install', '-standard', 'sapi_benchmark')
+class TestSapiCacheBenchmark(SapiCacheCase):
+
+    HERD_SIZE = 500
+
+    def test_benchmark_bulk_update_no_cache_clear(self):
+        with self._count_clears() as clear_cache:
+            started = time.time()
+            self._update_herd()
+            elapsed = time.time() - started
+
+        self.assertEqual(clear_cache.call_count, 0)
+        _logger.info('Sapi benchmark: %s writes in %.2fs, %s cache clears',
+                     self.HERD_SIZE + 1, elapsed, clear_cache.call_count)
@@ -2,6 +2,9 @@
 # License AGPL-3.0 or later (https://www.gnuorg/licenses/agpl.html).
 
 import json
+import os
+
+from werkzeug.wsgi import ClosingIterator, wrap_file
 
 from odoo.http import content_disposition, request, route, serialize_exception
 from odoo.tools import html_escape
@@ -11,6 +14,9 @@ from odoo.addons.web.controllers import main as report
 
 
 class ReportController(report.ReportController):
+
+    XLSX_STREAM_BUFFER_SIZE = 64 * 1024
+
     @route()
     def report_routes(self, reportname, docids=None, converter=None, **data):
         if converter == "xlsx":
@@ -35,11 +41,14 @@ class ReportController(report.ReportController):
                 if data["context"].get("lang"):
                     del data["context"]["lang"]
                 context.update(data["context"])
-            xlsx = report.with_context(context)._render_xlsx(docids, data=data)[0]
             report_name = report.name
             if report.print_report_name and not len(docids) > 1:
                 obj = request.env[report.model].browse(docids[0])
                 report_name = safe_eval(report.print_report_name, {"object": obj})
+            report = report.with_context(context)
+            if report._is_xlsx_streaming(data):
+                return self._stream_xlsx(report, docids, data, report_name)
+            xlsx = report._render_xlsx(docids, data=data)[0]
             xlsxhttpheaders = [
                 (
                     "Content-Type",
@@ -54,3 +63,42 @@ class ReportController(report.ReportController):
             se = serialize_exception(e)
             error = {"code": 200, "message": "Odoo Server Error", "data": se}
             return request.make_response(html_escape(json.dumps(error)))
+
+    def _stream_xlsx(self, report, docids, data, report_name):
+        """Send a report built in constant memory by chunks of the temporary
+        file instead of loading the whole payload."""
+        path = report._render_xlsx_file(docids, data=data)[0]
+        try:
+            length = os.path.getsize(path)
+            report_file = open(path, "rb")
+        except Exception:
+            os.unlink(path)
+            raise
+
+        def cleanup():
+            # Remove the file only once it is closed: Windows refuses to
+            # delete an open file.
+            report_file.close()
+            os.unlink(path)
+
+        xlsxhttpheaders = [
+            (
+                "Content-Type",
+                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            ),
+            ("Content-Length", length),
+            ("Content-Disposition", content_disposition(report_name + ".xlsx")),
+        ]
+        response = request.make_response(
+            ClosingIterator(
+                wrap_file(
+                    request.httprequest.environ,
+                    report_file,
+                    buffer_size=self.XLSX_STREAM_BUFFER_SIZE,
+                ),
+                cleanup,
+            ),
+            headers=xlsxhttpheaders,
+        )
+        response.direct_passthrough = True
+        return response
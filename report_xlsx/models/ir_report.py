@@ -12,17 +12,25 @@ class ReportAction(models.Model):
         selection_add=[("xlsx", "XLSX")], ondelete={"xlsx": "set default"}
     )
 
-    @api.model
-    def _render_xlsx(self, docids, data):
+    def _get_xlsx_report_model(self):
         report_model_name = "report.%s" % self.report_name
         report_model = self.env.get(report_model_name)
         if report_model is None:
             raise UserError(_("%s model was not found") % report_model_name)
-        return (
-            report_model.with_context(active_model=self.model)
-            .sudo(False)
-            .create_xlsx_report(docids, data)  # noqa
-        )
+        return report_model.with_context(active_model=self.model).sudo(False)
+
+    @api.model
+    def _render_xlsx(self, docids, data):
+        return self._get_xlsx_report_model().create_xlsx_report(docids, data)  # noqa
+
+    def _is_xlsx_streaming(self, data):
+        return self._get_xlsx_report_model().is_streaming_report(data)
+
+    @api.model
+    def _render_xlsx_file(self, docids, data):
+        """Render a streaming report in a temporary file, see
+        ``report.report_xlsx.abstract.create_xlsx_report_file``"""
+        return self._get_xlsx_report_model().create_xlsx_report_file(docids, data)
 
     @api.model
     def _get_report_from_name(self, report_name):
@@ -2,7 +2,9 @@
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl.html).
 
 import logging
+import os
 import re
+import tempfile
 from io import BytesIO
 
 from odoo import models
@@ -99,6 +101,13 @@ class ReportXlsxAbstract(models.AbstractModel):
         return f"{f'{s_before}'}#,##0.{'0' * currency.decimal_places}{f'{s_after}'}"
 
     def create_xlsx_report(self, docids, data):
+        if self.is_streaming_report(data):
+            path, report_type = self.create_xlsx_report_file(docids, data)
+            try:
+                with open(path, "rb") as report_file:
+                    return report_file.read(), report_type
+            finally:
+                os.unlink(path)
         objs = self._get_objs_for_report(docids, data)
         file_data = BytesIO()
         workbook = xlsxwriter.Workbook(file_data, self.get_workbook_options())
@@ -107,6 +116,45 @@ class ReportXlsxAbstract(models.AbstractModel):
         file_data.seek(0)
         return file_data.read(), "xlsx"
 
+    def create_xlsx_report_file(self, docids, data):
+        """
+        Build the report in a temporary file using xlsxwriter's
+        ``constant_memory`` mode, so that only the current row of each sheet
+        is kept in memory.
+        :return: path of the file, that the caller has to remove, and the
+            report type
+        """
+        objs = self._get_objs_for_report(docids, data)
+        fd, path = tempfile.mkstemp(prefix="report_xlsx_", suffix=".xlsx")
+        os.close(fd)
+        try:
+            workbook = xlsxwriter.Workbook(path, self.get_streaming_workbook_options())
+            self.generate_xlsx_report(workbook, data, objs)
+            workbook.close()
+        except Exception:
+            os.unlink(path)
+            raise
+        return path, "xlsx"
+
+    def is_streaming_report(self, data):
+        """
+        Opt-in streaming mode. Reports writing their rows in order, sheet by
+        sheet, can return True to be built in constant memory and streamed to
+        the browser in chunks. Cells written above the current row are lost in
+        this mode, see https://xlsxwriter.readthedocs.io/working_with_memory.html
+        :return: boolean
+        """
+        return False
+
+    def get_streaming_workbook_options(self):
+        """
+        Workbook options used in streaming mode
+        :return: A dictionary of options
+        """
+        options = dict(self.get_workbook_options())
+        options.update({"constant_memory": True, "tmpdir": tempfile.gettempdir()})
+        return options
+
     def get_workbook_options(self):
         """
         See https://xlsxwriter.readthedocs.io/workbook.html constructor options
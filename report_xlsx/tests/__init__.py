@@ -1 +1,2 @@
 from . import test_report
+from . import test_report_streaming_benchmark
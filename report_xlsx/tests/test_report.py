@@ -2,6 +2,8 @@
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl.html).
 
 import logging
+import os
+from unittest import mock
 
 from odoo.tests import common
 
@@ -65,3 +67,18 @@ class TestReport(common.TransactionCase):
         self.assertEqual(
             self.xlsx_report._report_xlsx_currency_format(eur), "#,##0.00 €"
         )
+
+    def test_report_streaming(self):
+        report_model = type(self.env["report.report_xlsx.partner_xlsx"])
+        with mock.patch.object(report_model, "is_streaming_report", return_value=True):
+            self.assertTrue(self.report._is_xlsx_streaming({}))
+            path = self.report._render_xlsx_file(self.docs.ids, {})[0]
+            try:
+                wb = open_workbook(path)
+                self.assertEqual(wb.sheet_by_index(0).cell(0, 0).value, self.docs.name)
+            finally:
+                os.unlink(path)
+            rep = self.report._render(self.docs.ids, {})
+        wb = open_workbook(file_contents=rep[0])
+        self.assertEqual(wb.sheet_by_index(0).cell(0, 0).value, self.docs.name)
+        self.assertFalse(os.path.exists(path))
@@ -0,0 +1,68 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl.html).
+
+import json
+import logging
+import subprocess
+import sys
+import textwrap
+
+from odoo.tests import common, tagged
+
+_logger = logging.getLogger(__name__)
+
+# Writes ROWS rows the way a general ledger export does, then reports the
+# peak RSS of the process in KiB.
+BENCHMARK_SCRIPT = textwrap.dedent(
+    """
+    import json
+    import os
+    import resource
+    import sys
+    import tempfile
+    import xlsxwriter
+
+    rows, options = int(sys.argv[1]), json.loads(sys.argv[2])
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    workbook = xlsxwriter.Workbook(path, options)
+    sheet = workbook.add_worksheet("Ledger")
+    amount = workbook.add_format({"num_format": "#,##0.00"})
+    for row in range(rows):
+        sheet.write_string(row, 0, "2021-01-%02d" % (row % 28 + 1))
+        sheet.write_string(row, 1, "MISC/2021/%06d" % row)
+        sheet.write_string(row, 2, "Journal item %s" % row)
+        sheet.write_number(row, 3, row * 1.25, amount)
+        sheet.write_number(row, 4, row * 0.75, amount)
+    workbook.close()
+    os.unlink(path)
+    print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+    """
+)
+
+
+@tagged("-standard", "report_xlsx_benchmark")
+class TestReportStreamingBenchmark(common.TransactionCase):
+    """Peak RSS of a 500k rows report, in memory and in streaming mode.
+    Run with ``--test-tags report_xlsx_benchmark``."""
+
+    ROWS = 500000
+
+    def _peak_rss(self, options):
+        result = subprocess.run(
+            [sys.executable, "-c", BENCHMARK_SCRIPT, str(self.ROWS), json.dumps(options)],
+            check=True,
+            stdout=subprocess.PIPE,
+        )
+        return int(result.stdout.strip().splitlines()[-1])
+
+    def test_peak_rss(self):
+        report_model = self.env["report.report_xlsx.abstract"]
+        in_memory = self._peak_rss(dict(report_model.get_workbook_options(), in_memory=True))
+        streaming = self._peak_rss(report_model.get_streaming_workbook_options())
+        _logger.info(
+            "XLSX report of %s rows, peak RSS: %.1f MiB in memory, %.1f MiB streaming",
+            self.ROWS,
+            in_memory / 1024.0,
+            streaming / 1024.0,
+        )
+        self.assertLess(streaming, in_memory)
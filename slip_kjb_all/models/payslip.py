@@ -1,3 +1,4 @@
+from collections import defaultdict
 from datetime import date, datetime, time
 from dateutil.relativedelta import relativedelta
 from odoo import api, fields, models, _, SUPERUSER_ID
@@ -28,6 +29,8 @@ class Payslip(models.Model):
 	h_satuan = fields.Float('Harga Satuan', default=0.0, states={'done': [('readonly', True)]})
 	tohar = fields.Float('Total Harga', default=0.0, states={'done': [('readonly', True)]})
 	holiday = fields.Integer('Public Holiday', states={'done': [('readonly', True)]})
+	terlambat = fields.Integer('Hari Terlambat', states={'done': [('readonly', True)]})
+	jam_terlambat = fields.Float('Jam Terlambat', states={'done': [('readonly', True)]})
 	divisi_id = fields.Many2one('hr.employee.divisi', string='Divisi', required=False)
 	department_id = fields.Many2one('hr.department', string='Department', required=False)
 
@@ -35,50 +38,22 @@ class Payslip(models.Model):
 
 	def get_presence(self):
 
-		"""cari jumlah kehadiran employee self.employee_id"""
+		"""jumlah kehadiran employee, dibaca dari rekap yang diisi compute_sheet
+		sebelum salary rule dihitung"""
 
-		sql = """
-			select count(*)
-			from hr_attendance 
-			where employee_id=%s
-			and check_in between %s and %s
-		"""
-
-		cr = self.env.cr 
-		cr.execute(sql, (self.employee_id.id, self.date_from, self.date_to ))
-		res = cr.fetchone()
-
-		return res[0]
+		return self.masuk
 
 	def get_lpagi_lsore(self):
-		absen = self.env['hr.attendance'].search([('employee_id', '=', self.employee_id.id), ('check_in', '>=', self.date_from),
-												 ('check_in', '<=', self.date_to)])
-		lpagi_int = 0.00
-		lsore_int = 0.00
-		har_sat_int = 0.00
-		for ab in absen :
-			lpagi_int += ab.lpagi
-			lsore_int += ab.lsore
-			har_sat_int = ab.har_sat
-
 		return {
-			'liter_pagi': lpagi_int,
-			'liter_sore': lsore_int,
-            'total_liter' : lpagi_int + lsore_int,
-			'satuan_harga' : har_sat_int,
-			'total_harga': har_sat_int * (lpagi_int + lsore_int)
-
+			'liter_pagi': self.pagi,
+			'liter_sore': self.sore,
+			'total_liter': self.t_liter,
+			'satuan_harga': self.h_satuan,
+			'total_harga': self.tohar,
 		}
 	
 	def get_leave(self):
-		leave_obj = self.env['hr.leave'].search([('employee_id', '=', self.employee_id.id), ('date_from', '>=', self.date_from),
-												 ('date_to', '<=', self.date_to), ('state', '=', 'validate')])
-
-		tot_leave = 0.0
-		for x in leave_obj:
-			tot_leave += x.number_of_days
-			
-		return tot_leave
+		return self.leave
 
 
 	def get_work_day(self):
@@ -89,26 +64,154 @@ class Payslip(models.Model):
 		return workday
 	
 		
+	def _get_calendar_structure(self, calendar, cache):
+		"""jam kerja resource.calendar per hari {dayofweek: [(date_from, date_to, hour_from, hour_to)]},
+		disimpan di cache per kalender"""
+		if calendar.id not in cache:
+			structure = defaultdict(list)
+			for att in calendar.attendance_ids:
+				structure[att.dayofweek].append((att.date_from, att.date_to, att.hour_from, att.hour_to))
+			cache[calendar.id] = structure
+		return cache[calendar.id]
+
+	def _get_jam_masuk(self, structure, day):
+		"""jam masuk paling awal pada tanggal day, jadwal bertanggal didahulukan"""
+		lines = structure.get(str(day.weekday()), [])
+		dated = [line for line in lines if line[0] and line[0] <= day <= (line[1] or day)]
+		lines = dated or [line for line in lines if not line[0]]
+		return min(line[2] for line in lines) if lines else False
+
+	def _get_attendance_summary(self):
+		"""rekap kehadiran, keterlambatan, liter dan cuti per employee untuk semua slip,
+		satu query per periode slip
+
+		return {(employee_id, date_from, date_to): {...}}"""
+		summary = {}
+		calendar_cache = {}
+		periods = defaultdict(lambda: self.env['hr.payslip'])
+		for slip in self:
+			periods[(slip.date_from, slip.date_to)] |= slip
+
+		for (date_from, date_to), slips in periods.items():
+			employees = slips.mapped('employee_id')
+			data = {}
+			for employee in employees:
+				data[employee.id] = {
+					'presence': 0, 'terlambat': 0, 'jam_terlambat': 0.0,
+					'liter_pagi': 0.0, 'liter_sore': 0.0, 'satuan_harga': 0.0, 'leave': 0.0,
+				}
+			self.env['hr.attendance'].flush(['employee_id', 'check_in', 'lpagi', 'lsore', 'har_sat'])
+			# check_in disimpan dalam UTC, hari dan jam masuk dihitung di zona waktu
+			# jadwal kerja employee (atau zona waktu employee), sama seperti _get_work_days_data_batch
+			tz_names = [employee.resource_calendar_id.tz or employee.tz or 'UTC' for employee in employees]
+			self.env.cr.execute("""
+				select a.employee_id, (a.check_in at time zone 'UTC' at time zone emp.tz)::date as day,
+					count(*), min(a.check_in at time zone 'UTC' at time zone emp.tz),
+					sum(a.lpagi), sum(a.lsore), (array_agg(a.har_sat order by a.check_in))[1]
+				from hr_attendance a
+				join unnest(%s::int[], %s::varchar[]) as emp(id, tz) on emp.id = a.employee_id
+				where (a.check_in at time zone 'UTC' at time zone emp.tz) >= %s
+				and (a.check_in at time zone 'UTC' at time zone emp.tz) < %s
+				group by a.employee_id, day
+				order by a.employee_id, day desc
+			""", (employees.ids, tz_names, date_from, date_to + relativedelta(days=1)))
+			for employee_id, day, count, first_in, lpagi, lsore, har_sat in self.env.cr.fetchall():
+				res = data[employee_id]
+				res['presence'] += count
+				res['liter_pagi'] += lpagi or 0.0
+				res['liter_sore'] += lsore or 0.0
+				res['satuan_harga'] = har_sat or 0.0
+				calendar = self.env['hr.employee'].browse(employee_id).resource_calendar_id
+				if not calendar:
+					continue
+				jam_masuk = self._get_jam_masuk(self._get_calendar_structure(calendar, calendar_cache), day)
+				jam_in = first_in.hour + first_in.minute / 60.0 + first_in.second / 3600.0
+				if jam_masuk is not False and jam_in > jam_masuk:
+					res['terlambat'] += 1
+					res['jam_terlambat'] += jam_in - jam_masuk
+
+			leaves = self.env['hr.leave'].read_group([('employee_id', 'in', employees.ids),
+													  ('date_from', '>=', date_from),
+													  ('date_to', '<=', date_to),
+													  ('state', '=', 'validate')],
+													 ['number_of_days'], ['employee_id'])
+			for leave in leaves:
+				data[leave['employee_id'][0]]['leave'] = leave['number_of_days']
+
+			for employee_id, res in data.items():
+				res['total_liter'] = res['liter_pagi'] + res['liter_sore']
+				res['total_harga'] = res['satuan_harga'] * res['total_liter']
+				summary[(employee_id, date_from, date_to)] = res
+		return summary
+
+	def _get_work_day_summary(self):
+		"""hari kerja kalender kontrak untuk semua slip, satu perhitungan per kalender dan periode
+
+		return {payslip_id: workday}"""
+		groups = defaultdict(lambda: self.env['hr.payslip'])
+		for slip in self.filtered(lambda slip: slip.contract_id.resource_calendar_id):
+			groups[(slip.contract_id.resource_calendar_id, slip.date_from, slip.date_to)] |= slip
+		result = {}
+		for (calendar, date_from, date_to), slips in groups.items():
+			day_from = datetime.combine(fields.Date.from_string(date_from), time.min)
+			day_to = datetime.combine(fields.Date.from_string(date_to), time.max)
+			workdays = slips.mapped('employee_id')._get_work_days_data_batch(day_from, day_to, calendar=calendar)
+			for slip in slips:
+				result[slip.id] = workdays[slip.employee_id.id]
+		return result
+
+	def _prepare_attendance_values(self, summary, workdays):
+		self.ensure_one()
+		info_absen = summary[(self.employee_id.id, self.date_from, self.date_to)]
+		presence = info_absen['presence']
+		values = {
+			'divisi_id': self.employee_id.divisi_id.id,
+			'masuk': presence,
+			'terlambat': info_absen['terlambat'],
+			'jam_terlambat': info_absen['jam_terlambat'],
+			'pagi': info_absen['liter_pagi'],
+			'sore': info_absen['liter_sore'],
+			't_liter': info_absen['total_liter'],
+			'h_satuan': info_absen['satuan_harga'],
+			'tohar': info_absen['total_harga'],
+			'leave': info_absen['leave'],
+		}
+		workday = workdays.get(self.id)
+		if workday:
+			values.update({
+				'hari_calendar': workday['days'],
+				'alpha': workday['days'] - presence,
+			})
+		return values
+
+	def compute_attendance_summary(self, overwrite=False):
+		"""isi rekap kehadiran semua slip sekaligus sebelum salary rule dihitung,
+		field yang sudah diisi manual tidak ditimpa kecuali overwrite=True"""
+		slips = self.filtered(lambda slip: slip.contract_id and slip.employee_id and slip.state in ('draft', 'verify'))
+		summary = slips._get_attendance_summary()
+		workdays = slips._get_work_day_summary()
+		for slip in slips:
+			values = slip._prepare_attendance_values(summary, workdays)
+			if not overwrite:
+				values = {name: value for name, value in values.items() if not slip[name]}
+			if values:
+				slip.write(values)
+
+	def action_refresh_attendance(self):
+		"""hitung ulang rekap kehadiran dari absensi, menimpa nilai yang sudah ada"""
+		self.compute_attendance_summary(overwrite=True)
+		return True
+
+	def compute_sheet(self):
+		self.compute_attendance_summary()
+		return super(Payslip, self).compute_sheet()
+
 	@api.onchange('employee_id', 'date_from', 'date_to')
 	def onchange_employee(self):
 		res = super(Payslip, self).onchange_employee()
 		if self.contract_id:
-			self.divisi_id = self.employee_id.divisi_id.id
-#			self.department_id = self.employee_id.department_id.id
-			presence = self.get_presence()
-			leave = self.get_leave()
-			workday = self.get_work_day()
-			info_absen = self.get_lpagi_lsore()
-			self.masuk = presence
-			self.pagi = info_absen.get('liter_pagi') or 0.0
-			self.sore = info_absen.get('liter_sore') or 0.0
-			self.t_liter = info_absen.get('total_liter') or 0.0
-			self.h_satuan = info_absen.get('satuan_harga') or 0.0
-			self.tohar = info_absen.get('total_harga') or 0.0
-			self.leave = leave
-			self.hari_calendar = workday['days']
-			self.alpha = workday['days'] - presence
-
+			self.update(self._prepare_attendance_values(self._get_attendance_summary(),
+														self._get_work_day_summary()))
 		return res
 	
 class HrPayslipLine(models.Model):
@@ -20,7 +20,7 @@
 
 {
     'name': "Task Deadline Reminder",
-    'version': "14.0.1.0.0",
+    'version': "14.0.1.0.1",
     'author': 'Cybrosys Techno Solutions',
     'company': 'Cybrosys Techno Solutions',
     'maintainer': 'Cybrosys Techno Solutions',
@@ -1,38 +1,57 @@
 # -*- coding: utf-8 -*-
 
-import datetime
-from datetime import datetime
-from odoo import SUPERUSER_ID
-from odoo.http import request
-from odoo import api, fields, models, _
+from odoo import api, fields, models
+
+REMINDER_TEMPLATE = 'task_deadline_reminder.email_template_edi_deadline_reminder'
 
 
 class DeadLineReminder(models.Model):
     _inherit = "project.task"
 
-    task_reminder = fields.Boolean("Reminder")
-
-    @api.model
-    def _cron_deadline_reminder(self):
-
+    REMINDER_BATCH_SIZE = 500
 
-        su_id = self.env['res.partner'].browse(SUPERUSER_ID)
-        for task in self.env['project.task'].search([('date_deadline', '!=', None),
-                                                     ('task_reminder', '=', True), ('user_id', '!=', None)]):
+    task_reminder = fields.Boolean("Reminder", index=True)
+    task_reminder_date = fields.Date("Reminder Sent On", readonly=True, copy=False)
 
-            reminder_date = task.date_deadline
-            today = datetime.now().date()
-            if reminder_date == today and task:
-                template_id = self.env['ir.model.data'].get_object_reference(
-                    'task_deadline_reminder',
-                    'email_template_edi_deadline_reminder')[1]
-                if template_id:
-                    email_template_obj = self.env['mail.template'].browse(template_id)
-                    values = email_template_obj.generate_email(task.id, ['subject', 'body_html', 'email_from', 'email_to', 'partner_to', 'email_cc', 'reply_to', 'scheduled_date'])
-                    msg_id = self.env['mail.mail'].create(values)
-                    if msg_id:
-                        msg_id._send()
+    @api.model
+    def _get_deadline_reminder_domain(self, today):
+        return [('date_deadline', '=', today),
+                ('task_reminder', '=', True),
+                ('user_id', '!=', False),
+                ('task_reminder_date', '!=', today)]
+
+    def _prepare_deadline_reminder_mails(self, template):
+        """ Render the reminder of all tasks in self at once """
+        rendered = {
+            field: template._render_field(field, self.ids, post_process=(field == 'body_html'))
+            for field in ('subject', 'body_html', 'email_from', 'email_to')
+        }
+        return [{
+            'subject': rendered['subject'][task.id],
+            'body_html': rendered['body_html'][task.id],
+            'email_from': rendered['email_from'][task.id],
+            'email_to': rendered['email_to'][task.id],
+            'model': self._name,
+            'res_id': task.id,
+            'auto_delete': template.auto_delete,
+        } for task in self]
 
+    @api.model
+    def _cron_deadline_reminder(self):
+        template = self.env.ref(REMINDER_TEMPLATE, raise_if_not_found=False)
+        if not template:
+            return True
+        today = fields.Date.context_today(self)
+        tasks = self.search(self._get_deadline_reminder_domain(today), order='id')
+        for start in range(0, len(tasks), self.REMINDER_BATCH_SIZE):
+            batch = tasks[start:start + self.REMINDER_BATCH_SIZE]
+            self.env['mail.mail'].create(batch._prepare_deadline_reminder_mails(template))
+            batch.write({'task_reminder_date': today})
+            if not self.env.registry.in_test_mode():
+                self.env.cr.commit()
+        if tasks:
+            # the mails are sent by the mail queue, not by this cron
+            mail_cron = self.env.ref('mail.ir_cron_mail_scheduler_action', raise_if_not_found=False)
+            if mail_cron:
+                mail_cron.sudo()._trigger()
         return True
-
-